@@ -0,0 +1,148 @@
+"""Benchmark the processing log on a noisy run and write the results as JSON.
+
+A noisy run logs one line per account header (--lines of them, as a
+ledger with that many accounts does). Three ways of getting them into
+the log widget are timed, each with a real Tk root and ScrolledText:
+- direct: what log_message did before LogBuffer, an insert, see() and
+  update() per line;
+- buffered_all: a worker thread posts every line to a LogBuffer that
+  lists them all, and the main loop drains it every flush_interval_ms;
+- buffered: the same with the app's settings, where only the first
+  detail_limit account lines are listed and the rest are summarised.
+For each, the wall time until the last line is in the widget and the
+longest gap between ticks of a 10 ms main-loop timer (how long the
+window stops responding) are reported. Needs a display; on a headless
+machine run it under xvfb-run.
+
+Usage:
+    python benchmarks/log_buffer.py --lines 5000 -o log_buffer.json
+    xvfb-run python benchmarks/log_buffer.py --lines 20000 --repeat 3
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+import tkinter as tk
+from datetime import datetime
+from tkinter import scrolledtext
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+RESULTS_VERSION = 1
+MODES = ('direct', 'buffered_all', 'buffered')
+
+# Main-loop timer used to measure responsiveness
+TICK_MS = 10
+# Posted last, so the run is over once it shows in the widget
+LAST_LINE = "✅ PROCESSING COMPLETE!"
+
+
+def _messages(lines):
+    return [f"🔍 Found account: {i:05d}-A00 - ACCOUNT NAME {i}" for i in range(lines)]
+
+
+def time_mode(mode, lines):
+    """(seconds until the last line is shown, longest main-loop gap in ms)"""
+    from universal_log import LogBuffer
+
+    root = tk.Tk()
+    text = scrolledtext.ScrolledText(root, height=6, width=100)
+    text.pack(fill=tk.BOTH, expand=True)
+    root.update()
+    messages = _messages(lines)
+    ticks = []
+    finished = []
+
+    def tick():
+        ticks.append(time.perf_counter())
+        root.after(TICK_MS, tick)
+
+    def finish():
+        finished.append(time.perf_counter())
+        root.quit()
+
+    if mode == 'direct':
+        def log_all():
+            for message in messages + [LAST_LINE]:
+                text.insert(tk.END, message + "\n")
+                text.see(tk.END)
+                text.update()
+            finish()
+        root.after(0, log_all)
+    else:
+        options = {'detail_limit': lines} if mode == 'buffered_all' else {}
+        log_buffer = LogBuffer(root, text, **options)
+        log_buffer.start()
+
+        def worker():
+            for message in messages:
+                log_buffer.post(message, 'account')
+            log_buffer.summarize('account', 'account headers')
+            log_buffer.post(LAST_LINE)
+
+        def wait_for_last_line():
+            if text.get('end-2l linestart', 'end-2l lineend') == LAST_LINE:
+                finish()
+            else:
+                root.after(TICK_MS, wait_for_last_line)
+        root.after(0, threading.Thread(target=worker, daemon=True).start)
+        root.after(TICK_MS, wait_for_last_line)
+
+    start = time.perf_counter()
+    root.after(0, tick)
+    root.mainloop()
+    root.destroy()
+    gaps = [later - earlier for earlier, later in zip([start] + ticks, ticks + finished)]
+    return finished[0] - start, max(gaps) * 1000
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the buffered processing log")
+    parser.add_argument('--lines', type=int, default=5000, help="Account lines logged per run")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per mode (the median is reported)")
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('-o', '--output', help="JSON results file (default: print to stdout)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    results = {
+        "version": RESULTS_VERSION,
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "lines": args.lines,
+        "modes": {},
+    }
+    try:
+        for mode in args.modes:
+            runs = [time_mode(mode, args.lines) for _ in range(max(1, args.repeat))]
+            results["modes"][mode] = {
+                "seconds": round(statistics.median(run[0] for run in runs), 4),
+                "max_main_loop_gap_ms": round(statistics.median(run[1] for run in runs), 1),
+            }
+            print(f"{mode:>12}: {args.lines:,} lines shown in {results['modes'][mode]['seconds']:.2f}s, "
+                  f"window unresponsive for up to {results['modes'][mode]['max_main_loop_gap_ms']:.0f} ms",
+                  file=sys.stderr)
+    except tk.TclError as e:
+        # No display
+        results["error"] = str(e)
+        print(f"Not measured: {e}", file=sys.stderr)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 1 if "error" in results else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
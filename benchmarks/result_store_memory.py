@@ -0,0 +1,61 @@
+"""Bytes per transaction: list of dicts vs TransactionStore.
+
+Builds the same synthetic cleaned ledger both ways and reports the memory
+each result holds on to (cell values included), measured with tracemalloc.
+
+Usage: python benchmarks/result_store_memory.py [rows]
+"""
+import os
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from universal_results import OUTPUT_COLUMNS, TransactionStore
+
+
+def synthetic_rows(rows, accounts=300):
+    """Yield transactions as the engines produce them (one account per block of rows)"""
+    start = datetime(2024, 1, 1)
+    per_account = max(rows // accounts, 1)
+    code = name = None
+    for i in range(rows):
+        if i % per_account == 0:
+            account = i // per_account
+            code, name = f"{10000 + account}-A01", f"ACCOUNT {account}"
+        yield (code, name, start + timedelta(days=i % 365), f"GJ{i}", f"R{i}",
+               f"Payment {i}", round(i * 1.37 % 1000, 2), '', round(i * 2.11 % 5000, 2))
+
+
+def as_dicts(rows):
+    return [dict(zip(OUTPUT_COLUMNS, row)) for row in rows]
+
+
+def as_store(rows):
+    store = TransactionStore()
+    for row in rows:
+        store.append_values(row)
+    return store
+
+
+def measure(build, rows):
+    """Bytes still allocated once build() has returned"""
+    tracemalloc.start()
+    result = build(synthetic_rows(rows))
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return len(result), size
+
+
+def main(rows=100000):
+    sizes = {}
+    for label, build in (("list of dicts", as_dicts), ("TransactionStore", as_store)):
+        count, sizes[label] = measure(build, rows)
+        print(f"{label:>16}: {sizes[label] / count:7.1f} bytes/transaction ({count:,} rows)")
+    saved = 1 - sizes["TransactionStore"] / sizes["list of dicts"]
+    print(f"{'saved':>16}: {saved:7.1%}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,205 @@
+"""Benchmark the cleaner on synthetic ledgers and write the results as JSON.
+
+Each scenario (rows x engine x reader) runs in a fresh process so peak
+RSS is its own. Ingestion, classification and export are timed separately (rows are
+read into memory first so classification can be timed on its own); a
+second process times the real end-to-end path (engine.process_file +
+write_output) with its own peak RSS.
+
+When both engines run, the classification speed-up of the vectorized
+engine over the stream engine is reported per workbook; --check exits
+non-zero if it falls below --min-speedup, so a regression of the
+column-wise engine can be caught in CI.
+
+Usage:
+    python benchmarks/run_benchmarks.py --rows 10000 100000 -o bench.json
+    python benchmarks/run_benchmarks.py --formats label pattern --width 60 --engines vectorized
+    python benchmarks/run_benchmarks.py --rows 100000 --readers openpyxl calamine
+    python benchmarks/run_benchmarks.py --rows 100000 --check --min-speedup 1.3
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_ledger import HEADER_FORMATS, ledger_config, make_ledger  # noqa: E402
+from universal_readers import READERS  # noqa: E402
+
+# 2: ingestion goes through the reader backends for both engines
+# 3: speedups (stream / vectorized classification time)
+RESULTS_VERSION = 3
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _config(engine, reader):
+    config = ledger_config()
+    config.update({"engine": engine, "reader": reader, "cache_enabled": False})
+    return config
+
+
+def _stage_run(workbook, engine_name, reader_name, export_path, queue):
+    """Time ingestion, classification and export separately"""
+    from universal_engine import create_engine, write_output
+    from universal_readers import open_sheet
+
+    engine = create_engine(_config(engine_name, reader_name))
+    start = time.perf_counter()
+    reader = open_sheet(workbook, reader=reader_name, low_memory=engine.low_memory_reads)
+    rows = list(reader)
+    ingested = time.perf_counter()
+    processed_data = engine.process_rows(rows)
+    classified = time.perf_counter()
+    write_output(processed_data, export_path)
+    exported = time.perf_counter()
+    queue.put({
+        "ingest_s": round(ingested - start, 4),
+        "classify_s": round(classified - ingested, 4),
+        "export_s": round(exported - classified, 4),
+        "reader": reader.backend,
+        "transactions": len(processed_data),
+        "stages_peak_rss_mb": peak_rss_mb(),
+    })
+
+
+def _end_to_end_run(workbook, engine_name, reader_name, export_path, queue):
+    """Time the path the app and CLI take: process_file then write_output"""
+    from universal_engine import create_engine, write_output
+
+    engine = create_engine(_config(engine_name, reader_name))
+    start = time.perf_counter()
+    processed_data = engine.process_file(workbook)
+    write_output(processed_data, export_path)
+    queue.put({
+        "end_to_end_s": round(time.perf_counter() - start, 4),
+        "end_to_end_peak_rss_mb": peak_rss_mb(),
+    })
+
+
+def _in_child(target, *args):
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=target, args=args + (queue,))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def run_scenario(workbook, engine_name, reader_name, export_format, workdir):
+    export_path = os.path.join(workdir, f"out_{engine_name}.{export_format}")
+    result = _in_child(_stage_run, workbook, engine_name, reader_name, export_path)
+    result.update(_in_child(_end_to_end_run, workbook, engine_name, reader_name, export_path))
+    return result
+
+
+def speedups(scenarios):
+    """Stream classify time over vectorized classify time, per rows and reader"""
+    times = {(s["rows"], s["reader"], s["engine"]): s["classify_s"] for s in scenarios}
+    found = []
+    for (rows, reader, engine), stream_s in times.items():
+        vectorized_s = times.get((rows, reader, 'vectorized'))
+        if engine == 'stream' and vectorized_s:
+            found.append({"rows": rows, "reader": reader,
+                          "classify_speedup": round(stream_s / vectorized_s, 2)})
+    return found
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the ledger cleaner on synthetic workbooks")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000],
+                        help="Transaction rows per workbook (one scenario each)")
+    parser.add_argument('--accounts', type=int, default=300, help="Accounts per workbook")
+    parser.add_argument('--formats', nargs='+', choices=HEADER_FORMATS, default=list(HEADER_FORMATS),
+                        help="Account header formats, cycled through the accounts")
+    parser.add_argument('--width', type=int, default=32, help="Columns per row")
+    parser.add_argument('--engines', nargs='+', default=['stream', 'vectorized'],
+                        choices=['stream', 'vectorized'])
+    parser.add_argument('--readers', nargs='+', default=['auto'], choices=READERS,
+                        help="Workbook reader backends to compare (auto = fastest installed)")
+    parser.add_argument('--export', choices=['csv', 'xlsx', 'parquet', 'feather'], default='csv',
+                        help="Export format to time")
+    parser.add_argument('--check', action='store_true',
+                        help="Exit non-zero if the vectorized engine classifies less than "
+                             "--min-speedup times faster than the stream engine")
+    parser.add_argument('--min-speedup', type=float, default=1.3,
+                        help="Classification speed-up required by --check (default: 1.3)")
+    parser.add_argument('-o', '--output', help="JSON results file (default: print to stdout)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    results = {
+        "version": RESULTS_VERSION,
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "params": {"accounts": args.accounts, "formats": args.formats,
+                   "width": args.width, "export": args.export},
+        "scenarios": [],
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in args.rows:
+            workbook = os.path.join(workdir, f"ledger_{rows}.xlsx")
+            start = time.perf_counter()
+            make_ledger(workbook, rows, args.accounts, tuple(args.formats), args.width)
+            print(f"Generated {rows:,} rows in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+            for engine_name in args.engines:
+                for reader_name in args.readers:
+                    scenario = {"rows": rows, "engine": engine_name,
+                                "workbook_bytes": os.path.getsize(workbook)}
+                    scenario.update(run_scenario(workbook, engine_name, reader_name, args.export, workdir))
+                    results["scenarios"].append(scenario)
+                    print(f"{engine_name:>10} {scenario['reader']:>8} {rows:>9,} rows: "
+                          f"ingest {scenario['ingest_s']:.2f}s, "
+                          f"classify {scenario['classify_s']:.2f}s, export {scenario['export_s']:.2f}s, "
+                          f"end-to-end {scenario['end_to_end_s']:.2f}s, "
+                          f"peak RSS {scenario['end_to_end_peak_rss_mb']} MB", file=sys.stderr)
+
+    results["speedups"] = speedups(results["scenarios"])
+    for speedup in results["speedups"]:
+        print(f"vectorized classify speed-up {speedup['reader']:>8} {speedup['rows']:>9,} rows: "
+              f"{speedup['classify_speedup']:.2f}x", file=sys.stderr)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.check:
+        if not results["speedups"]:
+            print("FAIL: --check needs both the stream and vectorized engines", file=sys.stderr)
+            return 1
+        slow = [s for s in results["speedups"] if s["classify_speedup"] < args.min_speedup]
+        for speedup in slow:
+            print(f"FAIL: vectorized classify only {speedup['classify_speedup']:.2f}x faster on "
+                  f"{speedup['rows']:,} rows ({speedup['reader']}), limit {args.min_speedup:g}x",
+                  file=sys.stderr)
+        return 1 if slow else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""Measure how fast the desktop app starts and write the results as JSON.
+
+Two things are timed, each in fresh processes:
+- the import of universal_data_clean, broken down per module with
+  python -X importtime (the modules it imports directly, and any heavy
+  library such as pandas that got pulled in before the window exists);
+- the wall time from launching Python to the first window, and to the
+  engine being ready once the background warm-up has finished. This needs
+  a display; without one it is reported as null.
+
+--check exits non-zero if pandas, NumPy or openpyxl are imported before the
+window, or if the import takes longer than --max-import-ms, so startup
+regressions can be caught in CI.
+
+Usage:
+    python benchmarks/startup_time.py --repeat 5 -o startup.json
+    python benchmarks/startup_time.py --check --max-import-ms 150
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RESULTS_VERSION = 1
+
+APP_MODULE = "universal_data_clean"
+
+# Libraries that must not load before the window is up
+HEAVY_MODULES = ("pandas", "numpy", "openpyxl")
+
+# Runs in the child: show the window, then wait for the engine warm-up
+_WINDOW_SCRIPT = """
+import sys, time
+import tkinter as tk
+from universal_data_clean import AuditorAppUniversal
+root = tk.Tk()
+app = AuditorAppUniversal(root)
+root.update()
+print("window", flush=True)
+while app.warm_up_thread.is_alive():
+    root.update()
+    time.sleep(0.005)
+print("ready", flush=True)
+root.destroy()
+"""
+
+
+def parse_importtime(stderr):
+    """(name, self_us, cumulative_us, depth) for each -X importtime line"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def import_breakdown(top=15):
+    """Import APP_MODULE in a fresh interpreter and break the time down per module"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {APP_MODULE}"],
+        cwd=ROOT, capture_output=True, text=True, check=True)
+    entries = parse_importtime(completed.stderr)
+    app = next(entry for entry in entries if entry[0] == APP_MODULE)
+    # -X importtime lists a module after everything it imported; the
+    # direct imports of the app are the depth-2 entries before it
+    app_index = entries.index(app)
+    start = app_index
+    while start > 0 and entries[start - 1][3] > app[3]:
+        start -= 1
+    direct = [entry for entry in entries[start:app_index] if entry[3] == app[3] + 1]
+    loaded = {entry[0] for entry in entries}
+    return {
+        "import_ms": round(app[2] / 1000, 1),
+        "direct_imports_ms": {name: round(cumulative / 1000, 1)
+                              for name, _, cumulative, _ in sorted(direct, key=lambda e: -e[2])[:top]},
+        "slowest_modules_self_ms": {name: round(self_us / 1000, 1)
+                                    for name, self_us, _, _ in sorted(entries, key=lambda e: -e[1])[:top]},
+        "heavy_imports": [name for name in HEAVY_MODULES if name in loaded],
+    }
+
+
+def first_window(timeout=120):
+    """Seconds from launching Python to the first window and to the engine being ready"""
+    start = time.perf_counter()
+    child = subprocess.Popen([sys.executable, "-c", _WINDOW_SCRIPT], cwd=ROOT,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    times = {}
+    for line in child.stdout:
+        times[line.strip()] = round(time.perf_counter() - start, 3)
+    try:
+        _, stderr = child.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        child.kill()
+        _, stderr = child.communicate()
+    result = {"first_window_s": times.get("window"), "engine_ready_s": times.get("ready")}
+    if child.returncode != 0:
+        # Usually no display (TclError: no display name)
+        result["error"] = (stderr.strip().splitlines() or ["exit code %d" % child.returncode])[-1]
+    return result
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Measure startup time of the desktop app")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="Fresh-process runs per measurement (the median is reported)")
+    parser.add_argument('--top', type=int, default=15, help="Modules listed in the breakdown")
+    parser.add_argument('--no-window', action='store_true',
+                        help="Only measure the import (no display needed)")
+    parser.add_argument('--check', action='store_true',
+                        help="Exit non-zero on heavy imports before the window or a slow import")
+    parser.add_argument('--max-import-ms', type=float, default=150,
+                        help="Import time allowed by --check (default: 150)")
+    parser.add_argument('-o', '--output', help="JSON results file (default: print to stdout)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    runs = [import_breakdown(args.top) for _ in range(max(1, args.repeat))]
+    # The breakdown of the median run, so the numbers add up
+    runs.sort(key=lambda run: run["import_ms"])
+    breakdown = runs[len(runs) // 2]
+    results = {
+        "version": RESULTS_VERSION,
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "import_ms_runs": [run["import_ms"] for run in runs],
+        **breakdown,
+    }
+    print(f"import {APP_MODULE}: {breakdown['import_ms']:.1f} ms (median of {len(runs)})", file=sys.stderr)
+    if breakdown["heavy_imports"]:
+        print(f"  heavy libraries imported before the window: {', '.join(breakdown['heavy_imports'])}",
+              file=sys.stderr)
+
+    if not args.no_window:
+        windows = [first_window() for _ in range(max(1, args.repeat))]
+        shown = [run["first_window_s"] for run in windows if run["first_window_s"] is not None]
+        ready = [run["engine_ready_s"] for run in windows if run["engine_ready_s"] is not None]
+        results["first_window_s"] = statistics.median(shown) if shown else None
+        results["engine_ready_s"] = statistics.median(ready) if ready else None
+        errors = [run["error"] for run in windows if "error" in run]
+        if errors:
+            results["window_error"] = errors[0]
+            print(f"  first window not measured: {errors[0]}", file=sys.stderr)
+        else:
+            print(f"  first window {results['first_window_s']:.2f}s, "
+                  f"engine ready {results['engine_ready_s']:.2f}s", file=sys.stderr)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.check:
+        problems = []
+        if breakdown["heavy_imports"]:
+            problems.append(f"imports {', '.join(breakdown['heavy_imports'])} before the window")
+        if breakdown["import_ms"] > args.max_import_ms:
+            problems.append(f"import took {breakdown['import_ms']:.1f} ms (limit {args.max_import_ms:g} ms)")
+        for problem in problems:
+            print(f"FAIL: {APP_MODULE} {problem}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
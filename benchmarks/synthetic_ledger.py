@@ -0,0 +1,118 @@
+"""Synthetic general-ledger workbooks for benchmarking.
+
+Usage: python benchmarks/synthetic_ledger.py out.xlsx [rows] [accounts]
+"""
+import random
+import sys
+from datetime import datetime, timedelta
+
+import openpyxl
+
+# Account header layouts recognised by extract_account_info
+HEADER_FORMATS = ('label', 'code_column', 'pattern')
+
+# Column layout of the generated sheets (0-based) and the matching config
+LAYOUT = {
+    'date': 0, 'journal': 1, 'reference': 2, 'description': 3,
+    'account_code': 4, 'account_name': 5, 'debit': 6, 'credit': 7, 'balance': 8,
+}
+MIN_WIDTH = len(LAYOUT)
+
+# Header row labels ("ACCOUNT CODE" would itself read as an account header)
+HEADER_LABELS = {
+    'date': 'DATE', 'journal': 'JOURNAL', 'reference': 'REFERENCE', 'description': 'DESCRIPTION',
+    'account_code': 'ACCT NO', 'account_name': 'ACCT NAME', 'debit': 'DEBIT', 'credit': 'CREDIT',
+    'balance': 'BALANCE',
+}
+
+
+def ledger_config():
+    """Cleaner config for workbooks written by make_ledger()"""
+    from universal_engine import column_number_to_letter
+    letter = {field: column_number_to_letter(col) for field, col in LAYOUT.items()}
+    return {
+        "col_date": letter['date'],
+        "col_journal": letter['journal'],
+        "col_reference": letter['reference'],
+        "col_description": letter['description'],
+        "col_debit": letter['debit'],
+        "col_credit": letter['credit'],
+        "col_balance_start": letter['balance'],
+        "col_balance_end": letter['balance'],
+        "col_account_code": letter['account_code'],
+        "col_account_name": letter['account_name'],
+    }
+
+
+def _account_header(index, header_format, width):
+    row = [None] * width
+    code = f"{10000 + index}-{chr(65 + index % 26)}{index % 100:02d}"
+    name = f"ACCOUNT {index} EXPENSES"
+    if header_format == 'label':
+        row[0] = f"ACCOUNT CODE: {code} {name}"
+    elif header_format == 'code_column':
+        row[LAYOUT['account_code']] = code
+        row[LAYOUT['account_name']] = name
+    else:
+        # Bare 12399-D01 style code in a column the config does not map
+        row[LAYOUT['description']] = code
+    return row
+
+
+def ledger_rows(rng, rows=10000, accounts=100, header_formats=HEADER_FORMATS, width=32):
+    """Rows of one synthetic sheet (None for blank cells), column headings first.
+
+    Accounts cycle through header_formats; each block ends with a totals
+    row the cleaner must skip. Columns beyond the ledger layout (up to
+    width) hold memo text, as wide ERP exports do. rng is a random.Random.
+    """
+    width = max(width, MIN_WIDTH)
+    per_account = max(rows // max(accounts, 1), 1)
+    header = [None] * width
+    for field, col in LAYOUT.items():
+        header[col] = HEADER_LABELS[field]
+    yield header
+
+    start = datetime(2024, 1, 1)
+    for account in range(accounts):
+        yield _account_header(account, header_formats[account % len(header_formats)], width)
+        balance = 0.0
+        for i in range(per_account):
+            row = [None] * width
+            amount = round(rng.uniform(1, 5000), 2)
+            is_debit = rng.random() < 0.5
+            balance += amount if is_debit else -amount
+            row[LAYOUT['date']] = start + timedelta(days=i % 365)
+            row[LAYOUT['journal']] = f"GJ{i:06d}"
+            if rng.random() < 0.9:
+                row[LAYOUT['reference']] = f"REF-{account}-{i}"
+            row[LAYOUT['description']] = f"Payment {i} to supplier {account}"
+            row[LAYOUT['debit'] if is_debit else LAYOUT['credit']] = amount
+            row[LAYOUT['balance']] = round(balance, 2)
+            for col in range(MIN_WIDTH, width):
+                if rng.random() < 0.3:
+                    row[col] = f"memo {col}"
+            yield row
+        totals = [None] * width
+        totals[LAYOUT['description']] = "Total"
+        totals[LAYOUT['balance']] = round(balance, 2)
+        yield totals
+
+
+def make_ledger(path, rows=10000, accounts=100, header_formats=HEADER_FORMATS,
+                width=32, sheets=1, seed=1):
+    """Write a ledger of about `rows` transaction rows per sheet (see ledger_rows)"""
+    rng = random.Random(seed)
+    workbook = openpyxl.Workbook(write_only=True)
+    for sheet_index in range(sheets):
+        sheet = workbook.create_sheet(f"Period {sheet_index + 1}")
+        for row in ledger_rows(rng, rows, accounts, header_formats, width):
+            sheet.append(row)
+    workbook.save(path)
+    return path
+
+
+if __name__ == "__main__":
+    make_ledger(sys.argv[1],
+                int(sys.argv[2]) if len(sys.argv) > 2 else 10000,
+                int(sys.argv[3]) if len(sys.argv) > 3 else 100)
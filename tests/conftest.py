@@ -0,0 +1,30 @@
+import os
+import sys
+
+import openpyxl
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# synthetic_ledger (the benchmark ledger generator) is used by tests too
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+
+@pytest.fixture
+def write_workbook(tmp_path):
+    """write_workbook(rows, name='ledger.xlsx', sheets=None) -> path of a new .xlsx
+
+    rows fill the first sheet; sheets ({name: rows}) writes several sheets instead.
+    """
+    def write(rows=None, name='ledger.xlsx', sheets=None):
+        workbook = openpyxl.Workbook()
+        workbook.remove(workbook.active)
+        for title, sheet_rows in (sheets or {'Sheet': rows}).items():
+            sheet = workbook.create_sheet(title)
+            for row in sheet_rows:
+                sheet.append(row)
+        path = str(tmp_path / name)
+        workbook.save(path)
+        return path
+
+    return write
@@ -0,0 +1,43 @@
+import math
+
+import pytest
+
+from universal_amounts import parse_amount, typed_amount
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('1200', 1200.0),
+    ('-5', -5.0),
+    ('1,234.56', 1234.56),
+    ('$1 500', 1500.0),
+    ('(500.00)', -500.0),
+    ('( $ 12 )', -12.0),
+    ('500.00 CR', -500.0),
+    ('500.00 dr', 500.0),
+    ('(-5)', None),
+    ('(+5)', None),
+    ('-(5)', None),
+    ('(5', None),
+    ('1,23', None),
+    ('N/A', None),
+])
+def test_accounting_amounts(text, expected):
+    assert parse_amount(text) == expected
+
+
+def test_side_suffix_only_signs_balances():
+    assert parse_amount('500.00 CR', signed_side=False) == 500.0
+    assert parse_amount('(500.00) CR', signed_side=False) == -500.0
+
+
+def test_plain_amounts():
+    assert parse_amount('1,000', accounting=False) is None
+    assert parse_amount('(5)', accounting=False) is None
+    assert parse_amount(' 12.5 ', accounting=False) == 12.5
+    assert math.isnan(parse_amount('nan', accounting=False))
+
+
+def test_typed_amount_keeps_text_that_is_not_an_amount():
+    assert typed_amount('(-5)') == '(-5)'
+    assert typed_amount('(5)') == -5.0
+    assert typed_amount('') == ''
@@ -0,0 +1,140 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from universal_anomalies import (ALL_ACCOUNTS, BENFORD_COLUMNS, BENFORD_EXPECTED, DIGITS,
+                                 EXACT_DUPLICATE, NEAR_DUPLICATE, ROUND_AMOUNT, WEEKEND_POSTING,
+                                 benford_conformity, benford_mad, detect_anomalies)
+from universal_results import OUTPUT_COLUMNS, TransactionStore
+
+# (code, date, reference, debit, credit); 2024-01-01 was a Monday
+LEDGER = [
+    ('1000', datetime(2024, 1, 1), 'INV-001', 120.5, ''),
+    ('1000', datetime(2024, 1, 1), 'INV-001', 120.5, ''),
+    ('1000', datetime(2024, 1, 3), 'inv 001', 120.5, ''),
+    ('1000', datetime(2024, 1, 8), 'INV001', '120.50', ''),
+    ('1000', '2024-01-02', 'INV-001', '', 120.5),
+    ('2000', datetime(2024, 1, 1), 'INV-001', 120.5, ''),
+    ('1000', datetime(2024, 1, 6), 'R7', 5000, ''),
+    ('1000', '2024-01-07 00:00:00', 'R8', 999.99, ''),
+    ('1000', datetime(2024, 1, 2), '', 120.5, ''),
+    ('1000', datetime(2024, 1, 2), '', 120.5, ''),
+    ('1000', datetime(2024, 1, 2), 'R11', '', ''),
+    ('1000', datetime(2024, 1, 2), 'R11', '', ''),
+]
+
+
+def _store(rows=LEDGER, **columns):
+    store = TransactionStore(list(columns) + OUTPUT_COLUMNS)
+    for i, (code, date, reference, debit, credit) in enumerate(rows):
+        store.append(dict({'Account Code': code, 'Account Name': f'ACCOUNT {code}', 'Date': date,
+                           'Reference': reference, 'Debit': debit, 'Credit': credit},
+                          **{name: values[i] for name, values in columns.items()}))
+    return store
+
+
+def _flags(report, test=None):
+    return [(row['Output Row'], row['Detail']) for row in report.flags
+            if test is None or row['Test'] == test]
+
+
+@pytest.fixture
+def report():
+    return detect_anomalies(_store())
+
+
+def test_exact_duplicates(report):
+    # Blank references still match; rows without an amount are not tested
+    assert _flags(report, EXACT_DUPLICATE) == [(2, 'same as row 1'), (10, 'same as row 9')]
+
+
+def test_near_duplicates_ignore_reference_punctuation_within_the_day_window(report):
+    # Row 4 is 5 days after row 3, past the default 3 day window; the
+    # credit on row 5 and the other account on row 6 are other amounts
+    assert _flags(report, NEAR_DUPLICATE) == [(3, 'row 1, 2 days apart')]
+
+    wider = detect_anomalies(_store(), {'near_duplicate_days': 5})
+    assert _flags(wider, NEAR_DUPLICATE) == [(3, 'row 1, 2 days apart'), (4, 'row 3, 5 days apart')]
+    assert _flags(detect_anomalies(_store(), {'near_duplicate_days': 0}), NEAR_DUPLICATE) == []
+
+
+def test_round_amounts(report):
+    assert _flags(report, ROUND_AMOUNT) == [(7, '5,000 is a multiple of 1,000')]
+    assert _flags(detect_anomalies(_store(), {'round_amount_unit': 0}), ROUND_AMOUNT) == []
+    assert [row for row, _ in _flags(detect_anomalies(_store(), {'round_amount_unit': 0.5}),
+                                     ROUND_AMOUNT)] == [1, 2, 3, 4, 5, 6, 7, 9, 10]
+
+
+def test_weekend_postings(report):
+    assert _flags(report, WEEKEND_POSTING) == [(7, 'Saturday'), (8, 'Sunday')]
+
+
+def test_flags_are_in_output_order_with_one_row_per_test(report):
+    assert [row['Test'] for row in report.flags if row['Output Row'] == 7] == [ROUND_AMOUNT, WEEKEND_POSTING]
+    assert report.counts() == {EXACT_DUPLICATE: 2, NEAR_DUPLICATE: 1, ROUND_AMOUNT: 1, WEEKEND_POSTING: 2}
+
+
+def test_sheets_are_tested_apart():
+    rows = [('1000', datetime(2024, 1, 1), 'A', 10.0, '')] * 2
+
+    report = detect_anomalies(_store(rows, Sheet=['Jan', 'Feb']))
+
+    assert _flags(report, EXACT_DUPLICATE) == []
+    assert _flags(detect_anomalies(_store(rows, Sheet=['Jan', 'Jan'])), EXACT_DUPLICATE) == [(2, 'same as row 1')]
+
+
+def _counts(shares, total=1000):
+    return [0] + [round(share * total) for share in shares]
+
+
+def test_benford_grades():
+    assert benford_mad(_counts(BENFORD_EXPECTED)) == pytest.approx(0, abs=1e-3)
+    assert benford_conformity(0.006) == 'Close'
+    assert benford_conformity(0.0061) == 'Acceptable'
+    assert benford_conformity(0.015) == 'Marginal'
+    assert benford_conformity(0.0151) == 'Nonconformity'
+    # Every amount starting with 5
+    assert benford_conformity(benford_mad([0, 0, 0, 0, 0, 1, 0, 0, 0, 0])) == 'Nonconformity'
+
+
+def _amounts(code, counts):
+    """Debits of an account with the given first-digit counts"""
+    rng = random.Random(code)
+    return [(code, '', f'{code}-{digit}-{i}', digit * 10 ** rng.randint(1, 4) + 0.37, '')
+            for digit in DIGITS for i in range(counts[digit])]
+
+
+def test_benford_report_and_summary():
+    close = _counts(BENFORD_EXPECTED)
+    # 60 first digits moved from 1 to 9: a MAD of about 0.0133
+    marginal = list(close)
+    marginal[1] -= 60
+    marginal[9] += 60
+    rows = (_amounts('1000', close) + _amounts('2000', marginal)
+            + _amounts('3000', [0, 0, 0, 0, 0, 200, 0, 0, 0, 0])
+            + _amounts('4000', [0, 50, 0, 0, 0, 0, 0, 0, 0, 0]))
+
+    report = detect_anomalies(_store(rows))
+
+    assert list(report.benford.columns) == BENFORD_COLUMNS
+    grades = {row['Account Code']: row['Conformity'] for row in report.benford}
+    assert grades == {'1000': 'Close', '2000': 'Marginal', '3000': 'Nonconformity',
+                      '4000': 'Too few amounts (< 100)', ALL_ACCOUNTS: 'Nonconformity'}
+    all_accounts = report.benford[-1]
+    assert all_accounts['Amounts'] == sum(close) * 2 + 200 + 50
+    # Marginal accounts are not counted as deviating
+    assert report.summary().endswith("1 of 3 accounts deviate from Benford's law (1 marginal)")
+
+
+def test_amounts_below_ten_have_no_first_digit():
+    report = detect_anomalies(_store([('1000', '', 'A', 9.99, ''), ('1000', '', 'B', 10, '')]))
+
+    assert report.benford[0]['Amounts'] == 1
+
+
+def test_reports_are_written_next_to_the_output(report, tmp_path):
+    paths = report.write(str(tmp_path / 'out.csv'))
+
+    assert [path.rsplit('/', 1)[-1] for path in paths] == ['out.anomalies.csv', 'out.benford.csv']
+    assert open(paths[0], encoding='utf-8').read().count('\n') == 1 + len(report.flags)
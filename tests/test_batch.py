@@ -0,0 +1,57 @@
+import os
+import random
+
+import pytest
+
+from synthetic_ledger import ledger_config, ledger_rows
+from universal_batch import clean_files, run_batch
+
+CONFIG = dict(ledger_config(), cache_enabled=False)
+
+
+@pytest.fixture
+def ledgers(write_workbook):
+    """Three ledgers of different sizes, so pool workers finish out of order"""
+    return [write_workbook(list(ledger_rows(random.Random(seed), rows, accounts=5)),
+                           name=f'ledger{seed}.xlsx')
+            for seed, rows in ((1, 400), (2, 40), (3, 200))]
+
+
+def _rows(processed_data):
+    return list(processed_data) if processed_data is not None else None
+
+
+def test_pool_gives_the_in_process_results_in_input_order(ledgers):
+    serial = clean_files(ledgers, CONFIG, workers=1)
+    pooled = clean_files(ledgers, CONFIG, workers=3)
+
+    assert [path for path, _, _ in pooled] == ledgers
+    assert [(path, _rows(data), error) for path, data, error in pooled] == \
+        [(path, _rows(data), error) for path, data, error in serial]
+    assert all(error is None and len(data) for _, data, error in pooled)
+
+
+def test_a_failing_file_does_not_stop_the_others(ledgers, tmp_path):
+    broken = tmp_path / 'broken.xlsx'
+    broken.write_bytes(b'PK\x03\x04 not really a workbook')
+    paths = [ledgers[0], str(broken), ledgers[1]]
+
+    results = clean_files(paths, CONFIG, workers=2)
+
+    assert [path for path, _, _ in results] == paths
+    assert results[1][1] is None and results[1][2]
+    assert results[0][2] is None and results[2][2] is None
+
+
+def test_run_batch_merges_with_a_source_file_column(ledgers):
+    logged = []
+    merged, failures = run_batch(ledgers, CONFIG, workers=2, log_callback=logged.append)
+
+    sizes = [len(data) for _, data, _ in clean_files(ledgers, CONFIG, workers=1)]
+    assert failures == {}
+    assert len(merged) == sum(sizes)
+    assert merged.columns[0] == 'Source File'
+    sources = list(merged.column('Source File'))
+    assert sources == [os.path.basename(path) for path, size in zip(ledgers, sizes)
+                       for _ in range(size)]
+    assert any('worker processes' in line for line in logged)
@@ -0,0 +1,120 @@
+import os
+import shutil
+
+import pytest
+
+from universal_cache import CachedSheetReader, WorkbookCache
+from universal_readers import open_sheet
+
+ROWS = [['a', 1], ['b', 2], ['c', 3]]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return WorkbookCache(str(tmp_path / 'cache'))
+
+
+def _read(cache, path):
+    """Rows through the cache, and whether they came from an entry"""
+    rows = cache.rows(path)
+    return list(rows), isinstance(rows, CachedSheetReader)
+
+
+def test_a_second_read_comes_from_the_cache(cache, write_workbook):
+    path = write_workbook(ROWS)
+
+    assert _read(cache, path) == (ROWS, False)
+    assert _read(cache, path) == (ROWS, True)
+    assert len(cache.rows(path)) == 3
+
+
+def test_a_stopped_read_leaves_no_entry(cache, write_workbook):
+    path = write_workbook(ROWS)
+    rows = iter(cache.rows(path))
+    next(rows)
+    rows.close()
+
+    assert os.listdir(cache.cache_dir) == []
+
+
+def test_another_path_is_another_entry(cache, write_workbook, tmp_path):
+    path = write_workbook(ROWS)
+    _read(cache, path)
+    copy = str(tmp_path / 'copy.xlsx')
+    shutil.copy2(path, copy)
+
+    assert _read(cache, copy) == (ROWS, False)
+
+
+def test_a_changed_size_invalidates(cache, write_workbook):
+    path = write_workbook(ROWS)
+    _read(cache, path)
+    write_workbook(ROWS + [['d', 4]])
+
+    assert _read(cache, path) == (ROWS + [['d', 4]], False)
+
+
+def test_a_changed_mtime_invalidates(cache, write_workbook):
+    path = write_workbook(ROWS)
+    _read(cache, path)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert _read(cache, path) == (ROWS, False)
+
+
+def test_changed_contents_with_the_same_size_and_mtime_invalidate(cache, tmp_path):
+    path = tmp_path / 'ledger.csv'
+    path.write_text('a,1\nb,2\n')
+    _read(cache, str(path))
+    stat = os.stat(path)
+    # Same length, other contents, and the old mtime put back (as cp -p or
+    # an unzip would)
+    path.write_text('x,1\ny,2\n')
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert os.stat(path).st_size == stat.st_size
+    assert _read(cache, str(path)) == ([['x', 1], ['y', 2]], False)
+
+
+def _entries(cache):
+    return sorted(os.listdir(cache.cache_dir))
+
+
+def _entry(cache, path):
+    return cache.entry_path(path, backend=open_sheet(path).backend)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, write_workbook):
+    paths = [write_workbook([[name, i] for i in range(200)], name=f'{name}.xlsx')
+             for name in ('first', 'second', 'third')]
+    cache = WorkbookCache(str(tmp_path / 'cache'))
+    for path in paths[:2]:
+        _read(cache, path)
+    entry_size = max(os.path.getsize(os.path.join(cache.cache_dir, name)) for name in _entries(cache))
+    first, second = (_entry(cache, path) for path in paths[:2])
+    os.utime(first, (1_000_000, 1_000_000))
+    os.utime(second, (2_000_000, 2_000_000))
+    # Reading the first again makes it the most recently used
+    assert _read(cache, paths[0])[1]
+
+    cache.max_bytes = 2 * entry_size
+    _read(cache, paths[2])
+
+    assert os.path.exists(first)
+    assert not os.path.exists(second)
+    assert os.path.exists(_entry(cache, paths[2]))
+
+
+def test_the_entry_being_kept_stays_even_over_the_limit(tmp_path, write_workbook):
+    path = write_workbook(ROWS)
+    cache = WorkbookCache(str(tmp_path / 'cache'), max_bytes=1)
+
+    assert _read(cache, path) == (ROWS, False)
+    # Written, then evicted as the only entry over the limit
+    assert _entries(cache) == []
+    entry = _entry(cache, path)
+    with open(entry, 'wb') as f:
+        f.write(b'x' * 100)
+    cache.evict(keep=entry)
+    assert os.path.exists(entry)
@@ -0,0 +1,109 @@
+"""End to end: a workbook goes through universal_cli and a cleaned CSV comes out."""
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+import universal_cli
+from synthetic_ledger import ledger_config
+
+# Columns as in synthetic_ledger.LAYOUT: date, journal, reference, description,
+# account code, account name, debit, credit, balance
+LEDGER = [
+    ['ACCOUNT CODE: 10000-A00 CASH AT BANK'],
+    [datetime(2024, 1, 2), 'GJ1', 'INV-1', 'Opening deposit', None, None, 1200, None, 1200],
+    [datetime(2024, 1, 3), 'GJ2', 'INV-2', 'Supplier payment', None, None, None, '1,050.50', 149.5],
+    [None, None, None, 'Total', None, None, None, None, 149.5],
+    [None, None, None, None, '20000-B01', 'TRADE DEBTORS'],
+    [datetime(2024, 1, 4), 'GJ3', 'CN-7', 'Credit note', None, None, '(75.25)', None, -75.25],
+    [datetime(2024, 1, 5), 'GJ4', 'RC-9', 'Receipt', None, None, None, 300, -375.25],
+    # Bare code in the description column
+    [None, None, None, '30000-C02'],
+    [datetime(2024, 2, 1), 'GJ5', 'X-1', 'Accrual', None, None, 10, None, 10],
+]
+
+EXPECTED_CSV = """\
+Account Code,Account Name,Date,Journal,Reference,Description,Debit,Credit,Balance
+10000-A00,CASH AT BANK,2024-01-02,GJ1,INV-1,Opening deposit,1200,,1200
+10000-A00,CASH AT BANK,2024-01-03,GJ2,INV-2,Supplier payment,,1050.5,149.5
+20000-B01,TRADE DEBTORS,2024-01-04,GJ3,CN-7,Credit note,-75.25,,-75.25
+20000-B01,TRADE DEBTORS,2024-01-05,GJ4,RC-9,Receipt,,300,-375.25
+30000-C02,Detected Account,2024-02-01,GJ5,X-1,Accrual,10,,10
+"""
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps(ledger_config()))
+    return str(path)
+
+
+def _read(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return f.read().replace(os.linesep, '\n')
+
+
+@pytest.mark.parametrize('engine', ['stream', 'vectorized'])
+def test_workbook_to_cleaned_csv(write_workbook, config_path, tmp_path, engine):
+    ledger = write_workbook(LEDGER)
+    output = str(tmp_path / 'cleaned.csv')
+
+    status = universal_cli.main([ledger, '-o', output, '-c', config_path, '--engine', engine,
+                                 '--no-cache', '-j', '1'])
+
+    assert status == 0
+    assert _read(output) == EXPECTED_CSV
+
+
+def test_merged_inputs_get_a_source_file_column(write_workbook, config_path, tmp_path):
+    first = write_workbook(LEDGER, name='first.xlsx')
+    second = write_workbook(LEDGER[:3], name='second.xlsx')
+    output = str(tmp_path / 'merged.csv')
+
+    status = universal_cli.main([first, second, '--merge', '-o', output, '-c', config_path,
+                                 '--no-cache', '-j', '1'])
+
+    lines = _read(output).splitlines()
+    assert status == 0
+    assert lines[0] == 'Source File,' + EXPECTED_CSV.splitlines()[0]
+    assert [line.split(',')[0] for line in lines[1:]] == ['first.xlsx'] * 5 + ['second.xlsx'] * 2
+
+
+def test_one_output_per_input_in_a_folder(write_workbook, config_path, tmp_path):
+    first = write_workbook(LEDGER, name='first.xlsx')
+    second = write_workbook(LEDGER[:3], name='second.xlsx')
+    folder = tmp_path / 'out'
+
+    status = universal_cli.main([first, second, '-o', str(folder), '-c', config_path,
+                                 '--no-cache', '-j', '1'])
+
+    assert status == 0
+    assert sorted(os.listdir(folder)) == ['first_cleaned.csv', 'second_cleaned.csv']
+    assert _read(folder / 'first_cleaned.csv') == EXPECTED_CSV
+
+
+def test_a_failed_input_fails_the_run(write_workbook, config_path, tmp_path):
+    ledger = write_workbook(LEDGER)
+    folder = tmp_path / 'out'
+
+    status = universal_cli.main([ledger, str(tmp_path / 'missing.xlsx'), '-o', str(folder),
+                                 '-c', config_path, '--no-cache', '-j', '1'])
+
+    assert status == 1
+    assert os.listdir(folder) == ['ledger_cleaned.csv']
+
+
+@pytest.mark.parametrize('flag, cached', [([], False), (['--cache'], True)])
+def test_the_workbook_cache_is_opt_in(write_workbook, tmp_path, flag, cached):
+    cache_dir = tmp_path / 'cache'
+    config = tmp_path / 'cache_config.json'
+    config.write_text(json.dumps(dict(ledger_config(), cache_dir=str(cache_dir))))
+    ledger = write_workbook(LEDGER)
+
+    status = universal_cli.main([ledger, '-o', str(tmp_path / 'out.csv'), '-c', str(config),
+                                 '-j', '1'] + flag)
+
+    assert status == 0
+    assert (cache_dir.is_dir() and any(name.endswith('.grid') for name in os.listdir(cache_dir))) == cached
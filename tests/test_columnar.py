@@ -0,0 +1,110 @@
+import json
+import math
+import os
+import random
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+import universal_columnar
+import universal_vectorized
+from synthetic_ledger import ledger_config, ledger_rows
+from universal_columnar import META_FILE, MappedSheetReader, build_store, store_size
+from universal_engine import create_engine
+from universal_jobs import CancelToken
+
+# Every cell kind, and cells that have to be pickled
+CELLS = [
+    'text', 'Café ☕', 'a\x00b', '\udcff', 7, -2**63, 2**64, 1.5, -0.0, math.inf, True, False,
+    datetime(2024, 1, 2, 3, 4, 5, 678901), date(2024, 2, 29), time(23, 59, 59, 999999),
+    timedelta(days=-1, microseconds=5), datetime(2024, 1, 2, tzinfo=timezone.utc),
+    time(9, 30, tzinfo=timezone.utc), pd.Timestamp('2024-01-02'), Decimal('1.10'), None, ('a', 1),
+]
+
+
+def _store(tmp_path, rows, **kwargs):
+    return build_store(rows, str(tmp_path / 'sheet.cols'), **kwargs)
+
+
+def test_cells_come_back_exactly(tmp_path):
+    rows = [CELLS, list(reversed(CELLS)), ['', '', 'last']]
+
+    store = _store(tmp_path, rows, backend='openpyxl')
+
+    read = list(store)
+    assert read == rows
+    assert [[type(cell) for cell in row] for row in read] == [[type(cell) for cell in row] for row in rows]
+    assert str(read[0][8]) == '-0.0'
+    assert (len(store), store.width, store.backend) == (3, len(CELLS), 'openpyxl')
+
+
+def test_ragged_rows_over_several_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(universal_columnar, 'CHUNK_ROWS', 3)
+    rows = [[], ['a'], [1, 2], [], ['wide', '', '', '', 4], [5], [], []]
+
+    store = _store(tmp_path, rows)
+
+    assert list(store) == rows
+    assert store.width == 5
+    assert store.column(4).tolist() == ['', '', '', '', 4, '', '', '']
+    assert [column.tolist() for column in store.columns(1, 3)] == [
+        ['a', 1], ['', 2], ['', ''], ['', ''], ['', '']]
+
+
+def test_empty_sheets(tmp_path):
+    assert list(_store(tmp_path, [])) == []
+    assert list(build_store([[], []], str(tmp_path / 'blank.cols'))) == [[], []]
+
+
+def test_a_cancelled_conversion_leaves_nothing(tmp_path):
+    token = CancelToken()
+    token.cancel()
+
+    assert _store(tmp_path, [['a']] * 10, cancel_token=token) is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_a_store_of_another_version_is_refused(tmp_path):
+    store = _store(tmp_path, [['a', 1]])
+    assert store_size(store.store_path) > 0
+    meta_path = os.path.join(store.store_path, META_FILE)
+    with open(meta_path) as f:
+        meta = json.load(f)
+    with open(meta_path, 'w') as f:
+        json.dump(dict(meta, version=0), f)
+
+    with pytest.raises(ValueError, match='version'):
+        MappedSheetReader(store.store_path)
+
+
+@pytest.fixture
+def ledger():
+    return [['' if cell is None else cell for cell in row]
+            for row in ledger_rows(random.Random(6), 2000, accounts=20, width=12)]
+
+
+def test_chunked_classification_matches_the_whole_sheet(tmp_path, ledger, monkeypatch):
+    config = dict(ledger_config(), engine='vectorized', credit_sample_rows=50, cache_enabled=False)
+    store = _store(tmp_path, ledger)
+    # Account blocks run across the chunk boundaries
+    monkeypatch.setattr(universal_vectorized, 'CHUNK_ROWS', 700)
+
+    chunked = create_engine(config).process_mapped(store)
+
+    assert list(chunked) == list(create_engine(config).process_rows(ledger))
+
+
+@pytest.mark.parametrize('engine', ['stream', 'vectorized'])
+def test_the_mapped_store_gives_the_same_output(tmp_path, write_workbook, ledger, engine):
+    path = write_workbook(ledger)
+    config = dict(ledger_config(), engine=engine, cache_enabled=False)
+    mapped_config = dict(config, mapped_store=True, cache_dir=str(tmp_path / 'cache'))
+
+    first = create_engine(mapped_config).process_file(path)
+    # The second run reads the store converted by the first
+    again = create_engine(mapped_config).process_file(path)
+
+    assert any(name.endswith('.cols') for name in os.listdir(tmp_path / 'cache'))
+    assert list(first) == list(again) == list(create_engine(config).process_file(path))
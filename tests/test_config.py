@@ -0,0 +1,27 @@
+import pytest
+
+from universal_config import column_letter_to_number, column_number_to_letter
+from universal_engine import ExtractionPlan
+
+
+@pytest.mark.parametrize('letter, number', [
+    ('A', 0), ('z', 25), ('AA', 26), (' af ', 31), ('XFD', 16383)])
+def test_column_letters(letter, number):
+    assert column_letter_to_number(letter) == number
+    assert column_number_to_letter(number) == letter.strip().upper()
+
+
+@pytest.mark.parametrize('letter', ['auto', 'AUTO', '', None])
+def test_auto_columns(letter):
+    assert column_letter_to_number(letter) == 'auto'
+
+
+@pytest.mark.parametrize('letter', ['XFE', 'ZZZ', 'AAAA', 'A1', 'A-B', '1', 'ÄB', 7])
+def test_invalid_column_letters(letter):
+    with pytest.raises(ValueError):
+        column_letter_to_number(letter)
+
+
+def test_the_plan_names_the_bad_key():
+    with pytest.raises(ValueError, match="col_debit: 'W1'"):
+        ExtractionPlan.from_config({'col_debit': 'W1'})
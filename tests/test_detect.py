@@ -0,0 +1,161 @@
+import random
+from itertools import count
+
+import pytest
+
+from synthetic_ledger import ledger_config, ledger_rows
+from universal_detect import (MAX_CREDIT_CANDIDATES, detect_columns, infer_credit_column, peek_rows,
+                              sample_rows, scan_header_cells)
+from universal_engine import create_engine
+from universal_readers import StreamingSheetReader
+
+
+def test_the_row_naming_most_fields_is_the_header():
+    rows = [
+        ['GENERAL LEDGER REPORT', 'Date printed: 2024-02-01'],
+        ['Account: 1000 Cash'],
+        ['Date', 'Journal', 'Ref', 'Description', 'Account Code', 'Debit', 'Credit', 'Balance'],
+        ['2024-01-02', 'GJ1', 'INV-1', 'Deposit', '', 100, '', 100],
+    ]
+
+    detected, header_row = detect_columns(rows)
+
+    assert header_row == 2
+    assert detected == {'date': 0, 'journal': 1, 'reference': 2, 'description': 3,
+                        'debit': 5, 'credit': 6, 'balance': 7, 'account_code': 4}
+    assert list(detected) == ['date', 'journal', 'reference', 'description',
+                              'debit', 'credit', 'balance', 'account_code']
+
+
+def test_earliest_row_wins_a_tie_and_other_rows_fill_the_gaps():
+    rows = [
+        ['', 'Date', 'Debit'],
+        ['Posting date', '', '', 'Credit balance'],
+        ['', 'Journal no', 'Debit'],
+    ]
+
+    detected, header_row = detect_columns(rows)
+
+    assert header_row == 0
+    # Missing fields come from the first matching cell in reading order
+    assert detected == {'date': 1, 'journal': 1, 'debit': 2, 'credit': 3}
+
+
+def test_no_header_row_below_two_fields():
+    detected, header_row = detect_columns([['Date'], [None, 'nothing'], []])
+
+    assert header_row is None
+    assert detected == {'date': 0}
+
+
+def test_a_cell_names_the_first_field_still_missing():
+    # "Credit balance" is the credit column; a second one is the balance
+    assert scan_header_cells([['Credit balance', 'Credit balance']]) == {'credit': 0, 'balance': 1}
+    assert scan_header_cells([['Account', 'Code', 'ACCOUNT CODE']]) == {'account_code': 2}
+
+
+def test_only_the_sample_is_read():
+    rows = iter([[0], [1], [2], [3]])
+    assert sample_rows(rows, 3) == [[0], [1], [2]]
+    assert next(rows) == [3]
+
+    # A generator (a streaming reader) is closed straight away
+    generated = ([i] for i in count())
+    assert sample_rows(generated, 2) == [[0], [1]]
+    assert generated.gi_frame is None
+
+    head, everything = peek_rows([[1], [2], [3]], 2)
+    assert head == [[1], [2]]
+    assert list(everything) == [[1], [2], [3]]
+
+
+def test_sampling_a_workbook_stops_the_reader(write_workbook):
+    path = write_workbook([['Date', 'Debit']] + [[i, i] for i in range(500)])
+
+    head = sample_rows(StreamingSheetReader(path), 5)
+
+    assert head[0] == ['Date', 'Debit'] and len(head) == 5
+    assert detect_columns(head) == ({'date': 0, 'debit': 1}, 0)
+
+
+def _credit_rows(debits=5, credits=5, **columns):
+    """Dated rows: a debit in column 1 on the first rows, then credit rows.
+
+    columns maps a column number (c2, c3...) to the rows holding a
+    positive amount there: 'credit', 'all', 'debit' or a count of the
+    credit rows.
+    """
+    rows = []
+    for i in range(debits + credits):
+        is_debit = i < debits
+        row = ['2024-01-02', 100 if is_debit else '', '', '', '', '', '']
+        for name, rows_with_amount in columns.items():
+            if (rows_with_amount == 'all'
+                    or rows_with_amount == ('debit' if is_debit else 'credit')
+                    or (isinstance(rows_with_amount, int) and debits <= i < debits + rows_with_amount)):
+                row[int(name[1:])] = '1,250.00'
+        rows.append(row)
+    return rows
+
+
+def _infer(rows, exclude=(), min_confidence=0.6):
+    return infer_credit_column(rows, 0, 1, exclude, True, min_confidence)
+
+
+def test_a_column_with_every_credit_and_no_debit_is_accepted():
+    inference = _infer(_credit_rows(c2='credit', c3='all') + [['', 5, 5], [None, '', 7]])
+
+    assert inference.columns == (2,)
+    assert (inference.best, inference.confidence) == (2, 1.0)
+    # Rows without a date are not profiled
+    assert inference.rows_sampled == 10
+
+
+def test_the_score_is_coverage_times_exclusivity():
+    # Filled on every row: full coverage, half of it exclusive
+    running_total = _infer(_credit_rows(c3='all'))
+    assert (running_total.best, running_total.confidence) == (3, 0.5)
+    assert running_total.columns == ()
+    assert _infer(_credit_rows(c3='all'), min_confidence=0.4).columns == (3,)
+
+    # 4 of the 5 credit rows, never on a debit row
+    assert _infer(_credit_rows(c4=4)).confidence == pytest.approx(0.8)
+    # On the debit rows only: nothing to score
+    assert _infer(_credit_rows(c4='debit')) == _infer(_credit_rows())
+    assert _infer(_credit_rows()).columns == () and _infer(_credit_rows()).best is None
+
+
+def test_min_confidence_is_inclusive():
+    # 3 of 5 credit rows scores exactly 0.6
+    assert _infer(_credit_rows(c2=3)).columns == (2,)
+    assert _infer(_credit_rows(c2=2)).columns == ()
+    assert _infer(_credit_rows(c2=2)).best == 2
+
+
+def test_ties_go_to_the_leftmost_column_and_runners_up_must_qualify():
+    inference = _infer(_credit_rows(c5='credit', c2='credit', c3='all', c4=4))
+
+    assert inference.columns == (2, 5, 4)
+    assert _infer(_credit_rows(c5='credit', c2='credit'), exclude={2}).columns == (5,)
+
+
+def test_at_most_three_candidates():
+    inference = _infer(_credit_rows(c2='credit', c3='credit', c4='credit', c5='credit', c6='credit'))
+
+    assert MAX_CREDIT_CANDIDATES == 3
+    assert inference.columns == (2, 3, 4)
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+@pytest.mark.parametrize('amount_format', ['accounting', 'plain'])
+def test_inferred_credit_columns_match_scanning_each_row(seed, amount_format):
+    rows = list(ledger_rows(random.Random(seed), 2000, accounts=20, width=16))
+    config = dict(ledger_config(), col_credit='auto', amount_format=amount_format,
+                  cache_enabled=False, credit_sample_rows=200)
+
+    inferred = create_engine(config)
+    by_inference = inferred.process_rows(rows)
+    by_scan = create_engine(dict(config, credit_inference='scan')).process_rows(rows)
+
+    assert inferred.credit_columns == (7,)
+    assert list(by_inference) == list(by_scan)
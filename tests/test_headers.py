@@ -0,0 +1,106 @@
+import math
+import random
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import header_detection
+import universal_headers
+from synthetic_ledger import HEADER_FORMATS, LAYOUT, ledger_config, ledger_rows
+from universal_engine import LedgerCleanerEngine
+from universal_headers import AccountHeaderDetector, cell_text
+
+CODE, NAME, DESCRIPTION = LAYOUT['account_code'], LAYOUT['account_name'], LAYOUT['description']
+
+
+def _row(width=10, **cells):
+    row = [''] * width
+    for field, value in cells.items():
+        row[LAYOUT[field]] = value
+    return row
+
+
+# Rows the fast path must not misjudge
+TRICKY_ROWS = [
+    _row(date='Account code: 1234 BANK'),
+    _row(description='ACCOUNT CODE:'),
+    _row(description='Transfer between accounts', debit=50),
+    _row(description='12399-D01'),
+    _row(description=' 12399-D01 '),
+    _row(description='12399-D012'),
+    _row(description='Ref 12399-D01'),
+    _row(reference='2024-A01'),
+    _row(account_code='20000-B01', account_name='DEBTORS'),
+    _row(account_code='  AB-12 ', account_name=None),
+    _row(account_code='AB'),
+    _row(account_code='ab-12'),
+    _row(account_code=12345, account_name='NUMERIC CODE'),
+    _row(account_code=float('nan'), description='nothing'),
+    _row(account_code=pd.NaT),
+    _row(date=datetime(2024, 1, 2), debit=12399, balance=-1.5),
+    [None, 'GJ1', 'account', None],
+    ['12399-D01'],
+    [],
+]
+
+
+@pytest.fixture
+def engine():
+    return LedgerCleanerEngine(ledger_config())
+
+
+def _both(engine, rows):
+    plan = engine.compile_plan()
+    detector = AccountHeaderDetector(plan, engine.extract_account_info)
+    return [detector(row) for row in rows], [engine.extract_account_info(row, plan) for row in rows]
+
+
+def test_tricky_rows_match_extract_account_info(engine):
+    found, expected = _both(engine, TRICKY_ROWS)
+
+    assert found == expected
+    assert found[0] == ('1234', 'BANK')
+    assert found[8] == ('20000-B01', 'DEBTORS')
+    assert found[-4] == (None, None)
+
+
+@pytest.mark.parametrize('blank', ['', None])
+@pytest.mark.parametrize('header_format', HEADER_FORMATS)
+def test_synthetic_ledgers_match_extract_account_info(engine, blank, header_format):
+    rows = [[blank if cell is None else cell for cell in row]
+            for row in ledger_rows(random.Random(3), 500, accounts=10, header_formats=(header_format,))]
+
+    found, expected = _both(engine, rows)
+
+    assert found == expected
+    assert sum(1 for code, _ in found if code) == 10
+
+
+def test_code_column_verdicts_are_remembered(engine, monkeypatch):
+    monkeypatch.setattr(universal_headers, 'MAX_CODE_CACHE', 2)
+    counts = {}
+    detector = AccountHeaderDetector(engine.compile_plan(), engine.extract_account_info,
+                                     lambda name, n=1: counts.__setitem__(name, counts.get(name, 0) + n))
+
+    found = [detector(_row(account_code=code, account_name='N'))
+             for code in ('20000', 'not a code', '20000', 'X-99', 'X-99')]
+
+    assert found == [('20000', 'N'), (None, None), ('20000', 'N'), ('X-99', 'N'), ('X-99', 'N')]
+    # Only as many verdicts as MAX_CODE_CACHE are kept
+    assert detector._code_cache == {'20000': '20000', 'not a code': None}
+    assert counts == {'method_2_hits': 4}
+
+
+def test_cell_text():
+    assert cell_text(' a ') == 'a'
+    assert cell_text(12) == '12'
+    assert [cell_text(cell) for cell in (None, math.nan, pd.NaT, pd.NA)] == [''] * 4
+
+
+def test_the_benchmark_checks_both_detectors_agree(tmp_path):
+    output = tmp_path / 'headers.json'
+
+    assert header_detection.main(['--rows', '300', '--accounts', '6', '--repeat', '1',
+                                  '-o', str(output)]) == 0
+    assert '"headers_found": 6' in output.read_text()
@@ -0,0 +1,111 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from synthetic_ledger import ledger_config, ledger_rows
+from universal_engine import create_engine
+from universal_incremental import IncrementalProcessor, config_fingerprint
+
+CONFIG = dict(ledger_config(), cache_enabled=False)
+
+
+def _processor(config, tmp_path, messages=None):
+    def log(message, kind=None):
+        if messages is not None:
+            messages.append(message)
+    return IncrementalProcessor(create_engine(config, log_callback=log),
+                                directory=str(tmp_path / 'checkpoints'))
+
+
+def _full_run(config, path):
+    return list(create_engine(config).process_rows(create_engine(config).open_rows(path)))
+
+
+@pytest.fixture
+def rows():
+    return list(ledger_rows(random.Random(5), 400, accounts=6, width=12))
+
+
+def test_the_fingerprint_covers_only_output_settings():
+    fingerprint = config_fingerprint(CONFIG)
+
+    assert config_fingerprint(dict(CONFIG, workers=4, cache_enabled=True)) == fingerprint
+    assert config_fingerprint(dict(CONFIG, col_debit='J')) != fingerprint
+    assert config_fingerprint(dict(CONFIG, amount_format='plain')) != fingerprint
+    assert config_fingerprint(dict(CONFIG, credit_sample_rows=10)) != fingerprint
+
+
+def test_a_checkpoint_is_saved_and_dropped_by_a_config_change(tmp_path, write_workbook, rows):
+    path = write_workbook(rows)
+    processor = _processor(CONFIG, tmp_path)
+
+    processed_data = processor.process_file(path)
+
+    checkpoint = processor.load_checkpoint(path)
+    assert checkpoint['row_count'] == len(rows)
+    assert checkpoint['transactions'] == len(processed_data)
+    assert processor.load_checkpoint(path, 'Other') is None
+    assert _processor(dict(CONFIG, col_debit='J'), tmp_path).load_checkpoint(path) is None
+
+    processor.clear_checkpoint(path)
+    assert processor.load_checkpoint(path) is None
+
+
+def test_appended_rows_give_the_full_run(tmp_path, write_workbook, rows):
+    path = write_workbook(rows[:250])
+    _processor(CONFIG, tmp_path).process_file(path)
+    write_workbook(rows)
+    messages = []
+
+    resumed = _processor(CONFIG, tmp_path, messages).process_file(path)
+
+    assert any('Resumed after row 250' in message for message in messages)
+    assert list(resumed) == _full_run(CONFIG, path)
+
+
+def test_an_edited_earlier_row_rebuilds(tmp_path, write_workbook, rows):
+    path = write_workbook(rows[:250])
+    _processor(CONFIG, tmp_path).process_file(path)
+    edited = [list(row) for row in rows]
+    edited[10][2] = 'EDITED'
+    write_workbook(edited)
+    messages = []
+
+    rebuilt = _processor(CONFIG, tmp_path, messages).process_file(path)
+
+    assert any('rebuilding' in message for message in messages)
+    assert not any('Resumed' in message for message in messages)
+    assert list(rebuilt) == _full_run(CONFIG, path)
+
+
+def _auto_credit_rows(debits, credits):
+    """Date, reference, debit, credit and a quantity filled on every row"""
+    rows = [['ACCOUNT CODE: 1000 CASH']]
+    start = datetime(2024, 1, 1)
+    for i in range(debits + credits):
+        is_debit = i < debits
+        rows.append([start + timedelta(days=i), f'R{i}', 100 + i if is_debit else None,
+                     None if is_debit else 50 + i, 3])
+    return rows
+
+
+def test_credit_columns_from_a_short_first_run_are_checked_again(tmp_path, write_workbook):
+    config = {'col_date': 'A', 'col_journal': '', 'col_reference': 'B', 'col_description': '',
+              'col_debit': 'C', 'col_credit': 'auto', 'col_balance_start': '', 'col_balance_end': '',
+              'col_account_code': '', 'col_account_name': '', 'cache_enabled': False}
+    # Only debits at first: no credit column can be inferred, so each row
+    # is scanned and the quantity reads as a credit
+    path = write_workbook(_auto_credit_rows(4, 0))
+    first = _processor(config, tmp_path).process_file(path)
+    assert _processor(config, tmp_path).load_checkpoint(path)['credit_columns'] == []
+    assert [row['Credit'] for row in first] == [3] * 4
+
+    write_workbook(_auto_credit_rows(4, 6))
+    messages = []
+    processed_data = _processor(config, tmp_path, messages).process_file(path)
+
+    assert any('Credit columns differ' in message for message in messages)
+    assert list(processed_data) == _full_run(config, path)
+    assert [row['Credit'] for row in processed_data] == [''] * 4 + [50 + i for i in range(4, 10)]
+    assert _processor(config, tmp_path).load_checkpoint(path)['credit_columns'] == [3]
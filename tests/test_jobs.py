@@ -0,0 +1,133 @@
+import queue
+import random
+import threading
+
+import pytest
+
+from synthetic_ledger import ledger_config, ledger_rows
+from universal_data_clean import AuditorAppUniversal
+from universal_engine import create_engine
+from universal_jobs import (CANCEL_CHECK_ROWS, CancelToken, JobManager, SharedProgress,
+                            cancellable_rows)
+from universal_results import TransactionStore
+
+CONFIG = dict(ledger_config(), cache_enabled=False, credit_sample_rows=10)
+
+
+def test_cancelling_stops_at_a_batch_boundary():
+    token = CancelToken()
+    stopped = []
+    rows = cancellable_rows(range(1000), token, stopped.append)
+
+    seen = []
+    for row in rows:
+        seen.append(row)
+        if row == 150:
+            token.cancel()
+
+    # The batch being read is still yielded: an exact prefix
+    assert seen == list(range(2 * CANCEL_CHECK_ROWS))
+    assert stopped == [2 * CANCEL_CHECK_ROWS]
+    assert list(cancellable_rows(range(5), CancelToken(), stopped.append)) == list(range(5))
+    assert len(stopped) == 1
+
+
+def test_a_cancelled_run_keeps_the_transactions_of_the_rows_read():
+    rows = list(ledger_rows(random.Random(4), 1000, accounts=5))
+    token = CancelToken()
+
+    def progress(percent):
+        if percent >= 20:
+            token.cancel()
+
+    engine = create_engine(CONFIG, progress_callback=progress, cancel_token=token)
+    partial = engine.process_rows(rows)
+
+    assert engine.cancelled
+    assert 0 < len(partial) < len(create_engine(CONFIG).process_rows(rows))
+    # The same as cleaning a whole number of batches of rows
+    prefixes = (create_engine(CONFIG).process_rows(rows[:end])
+                for end in range(CANCEL_CHECK_ROWS, len(rows), CANCEL_CHECK_ROWS))
+    assert any(list(prefix) == list(partial) for prefix in prefixes)
+
+
+def test_progress_moves_while_the_sheet_is_read():
+    rows = list(ledger_rows(random.Random(4), 3000, accounts=5))
+    reported = []
+
+    create_engine(dict(CONFIG, engine='vectorized'), progress_callback=reported.append).process_rows(rows)
+
+    # Reading fills the first half of the bar, classification the rest
+    assert any(0 < percent < 50 for percent in reported)
+    assert reported == sorted(reported) and reported[-1] <= 100
+
+
+def test_one_job_per_file(tmp_path):
+    release = threading.Event()
+    manager = JobManager()
+    path = str(tmp_path / 'ledger.xlsx')
+
+    def target(token):
+        release.wait(5)
+        return 'cancelled' if token.cancelled else 'done'
+
+    job = manager.start(path, target)
+    assert manager.start(path, target) is None
+    assert manager.active(path) is job
+    other = manager.start(str(tmp_path / 'other.xlsx'), lambda token: 'other')
+
+    assert manager.cancel(path)
+    release.set()
+    job.thread.join(5)
+    other.thread.join(5)
+
+    assert (job.state, job.result) == ('cancelled', 'cancelled')
+    assert (other.state, other.result) == ('done', 'other')
+    assert manager.active(path) is None and not manager.cancel(path)
+    # Finished jobs make way for a new one
+    assert manager.start(path, lambda token: 1) is not None
+
+
+def test_a_failed_job_keeps_its_error(tmp_path):
+    job = JobManager().start(str(tmp_path / 'ledger.xlsx'), lambda token: 1 / 0)
+    job.thread.join(5)
+
+    assert job.state == 'failed'
+    assert isinstance(job.error, ZeroDivisionError)
+
+
+def test_worker_progress_is_sent_in_whole_percents():
+    progress = SharedProgress(queue.Queue())
+    report = progress.reporter('Jan')
+    for percent in (0, 0.4, 1.2, 1.9, 50):
+        report(percent)
+    progress.reporter('Feb')(10)
+
+    assert progress.queue.qsize() == 4
+    assert progress.updates() == {'Jan': 50, 'Feb': 10}
+    assert progress.updates() == {}
+
+
+@pytest.fixture
+def app():
+    """The app's job bookkeeping, without any widgets"""
+    app = AuditorAppUniversal.__new__(AuditorAppUniversal)
+    app.messages = []
+    app.log_message = lambda message, kind=None: app.messages.append(message)
+    app.current_job = None
+    app.processed_data = None
+    return app
+
+
+def test_results_of_a_superseded_run_are_logged_not_shown(app, tmp_path):
+    manager = JobManager()
+    older = manager.start(str(tmp_path / 'a.xlsx'), lambda token: None)
+    app.current_job = manager.start(str(tmp_path / 'b.xlsx'), lambda token: None)
+    store = TransactionStore()
+    store.append({'Reference': 'A'})
+
+    app._update_ui_processing_done(older.token, store, None, 1.5)
+
+    assert app.processed_data is None
+    assert app.messages == ["ℹ An earlier run finished with 1 transactions in 1.50s - "
+                            "not shown, the newer run's results are kept"]
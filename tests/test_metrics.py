@@ -0,0 +1,133 @@
+import json
+import pstats
+import random
+
+import pytest
+
+import universal_cli
+from synthetic_ledger import ledger_config, ledger_rows
+from universal_data_clean import AuditorAppUniversal
+from universal_engine import create_engine
+from universal_metrics import RunMetrics, create_metrics
+
+CONFIG = dict(ledger_config(), cache_enabled=False)
+
+
+def test_stages_laps_and_counters():
+    metrics = RunMetrics()
+    with metrics.stage('read'):
+        pass
+    metrics.add_time('read', 1.0)
+    metrics.lap('classify')
+    metrics.count('rows', 3)
+    metrics.count('rows')
+    metrics.merge({'timings': {'export': 2.0}, 'counters': {'rows': 6}})
+
+    assert metrics.timings['read'] >= 1.0
+    assert set(metrics.timings) == {'read', 'classify', 'export'}
+    assert metrics.counters == {'rows': 10}
+    assert list(metrics.timed_rows('rows_read', [[1], [2]])) == [[1], [2]]
+    assert 'rows_read' in metrics.timings
+
+    lines = metrics.summary_lines()
+    # Slowest stage first
+    assert lines[0] == '⏱ Stage timings:' and lines[1].split()[0] == 'export'
+    assert lines[-1].split() == ['rows', '10']
+
+
+def test_metrics_are_opt_in():
+    assert create_metrics({}) is None
+    assert create_metrics(None) is None
+    assert create_metrics({'metrics': True}).profiler is None
+    # Profiling implies the stage timings
+    assert create_metrics({'profile': True}).profiler is not None
+
+
+def test_a_run_counts_rows_headers_and_transactions():
+    rows = list(ledger_rows(random.Random(3), 60, accounts=3, header_formats=('label',)))
+    engine = create_engine(dict(CONFIG, metrics=True))
+
+    processed_data = engine.process_rows(rows)
+
+    counters = engine.metrics.counters
+    assert counters['rows_seen'] == len(rows)
+    assert counters['method_1_hits'] == 3
+    assert counters['transactions'] == len(processed_data)
+
+
+def test_the_profile_is_written_next_to_the_metrics(tmp_path, write_workbook):
+    path = write_workbook(list(ledger_rows(random.Random(3), 60, accounts=3)))
+    engine = create_engine(dict(CONFIG, profile=True))
+    engine.process_file(path)
+    output = str(tmp_path / 'out.csv')
+
+    metrics_path = engine.metrics.write(output)
+
+    assert json.loads(open(metrics_path).read())['counters']['rows_seen'] > 60
+    stats = pstats.Stats(output + '.prof')
+    assert any(name == 'process_rows' for _, _, name in stats.stats)
+    assert 'process_rows' in engine.metrics.profile_summary()
+
+
+def test_cli_profile(write_workbook, tmp_path):
+    config = tmp_path / 'config.json'
+    config.write_text(json.dumps(ledger_config()))
+    path = write_workbook(list(ledger_rows(random.Random(3), 60, accounts=3)))
+    output = tmp_path / 'out.csv'
+
+    assert universal_cli.main([path, '-o', str(output), '-c', str(config), '--profile',
+                               '--no-cache', '-j', '1']) == 0
+
+    assert (tmp_path / 'out.csv.metrics.json').exists()
+    assert (tmp_path / 'out.csv.prof').exists()
+
+
+class FakeVar:
+    def __init__(self, value=''):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+@pytest.fixture
+def app():
+    """The app's config and export methods, without any widgets"""
+    app = AuditorAppUniversal.__new__(AuditorAppUniversal)
+    for name in ('date', 'journal', 'reference', 'description', 'debit', 'credit', 'balance_start',
+                 'balance_end', 'account_code', 'account_name', 'sheets'):
+        setattr(app, f'entry_{name}', FakeVar())
+    for name in ('cache', 'incremental', 'reconcile', 'anomalies', 'metrics', 'profile'):
+        setattr(app, f'{name}_var', FakeVar(False))
+    app.messages = []
+    app.log_message = lambda message, kind=None: app.messages.append(message)
+    return app
+
+
+@pytest.mark.parametrize('ticked, expected', [
+    ('metrics_var', {'metrics': True, 'profile': False}),
+    ('profile_var', {'metrics': False, 'profile': True}),
+])
+def test_the_gui_switches_reach_the_config(app, ticked, expected):
+    getattr(app, ticked).value = True
+
+    config = app.get_current_config()
+
+    assert {key: config[key] for key in expected} == expected
+    assert create_metrics(config) is not None
+    assert (create_metrics(config).profiler is not None) == expected['profile']
+
+
+def test_a_profiled_gui_run_exports_the_dump(app, tmp_path):
+    app.profile_var.value = True
+    app.config = dict(CONFIG, **app.get_current_config())
+    engine = create_engine(app.config)
+    app.processed_data = engine.process_rows(list(ledger_rows(random.Random(3), 60, accounts=3)))
+    app.run_metrics = engine.metrics
+    output = str(tmp_path / 'out.csv')
+
+    app._write_export(output)
+
+    assert (tmp_path / 'out.csv.metrics.json').exists()
+    assert (tmp_path / 'out.csv.prof').exists()
+    assert any('out.csv.prof' in message for message in app.messages)
@@ -0,0 +1,100 @@
+"""NA text ("N/A", "nan", ...) reads as blank cells, as pd.read_excel had it.
+
+Both engines must give the output the pd.read_excel pipeline gave, and
+the same output as each other, whichever reader the sheet comes through.
+"""
+import csv
+from datetime import datetime
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from universal_engine import LedgerCleanerEngine
+from universal_readers import open_sheet
+from universal_vectorized import VectorizedLedgerEngine
+
+WIDTH = 32  # up to the default balance column, AF
+# Default config columns: A, G, E, K, W and AF
+COLUMNS = {'date': 0, 'reference': 6, 'code': 4, 'name': 10, 'debit': 22, 'balance': 31}
+REFERENCE, NAME, DEBIT, BALANCE = (COLUMNS[key] for key in ('reference', 'name', 'debit', 'balance'))
+
+CONFIG = {"cache_enabled": False}
+
+
+def _row(**cells):
+    row = [None] * WIDTH
+    for column, value in cells.items():
+        row[COLUMNS[column]] = value
+    return row
+
+
+def _ledger_rows():
+    return [
+        _row(date='ACCOUNT CODE: 10000-A01 Cash at bank'),
+        _row(date=datetime(2024, 1, 1), reference='R1', debit=100, balance=100),
+        # Neither a reference nor an amount: not a transaction
+        _row(date=datetime(2024, 1, 2), reference='N/A', balance='nan'),
+        _row(date=datetime(2024, 1, 3), reference='nan', debit=25.5, balance=125.5),
+        # Account code column header whose name cell is NA text
+        _row(code='20000-X', name='nan'),
+        _row(date=datetime(2024, 1, 4), reference='#N/A', debit='NULL', balance='N/A'),
+        _row(date=datetime(2024, 1, 5), reference='R2', debit=40, balance=40),
+    ]
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    path = tmp_path / 'na_ledger.xlsx'
+    workbook = openpyxl.Workbook()
+    for row in _ledger_rows():
+        workbook.active.append(row)
+    workbook.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def ledger_csv(tmp_path):
+    path = tmp_path / 'na_ledger.csv'
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        for row in _ledger_rows():
+            writer.writerow(['' if value is None else
+                             value.strftime('%Y-%m-%d') if isinstance(value, datetime) else value
+                             for value in row])
+    return str(path)
+
+
+def _baseline(path):
+    grid = pd.read_excel(path, header=None, engine='openpyxl').fillna('').values.tolist()
+    return list(LedgerCleanerEngine(CONFIG).process_rows(grid))
+
+
+def test_readers_blank_na_text(ledger, ledger_csv):
+    for path, reader in ((ledger, 'openpyxl'), (ledger_csv, 'csv')):
+        rows = list(open_sheet(path, reader=reader))
+        assert rows[2][REFERENCE] == '' and rows[2][BALANCE] == ''
+        assert rows[4][NAME] == ''
+        assert rows[5][REFERENCE] == rows[5][DEBIT] == rows[5][BALANCE] == ''
+
+
+@pytest.mark.parametrize('engine_class', [LedgerCleanerEngine, VectorizedLedgerEngine])
+def test_engines_match_read_excel(ledger, engine_class):
+    expected = _baseline(ledger)
+    assert [row['Reference'] for row in expected] == ['R1', '', 'R2']
+    # A blank name cell keeps the previous account's name
+    assert [(row['Account Code'], row['Account Name']) for row in expected] == [
+        ('10000-A01', 'Cash at bank'), ('10000-A01', 'Cash at bank'), ('20000-X', 'Cash at bank')]
+
+    assert list(engine_class(CONFIG).process_file(ledger)) == expected
+
+
+def test_engines_match_each_other(ledger, ledger_csv):
+    for path in (ledger, ledger_csv):
+        rows = list(open_sheet(path))
+        stream = list(LedgerCleanerEngine(CONFIG).process_rows(rows))
+        vectorized = list(VectorizedLedgerEngine(CONFIG).process_rows(rows))
+        assert stream == vectorized
+        assert len(stream) == 3
+        assert not any(value in ('N/A', 'nan', '#N/A', 'NULL')
+                       for row in stream for value in row.values())
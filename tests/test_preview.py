@@ -0,0 +1,107 @@
+"""VirtualTreeview against stand-in widgets (no display is needed)."""
+import pytest
+
+import universal_preview
+from universal_results import OUTPUT_COLUMNS, TransactionStore
+
+
+class FakeTreeview:
+    def __init__(self, parent, **options):
+        self.items = {}
+        self.next_id = 0
+
+    def heading(self, *args, **kwargs):
+        pass
+
+    column = configure = bind = grid = xview = heading
+
+    def get_children(self):
+        return tuple(self.items)
+
+    def item(self, item, text, values):
+        self.items[item] = (text, values)
+
+    def insert(self, parent, index, text, values):
+        self.next_id += 1
+        self.items[f'I{self.next_id}'] = (text, values)
+
+    def delete(self, *items):
+        for item in items:
+            del self.items[item]
+
+    def bbox(self, item):
+        return (0, 25, 100, 20)
+
+
+class FakeScrollbar:
+    def __init__(self, parent, **options):
+        self.position = None
+
+    def set(self, first, last):
+        self.position = (first, last)
+
+    def grid(self, **options):
+        pass
+
+
+@pytest.fixture
+def preview(monkeypatch):
+    monkeypatch.setattr(universal_preview.ttk, 'Treeview', FakeTreeview)
+    monkeypatch.setattr(universal_preview.ttk, 'Scrollbar', FakeScrollbar)
+    view = universal_preview.VirtualTreeview(None, OUTPUT_COLUMNS, {}, height=10)
+    store = TransactionStore()
+    for i in range(100_000):
+        store.append({'Account Code': ('1000', '10001', '2000')[i % 3], 'Reference': f'R{i}'})
+    view.set_data(store)
+    return view
+
+
+def _shown(view):
+    """(row number, reference) of each Treeview item"""
+    return [(text, values[OUTPUT_COLUMNS.index('Reference')])
+            for text, values in view.tree.items.values()]
+
+
+def test_only_the_visible_rows_are_items(preview):
+    assert len(preview) == 100_000
+    assert _shown(preview) == [(i + 1, f'R{i}') for i in range(10)]
+    assert preview.v_scrollbar.position == (0, 10 / 100_000)
+
+
+def test_scrolling_and_jumping_reuse_the_items(preview):
+    items = preview.tree.get_children()
+
+    preview.scroll(25)
+    assert _shown(preview)[0] == (26, 'R25')
+    preview.jump_to(99_995)
+    # Clamped so the last page is full
+    assert preview.visible_range() == (99_990, 100_000)
+    assert _shown(preview)[-1] == (100_000, 'R99999')
+    preview.jump_to(-5)
+    assert preview.visible_range() == (0, 10)
+    assert preview.tree.get_children() == items
+
+
+def test_the_scrollbar_moves_through_the_whole_result(preview):
+    preview._on_scrollbar('moveto', '0.5')
+    assert preview.visible_range() == (50_000, 50_010)
+    preview._on_scrollbar('scroll', '1', 'pages')
+    assert preview.visible_range() == (50_010, 50_020)
+
+
+def test_the_filter_matches_the_whole_account_code(preview):
+    assert preview.set_filter(' 1000 ') == 33_334
+    assert _shown(preview)[:3] == [(1, 'R0'), (4, 'R3'), (7, 'R6')]
+    preview.jump_to(33_333)
+    assert _shown(preview)[-1] == (100_000, 'R99999')
+
+    assert preview.set_filter('') == 100_000
+    assert preview.set_filter('999') == 0
+    assert preview.tree.get_children() == ()
+
+
+def test_a_list_of_dicts_works_too(preview):
+    preview.set_data([{'Account Code': 10001, 'Reference': 'only'}])
+
+    assert _shown(preview) == [(1, 'only')]
+    assert preview.set_filter('10001') == 1
@@ -0,0 +1,153 @@
+from datetime import datetime, time
+
+import pytest
+
+import universal_readers
+from universal_readers import (StreamingSheetReader, file_format, open_sheet, read_rows,
+                               reader_available, select_reader, sheet_sizes)
+
+CELLS = [
+    ['text', 12, 12.5, 3.0, datetime(2024, 1, 2), time(9, 30), True, None, '#DIV/0!', '007'],
+    [None, None, 'last'],
+]
+
+
+def test_streaming_reader_converts_cells_like_pandas(write_workbook):
+    path = write_workbook(CELLS)
+
+    rows = list(StreamingSheetReader(path))
+
+    assert rows[0] == ['text', 12, 12.5, 3, datetime(2024, 1, 2), time(9, 30), True, '', '', '007']
+    # Whole numbers are int and errors blank, as pd.read_excel gave them
+    assert [type(value) for value in rows[0][1:4]] == [int, float, int]
+    assert rows[1][:3] == ['', '', 'last']
+
+
+def test_streaming_reader_picks_the_sheet_and_counts_rows(write_workbook):
+    path = write_workbook(sheets={'First': [['a'], ['b']], 'Second': [['c'], ['d'], ['e']]})
+
+    assert [row[0] for row in StreamingSheetReader(path)] == ['a', 'b']
+    second = StreamingSheetReader(path, 'Second')
+    assert len(second) == 3
+    assert [row[0] for row in second] == ['c', 'd', 'e']
+    assert StreamingSheetReader.sheet_sizes(path) == [('First', 2), ('Second', 3)]
+
+
+def test_rows_are_read_again_on_each_iteration(write_workbook):
+    path = write_workbook(CELLS)
+    reader = StreamingSheetReader(path)
+
+    assert list(reader) == list(reader) == read_rows(path, reader='openpyxl')
+
+
+def test_a_stopped_iteration_closes_the_workbook(write_workbook):
+    path = write_workbook([[i] for i in range(50)])
+    rows = iter(StreamingSheetReader(path))
+
+    assert next(rows) == [0]
+    rows.close()
+    # The generator's finally closed the read-only workbook
+    assert rows.gi_frame is None
+
+
+@pytest.fixture
+def installed(monkeypatch):
+    """Pretend only some optional backends are installed"""
+    available = set()
+    monkeypatch.setattr(universal_readers, 'reader_available',
+                        lambda reader: reader in available or reader in ('openpyxl', 'csv'))
+    return available
+
+
+def test_the_first_bytes_decide_the_format(tmp_path, write_workbook):
+    xlsx = write_workbook(CELLS)
+    misnamed = tmp_path / 'export.xls'
+    misnamed.write_bytes(open(xlsx, 'rb').read())
+    (tmp_path / 'old.xlsx').write_bytes(universal_readers._OLE2_MAGIC + b'rest')
+    (tmp_path / 'tabs.xls').write_text('Date\tDebit\n2024-01-02\t5\n')
+    (tmp_path / 'empty.xlsb').write_bytes(b'')
+    (tmp_path / 'binary.ods').write_bytes(b'\x01\x00\x02')
+
+    assert file_format(xlsx) == 'xlsx'
+    assert file_format(str(misnamed)) == 'xlsx'
+    assert file_format(str(tmp_path / 'old.xlsx')) == 'xls'
+    assert file_format(str(tmp_path / 'tabs.xls')) == 'csv'
+    assert file_format(str(tmp_path / 'empty.xlsb')) == 'xlsb'
+    assert file_format(str(tmp_path / 'binary.ods')) == 'ods'
+
+
+def test_auto_picks_the_fastest_installed_reader(write_workbook, installed):
+    path = write_workbook(CELLS)
+    assert select_reader(path) == 'openpyxl'
+
+    installed.add('calamine')
+    assert select_reader(path) == 'calamine'
+    # Reading only the first rows, or a big file with low_memory, streams
+    assert select_reader(path, streaming=True) == 'openpyxl'
+    assert select_reader(path, low_memory=True) == 'calamine'
+
+
+def test_big_files_stream_when_memory_is_low(write_workbook, installed, monkeypatch):
+    path = write_workbook(CELLS)
+    installed.add('calamine')
+    monkeypatch.setattr(universal_readers, 'IN_MEMORY_MAX_BYTES', 10)
+
+    assert select_reader(path, low_memory=True) == 'openpyxl'
+    assert select_reader(path, low_memory=False) == 'calamine'
+
+
+def test_formats_without_a_streaming_reader_load_in_memory(tmp_path, installed):
+    path = tmp_path / 'sheet.ods'
+    path.write_bytes(b'\x01\x00')
+    installed.add('calamine')
+
+    assert select_reader(str(path), streaming=True) == 'calamine'
+
+
+def test_missing_or_unknown_readers(tmp_path, write_workbook, installed):
+    path = tmp_path / 'old.xls'
+    path.write_bytes(universal_readers._OLE2_MAGIC)
+
+    with pytest.raises(ValueError, match=r'python-calamine or xlrd \(pip install xlrd\)'):
+        select_reader(str(path))
+    with pytest.raises(ValueError, match='pip install pyxlsb'):
+        select_reader(str(path), 'pyxlsb')
+    with pytest.raises(ValueError, match="Unknown reader 'pandas'"):
+        select_reader(str(path), 'pandas')
+    assert select_reader(write_workbook(CELLS), 'openpyxl', streaming=False) == 'openpyxl'
+
+
+def test_reader_available():
+    assert reader_available('openpyxl') and reader_available('csv')
+    assert not reader_available('pandas')
+
+
+@pytest.mark.parametrize('text, encoding', [
+    ('Code;Name;Debit\n007;Café;1,5\n;N/A;12\n', 'cp1252'),
+    ('Code\tName\tDebit\n007\tCafé\t1,5\n\tN/A\t12\n', 'utf-8'),
+])
+def test_csv_exports(tmp_path, text, encoding):
+    path = tmp_path / 'export.csv'
+    path.write_bytes(text.encode(encoding))
+
+    reader = open_sheet(str(path))
+
+    assert reader.backend == 'csv' and len(reader) == 3
+    # Leading zeros stay text, plain numbers become numbers, NA text is blank
+    assert list(reader) == [['Code', 'Name', 'Debit'], ['007', 'Café', '1,5'], ['', '', 12]]
+    assert sheet_sizes(str(path)) == [('export', 3)]
+    with pytest.raises(ValueError, match='Sheet not found: Other'):
+        list(open_sheet(str(path), 'Other'))
+
+
+@pytest.mark.parametrize('backend', ['calamine'])
+def test_optional_readers_give_the_same_rows(write_workbook, backend):
+    pytest.importorskip(universal_readers.READER_PACKAGES[backend][0])
+    path = write_workbook(CELLS)
+
+    def trimmed(rows):
+        # In-memory backends pad short rows to the sheet width
+        return [row[:len(row) - next((i for i, cell in enumerate(reversed(row)) if cell != ''), 0)]
+                for row in rows]
+
+    assert trimmed(read_rows(path, reader=backend)) == trimmed(read_rows(path, reader='openpyxl'))
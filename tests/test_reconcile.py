@@ -0,0 +1,126 @@
+import pytest
+
+from universal_reconcile import ACCOUNT_COLUMNS, BREAK_COLUMNS, reconcile
+from universal_results import OUTPUT_COLUMNS, TransactionStore
+
+# (code, debit, credit, balance); rows without a balance leave it blank
+LEDGER = [
+    # Debit-normal, opening balance 100, one wrong figure (999) on row 4
+    ('1000', 50, '', 150),
+    ('1000', '', 20, 130),
+    ('1000', '', '', ''),
+    ('1000', 10, '', 999),
+    ('1000', 5, '', 145),
+    ('1000', 5, '', 150.004),
+    # Credit-normal (a liability shown positive)
+    ('2000', '', 100, 100),
+    ('2000', '', 50, 150),
+    ('2000', 30, '', 120),
+    # Balances signed by DR/CR suffixes
+    ('3000', 100, '', '100.00 DR'),
+    ('3000', '', '140', '40.00 CR'),
+    # One balance only: both sides fit
+    ('4000', '', 10, 10),
+    # No balances at all
+    ('5000', 10, '', ''),
+]
+
+
+def _store(rows=LEDGER, **columns):
+    store = TransactionStore(list(columns) + OUTPUT_COLUMNS)
+    for i, (code, debit, credit, balance) in enumerate(rows):
+        store.append(dict({'Account Code': code, 'Account Name': f'ACCOUNT {code}',
+                           'Reference': f'R{i + 1}', 'Debit': debit, 'Credit': credit,
+                           'Balance': balance},
+                          **{name: values[i] for name, values in columns.items()}))
+    return store
+
+
+def _accounts(reconciliation):
+    return {row['Account Code']: row for row in reconciliation.accounts}
+
+
+@pytest.fixture
+def reconciliation():
+    return reconcile(_store())
+
+
+def test_totals_and_opening_balance(reconciliation):
+    cash = _accounts(reconciliation)['1000']
+
+    assert list(reconciliation.accounts.columns) == ACCOUNT_COLUMNS
+    assert (cash['Transactions'], cash['Total Debit'], cash['Total Credit']) == (6, 70, 20)
+    assert cash['Net Movement'] == 50
+    # 150 reported after a 50 debit
+    assert cash['Opening Balance'] == 100
+    assert cash['Closing Balance'] == 150.004
+    assert cash['Computed Closing'] == 150
+    assert cash['Difference'] == pytest.approx(0.004)
+
+
+def test_a_wrong_figure_breaks_where_it_appears_and_where_it_returns(reconciliation):
+    breaks = list(reconciliation.breaks)
+
+    assert list(reconciliation.breaks.columns) == BREAK_COLUMNS
+    assert [(row['Output Row'], row['Reference']) for row in breaks] == [(4, 'R4'), (5, 'R5')]
+    # The running balance restarts from the reported figure
+    assert (breaks[0]['Reported Balance'], breaks[0]['Computed Balance']) == (999, 140)
+    assert (breaks[1]['Reported Balance'], breaks[1]['Computed Balance']) == (145, 1004)
+    assert breaks[1]['Difference'] == -859
+    # 150.004 after 145 + 5 is within the default tolerance
+    assert _accounts(reconciliation)['1000']['Balance Breaks'] == 2
+
+
+def test_auto_picks_the_side_with_fewer_breaks(reconciliation):
+    accounts = _accounts(reconciliation)
+
+    assert accounts['1000']['Balance Side'] == 'debit'
+    assert accounts['2000']['Balance Side'] == 'credit'
+    assert accounts['2000']['Balance Breaks'] == 0
+    assert accounts['2000']['Opening Balance'] == 0
+    # A tie goes to debit-normal; no balances, no side
+    assert accounts['4000']['Balance Side'] == 'debit'
+    assert accounts['5000']['Balance Side'] == ''
+    assert accounts['5000']['Opening Balance'] == accounts['5000']['Computed Closing'] == ''
+
+
+def test_a_fixed_side(reconciliation):
+    as_debit = _accounts(reconcile(_store(), {'balance_side': 'debit'}))
+    as_credit = _accounts(reconcile(_store(), {'balance_side': 'credit'}))
+
+    assert as_debit['2000']['Balance Breaks'] == 2
+    assert as_credit['2000']['Balance Breaks'] == 0
+    assert as_credit['1000']['Balance Breaks'] > 2
+    with pytest.raises(ValueError, match="Unknown balance_side 'asset'"):
+        reconcile(_store(), {'balance_side': 'asset'})
+
+
+def test_dr_cr_signed_balances(reconciliation):
+    signed = _accounts(reconciliation)['3000']
+
+    assert (signed['Opening Balance'], signed['Closing Balance']) == (0, -40)
+    assert signed['Balance Breaks'] == 0 and signed['Balance Side'] == 'debit'
+    # Plain amounts do not read the suffixes
+    assert _accounts(reconcile(_store(), {'amount_format': 'plain'}))['3000']['Closing Balance'] == ''
+
+
+def test_the_tolerance():
+    assert _accounts(reconcile(_store(), {'balance_tolerance': 0.001}))['1000']['Balance Breaks'] == 3
+
+
+def test_sheets_keep_equal_codes_apart():
+    rows = [('1000', 10, '', 10), ('1000', 10, '', 500)]
+
+    reconciliation = reconcile(_store(rows, Sheet=['Jan', 'Feb']))
+
+    assert [(row['Sheet'], row['Account Code'], row['Opening Balance']) for row in reconciliation.accounts] == [
+        ('Jan', '1000', 0), ('Feb', '1000', 490)]
+    assert len(reconciliation.breaks) == 0
+
+
+def test_reports_and_summary(reconciliation, tmp_path):
+    paths = reconciliation.write(str(tmp_path / 'out.csv'))
+
+    assert [path.rsplit('/', 1)[-1] for path in paths] == ['out.accounts.csv', 'out.balance_breaks.csv']
+    assert open(paths[1], encoding='utf-8').read().count('\n') == 3
+    assert reconciliation.summary() == "⚖ Reconciled 5 accounts: 2 balance breaks in 1 accounts"
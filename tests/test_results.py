@@ -0,0 +1,91 @@
+import pickle
+
+import pytest
+
+from universal_results import OUTPUT_COLUMNS, TransactionStore
+
+ROWS = [
+    {'Account Code': '1000', 'Account Name': 'CASH', 'Reference': 'A', 'Debit': 10},
+    {'Account Code': '2000', 'Account Name': 'DEBTORS', 'Reference': 'B', 'Credit': 5.5},
+    {'Account Code': '1000', 'Account Name': 'CASH', 'Reference': 'C', 'Debit': 1},
+]
+
+
+def _expected(row):
+    return {col: row.get(col, '') for col in OUTPUT_COLUMNS}
+
+
+@pytest.fixture
+def store():
+    store = TransactionStore()
+    for row in ROWS:
+        store.append(row)
+    return store
+
+
+def test_rows_read_back_as_dicts(store):
+    expected = [_expected(row) for row in ROWS]
+
+    assert len(store) == 3 and store
+    assert list(store) == expected
+    assert store[0] == expected[0] and store[-1] == expected[2]
+    assert store[1:] == expected[1:]
+    with pytest.raises(IndexError):
+        store[3]
+    assert not TransactionStore()
+
+
+def test_account_columns_are_dictionary_encoded(store):
+    assert store.column('Account Code') == ['1000', '2000', '1000']
+    assert store.distinct('Account Code') == ['1000', '2000']
+    assert store._data['Account Code'].values == ['1000', '2000']
+    assert list(store._data['Account Code'].codes) == [0, 1, 0]
+
+
+def test_from_columns_matches_appended_rows(store):
+    built = TransactionStore.from_columns({col: store.column(col) for col in OUTPUT_COLUMNS})
+
+    assert list(built) == list(store)
+    with pytest.raises(ValueError):
+        TransactionStore.from_columns({'Account Code': ['1'], 'Date': []})
+
+
+def test_extend_remaps_the_dictionary_codes(store):
+    other = TransactionStore()
+    other.append({'Account Code': '3000', 'Reference': 'D'})
+    other.append({'Account Code': '1000', 'Reference': 'E'})
+
+    store.extend(other)
+    store.extend([{'Account Code': '2000', 'Reference': 'F'}])
+
+    assert store.column('Account Code') == ['1000', '2000', '1000', '3000', '1000', '2000']
+    assert store.column('Reference') == ['A', 'B', 'C', 'D', 'E', 'F']
+    assert store._data['Account Code'].values == ['1000', '2000', '3000']
+
+
+def test_a_source_file_column(store):
+    store.insert_constant_column(0, 'Source File', 'a.xlsx')
+    store.append({'Source File': 'b.xlsx', 'Reference': 'D'})
+
+    assert store.columns[0] == 'Source File'
+    assert store.column('Source File') == ['a.xlsx'] * 3 + ['b.xlsx']
+    assert store[3]['Reference'] == 'D'
+
+
+def test_to_dataframe(store):
+    df = store.to_dataframe()
+
+    assert list(df.columns) == OUTPUT_COLUMNS
+    assert df['Account Code'].dtype == 'category'
+    assert df['Account Code'].tolist() == ['1000', '2000', '1000']
+    assert df['Debit'].tolist() == [10, '', 1]
+    assert list(store.to_dataframe(['Reference', 'Missing']).columns) == ['Reference', 'Missing']
+    assert TransactionStore().to_dataframe().empty
+
+
+def test_pickles_for_process_pools(store):
+    copy = pickle.loads(pickle.dumps(store))
+    copy.append({'Account Code': '4000'})
+
+    assert list(copy)[:3] == list(store)
+    assert copy.column('Account Code')[-1] == '4000'
@@ -0,0 +1,157 @@
+import http.client
+import json
+import socket
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import universal_service
+from synthetic_ledger import ledger_config
+from test_cli import EXPECTED_CSV, LEDGER
+from universal_service import CleaningService, ServiceRequestHandler, _host_name, _is_socket
+
+TOKEN = 'secret-token'
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / 'root'
+    root.mkdir()
+    (root / 'config.json').write_text(json.dumps(dict(ledger_config(), cache_enabled=False)))
+    return root
+
+
+@pytest.fixture
+def service(root):
+    service = CleaningService(workers=1, config_path=str(root / 'config.json'), root=str(root))
+    yield service
+    service.shutdown()
+
+
+@pytest.fixture
+def ledger(write_workbook):
+    return write_workbook(LEDGER)
+
+
+def _wait(job):
+    for _ in range(100):
+        _, done = job.wait_events(len(job.events), 0.2)
+        if done:
+            return job
+    raise AssertionError(f"job still {job.state}")
+
+
+def test_host_names():
+    assert _host_name('localhost:8765') == 'localhost'
+    assert _host_name('[::1]:8765') == '::1'
+    assert _host_name('::1') == '::1'
+    assert _host_name('evil.example') == 'evil.example'
+
+
+def test_only_sockets_are_replaced(tmp_path, capsys):
+    path = tmp_path / 's.sock'
+    assert not _is_socket(str(path))
+    path.write_text('keep me')
+
+    assert universal_service.main(['--socket', str(path)]) == 2
+
+    assert path.read_text() == 'keep me'
+    assert 'not a socket' in capsys.readouterr().err
+    listener = socket.socket(socket.AF_UNIX)
+    try:
+        listener.bind(str(tmp_path / 'real.sock'))
+        assert _is_socket(str(tmp_path / 'real.sock'))
+    finally:
+        listener.close()
+
+
+@pytest.mark.parametrize('overrides', [
+    {'cache_dir': '/tmp/x'}, {'checkpoint_dir': '/tmp/x'}, {'metrics_path': '/tmp/x'},
+    {'profile_path': '/tmp/x'}, {'profile': True}, {'report_dir': '/tmp/x'},
+])
+def test_config_may_not_name_paths(service, ledger, root, overrides):
+    with pytest.raises(ValueError, match="may not set"):
+        service.submit({'inputs': ledger, 'output': str(root / 'out.csv'), 'config': overrides})
+
+
+@pytest.mark.parametrize('request_fields, message', [
+    ({'output': '/elsewhere/out.csv'}, 'must be inside'),
+    ({'format': 'docx'}, "'format' must be one of"),
+    ({'inputs': 'missing.xlsx'}, 'File not found'),
+    ({'config': ['not', 'a', 'dict']}, "'config' must be a JSON object"),
+])
+def test_bad_requests(service, ledger, root, request_fields, message):
+    request = dict({'inputs': ledger, 'output': str(root / 'out.csv')}, **request_fields)
+
+    with pytest.raises(ValueError, match=message):
+        service.submit(request)
+
+
+def test_an_output_may_not_replace_its_input(service, root):
+    ledger = root / 'ledger.csv'
+    ledger.write_text('a,b\n')
+
+    with pytest.raises(ValueError, match='overwrite the input'):
+        service.submit({'inputs': str(ledger), 'output': str(ledger)})
+
+
+def test_a_job_writes_its_output_and_events(service, ledger, root):
+    output = root / 'out.csv'
+
+    job = _wait(service.submit({'inputs': ledger, 'output': str(output)}))
+
+    assert job.state == 'done' and job.outputs == [str(output)]
+    assert output.read_text(encoding='utf-8').replace('\r\n', '\n') == EXPECTED_CSV
+    events = [event['event'] for event in job.events]
+    assert events[:2] == ['queued', 'started'] and events[-1] == 'finished'
+    assert service.counts() == {'queued': 0, 'running': 0}
+
+
+@pytest.fixture
+def server(service):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ServiceRequestHandler)
+    server.service = service
+    server.token = TOKEN
+    server.check_host = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _request(server, method, path, body=None, **headers):
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=10)
+    headers = dict({'Authorization': f'Bearer {TOKEN}', 'Content-Type': 'application/json'}, **headers)
+    connection.request(method, path, json.dumps(body) if body is not None else None, headers)
+    response = connection.getresponse()
+    payload = json.loads(response.read() or b'null')
+    connection.close()
+    return response.status, payload
+
+
+@pytest.mark.parametrize('headers, status', [
+    ({'Authorization': 'Bearer wrong'}, 401),
+    ({'Authorization': ''}, 401),
+    ({'Origin': 'http://example.com'}, 403),
+    ({'Host': 'evil.example:8765'}, 403),
+])
+def test_unsafe_requests_are_refused(server, headers, status):
+    assert _request(server, 'GET', '/health', **headers)[0] == status
+
+
+def test_jobs_over_http(server, ledger, root):
+    status, health = _request(server, 'GET', '/health')
+    assert status == 200 and health['workers'] == 1
+
+    request = {'inputs': [ledger], 'output': str(root / 'out.csv')}
+    assert _request(server, 'POST', '/jobs', request, **{'Content-Type': 'text/plain'})[0] == 415
+    status, job = _request(server, 'POST', '/jobs', request)
+    assert status == 202 and job['url'] == f"/jobs/{job['id']}"
+
+    _wait(server.service.get(job['id']))
+    status, job = _request(server, 'GET', job['url'])
+    assert status == 200 and job['state'] == 'done'
+    assert _request(server, 'GET', '/jobs/unknown')[0] == 404
+    assert _request(server, 'POST', '/jobs', {'inputs': [ledger], 'output': '/elsewhere.csv'})[0] == 400
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from synthetic_ledger import ledger_config, ledger_rows
+from universal_batch import (BATCH_COLUMNS, SHEET_COLUMN, SOURCE_COLUMN, batch_columns,
+                             clean_files, resolve_workers, run_batch, select_sheets)
+from universal_engine import OUTPUT_COLUMNS
+
+CONFIG = dict(ledger_config(), cache_enabled=False)
+
+
+@pytest.fixture
+def workbook(write_workbook):
+    """One ledger split over three period sheets of different sizes"""
+    return write_workbook(sheets={
+        name: list(ledger_rows(random.Random(seed), rows, accounts=4))
+        for name, seed, rows in (('Jan', 1, 60), ('Feb', 2, 300), ('Mar', 3, 20))})
+
+
+def test_sheet_selection(workbook):
+    assert select_sheets(workbook, 'first') == [(None, 0)]
+    assert [name for name, _ in select_sheets(workbook, 'all')] == ['Jan', 'Feb', 'Mar']
+    assert [name for name, _ in select_sheets(workbook, ' Mar, Jan ')] == ['Mar', 'Jan']
+    assert [name for name, _ in select_sheets(workbook, ['Feb'])] == ['Feb']
+    with pytest.raises(ValueError, match='Sheet not found: Apr'):
+        select_sheets(workbook, 'Jan,Apr')
+
+
+def test_columns_and_workers():
+    assert batch_columns({}) == BATCH_COLUMNS
+    assert batch_columns({'sheets': 'all'}) == [SOURCE_COLUMN, SHEET_COLUMN] + OUTPUT_COLUMNS
+    assert batch_columns({'sheets': 'all'}, merged=False) == [SHEET_COLUMN] + OUTPUT_COLUMNS
+    assert resolve_workers(3) == 3
+    assert resolve_workers(0) >= 1
+
+
+def _sheet_results(workbook, sheets, workers):
+    config = dict(CONFIG, sheets=sheets)
+    [(_, processed_data, error)] = clean_files([workbook], config, workers=workers)
+    assert error is None
+    return processed_data
+
+
+def test_sheets_merge_in_sheet_order_whatever_finishes_first(workbook):
+    serial = _sheet_results(workbook, 'all', workers=1)
+    pooled = _sheet_results(workbook, 'all', workers=3)
+
+    assert list(pooled) == list(serial)
+    sheets = serial.column(SHEET_COLUMN)
+    assert list(dict.fromkeys(sheets)) == ['Jan', 'Feb', 'Mar']
+    assert sheets == sorted(sheets, key=['Jan', 'Feb', 'Mar'].index)
+    assert set(serial.column(SOURCE_COLUMN)) == {'ledger.xlsx'}
+
+
+def test_a_sheet_gives_what_it_gives_on_its_own(workbook):
+    merged = _sheet_results(workbook, 'all', workers=1)
+    march = _sheet_results(workbook, 'Mar', workers=1)
+
+    assert len(march) and set(march.column(SHEET_COLUMN)) == {'Mar'}
+    assert [row for row in merged if row[SHEET_COLUMN] == 'Mar'] == list(march)
+
+
+def test_a_missing_sheet_fails_the_file(workbook):
+    merged, failures = run_batch([workbook], dict(CONFIG, sheets='Apr'), workers=1)
+
+    assert len(merged) == 0
+    assert 'Apr' in failures[workbook]
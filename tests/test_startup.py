@@ -0,0 +1,57 @@
+"""The desktop app starts without the heavy libraries"""
+import json
+import subprocess
+import sys
+
+import startup_time
+import universal_data_clean
+from universal_data_clean import AuditorAppUniversal
+
+
+def test_importing_the_app_leaves_the_heavy_libraries_unloaded():
+    script = ("import sys, universal_data_clean; "
+              f"print([name for name in {startup_time.HEAVY_MODULES!r} if name in sys.modules])")
+
+    completed = subprocess.run([sys.executable, '-c', script], cwd=startup_time.ROOT,
+                               capture_output=True, text=True, check=True)
+
+    assert completed.stdout.strip() == '[]'
+
+
+def test_parse_importtime():
+    stderr = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:       300 |       2500 |   universal_config
+import time:      1000 |       4000 | universal_data_clean
+some other line
+"""
+
+    assert startup_time.parse_importtime(stderr) == [
+        ('_io', 120, 120, 2), ('universal_config', 300, 2500, 1), ('universal_data_clean', 1000, 4000, 0)]
+
+
+def test_the_check_passes_and_writes_json(tmp_path):
+    output = tmp_path / 'startup.json'
+
+    assert startup_time.main(['--no-window', '--repeat', '1', '--check',
+                              '--max-import-ms', '100000', '-o', str(output)]) == 0
+
+    results = json.loads(output.read_text())
+    assert results['heavy_imports'] == []
+    assert results['import_ms'] > 0 and 'universal_config' in results['direct_imports_ms']
+    assert 'first_window_s' not in results
+
+
+def test_the_engine_loads_on_a_background_thread(monkeypatch):
+    loaded = []
+    monkeypatch.setattr(universal_data_clean.importlib, 'import_module', loaded.append)
+    app = AuditorAppUniversal.__new__(AuditorAppUniversal)
+    messages = []
+    app.log_message = lambda message, kind=None: messages.append(message)
+
+    app._warm_up_engine()
+    app.warm_up_thread.join(5)
+
+    assert loaded == list(universal_data_clean.ENGINE_MODULES)
+    assert messages[0].startswith('⚙️ Engine ready')
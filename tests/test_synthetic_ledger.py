@@ -0,0 +1,83 @@
+"""The benchmark ledger generator and harness"""
+import json
+import random
+
+import openpyxl
+import pytest
+
+import run_benchmarks
+from synthetic_ledger import LAYOUT, ledger_config, ledger_rows, make_ledger
+from universal_engine import create_engine
+
+METHOD = {'label': 'method_1_hits', 'code_column': 'method_2_hits', 'pattern': 'method_3_hits'}
+
+
+def test_rows_accounts_and_width():
+    rows = list(ledger_rows(random.Random(1), 300, accounts=3, width=12))
+
+    # Headings, then a header, 100 transactions and a totals row per account
+    assert len(rows) == 1 + 3 * 102
+    assert {len(row) for row in rows} == {12}
+    assert rows[0][LAYOUT['debit']] == 'DEBIT'
+    assert [rows[i][LAYOUT['description']] for i in (102, 204, 306)] == ['Total'] * 3
+    # Never narrower than the ledger layout
+    assert {len(row) for row in ledger_rows(random.Random(1), 10, accounts=1, width=2)} == {len(LAYOUT)}
+
+
+def test_the_same_seed_gives_the_same_rows():
+    assert list(ledger_rows(random.Random(7), 50)) == list(ledger_rows(random.Random(7), 50))
+    assert list(ledger_rows(random.Random(7), 50)) != list(ledger_rows(random.Random(8), 50))
+
+
+@pytest.mark.parametrize('header_format', sorted(METHOD))
+def test_each_header_format_is_found_by_its_method(header_format):
+    rows = list(ledger_rows(random.Random(2), 40, accounts=4, header_formats=(header_format,)))
+    engine = create_engine(dict(ledger_config(), metrics=True, cache_enabled=False))
+
+    processed_data = engine.process_rows(rows)
+
+    # Every transaction is kept, under its own account; totals are
+    # skipped. The column headings come before any account header.
+    codes = processed_data.column('Account Code')
+    assert codes[0] == 'Unknown' and processed_data[0]['Debit'] == 'DEBIT'
+    assert len(codes) == 1 + 40
+    assert len(set(codes[1:])) == 4 and 'Unknown' not in codes[1:]
+    assert engine.metrics.counters[METHOD[header_format]] == 4
+    assert not (set(METHOD.values()) - {METHOD[header_format]}) & set(engine.metrics.counters)
+
+
+def test_make_ledger_writes_a_sheet_per_period(tmp_path):
+    path = make_ledger(str(tmp_path / 'ledger.xlsx'), rows=20, accounts=2, width=10, sheets=2)
+
+    workbook = openpyxl.load_workbook(path)
+    assert workbook.sheetnames == ['Period 1', 'Period 2']
+    assert workbook['Period 1'].max_row == 1 + 2 * 12
+    assert workbook['Period 1'].max_column == 10
+
+
+def test_speedups_pair_the_engines_per_workbook():
+    scenarios = [
+        {'rows': 10, 'reader': 'openpyxl', 'engine': 'stream', 'classify_s': 3.0},
+        {'rows': 10, 'reader': 'openpyxl', 'engine': 'vectorized', 'classify_s': 2.0},
+        {'rows': 20, 'reader': 'openpyxl', 'engine': 'stream', 'classify_s': 1.0},
+    ]
+
+    assert run_benchmarks.speedups(scenarios) == [
+        {'rows': 10, 'reader': 'openpyxl', 'classify_speedup': 1.5}]
+
+
+def test_the_harness_writes_json_results(tmp_path):
+    output = tmp_path / 'bench.json'
+
+    assert run_benchmarks.main(['--rows', '30', '--accounts', '3', '--width', '10',
+                                '--readers', 'openpyxl', '-o', str(output)]) == 0
+
+    results = json.loads(output.read_text())
+    assert results['version'] == run_benchmarks.RESULTS_VERSION
+    assert [s['engine'] for s in results['scenarios']] == ['stream', 'vectorized']
+    for scenario in results['scenarios']:
+        # The transactions and the column headings row
+        assert scenario['transactions'] == 30 + 1
+        assert {'ingest_s', 'classify_s', 'export_s', 'end_to_end_s',
+                'end_to_end_peak_rss_mb'} <= set(scenario)
+    assert [s['rows'] for s in results['speedups']] == [30]
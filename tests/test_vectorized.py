@@ -0,0 +1,79 @@
+import random
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from synthetic_ledger import ledger_config, ledger_rows
+from universal_engine import LedgerCleanerEngine
+from universal_vectorized import VectorizedLedgerEngine
+
+CONFIG = dict(ledger_config(), cache_enabled=False)
+
+
+def _clean(engine_class, rows, config=CONFIG):
+    return list(engine_class(config).process_rows(rows))
+
+
+def _assert_same(expected, actual):
+    assert actual == expected
+    # 1200 and 1200.0 compare equal but export differently
+    assert [{col: type(value) for col, value in row.items()} for row in actual] == \
+        [{col: type(value) for col, value in row.items()} for row in expected]
+
+
+@pytest.mark.parametrize('amount_format', ['accounting', 'plain'])
+@pytest.mark.parametrize('seed', [1, 2])
+def test_same_output_as_the_stream_engine(seed, amount_format):
+    rows = [[('' if cell is None else cell) for cell in row]
+            for row in ledger_rows(random.Random(seed), 3000, accounts=40, width=14)]
+    config = dict(CONFIG, amount_format=amount_format)
+
+    expected = _clean(LedgerCleanerEngine, rows, config)
+
+    assert len(expected) > 2500
+    _assert_same(expected, _clean(VectorizedLedgerEngine, rows, config))
+    frame = pd.DataFrame(rows, dtype=object)
+    _assert_same(expected, list(VectorizedLedgerEngine(config).process_frame(frame)))
+
+
+# Columns as in synthetic_ledger.LAYOUT: date, journal, reference, description,
+# account code, account name, debit, credit, balance
+RAW_ROWS = [
+    ['ACCOUNT CODE: 10000-A00 CASH AT BANK', np.nan, None],
+    [datetime(2024, 1, 2), 'GJ1', np.nan, 'Deposit', None, pd.NA, 1200, np.nan, 1200],
+    [datetime(2024, 1, 3), None, 'INV-2', pd.NaT, np.nan, None, None, '1,050.50', 149.5],
+    [pd.NaT, 'GJ9', 'INV-3', 'No date', None, None, 5, None, 154.5],
+    [None, np.nan, None, None, '20000-B01', np.nan],
+    [datetime(2024, 1, 4), 'GJ3', pd.NA, 'Credit note', None, None, '(75.25)'],
+    [datetime(2024, 1, 5), 'GJ4', 'RC-9'],
+]
+
+
+def test_missing_cells_are_blanks_in_both_engines():
+    expected = _clean(LedgerCleanerEngine, RAW_ROWS)
+    blanked = [['' if cell is None or cell is pd.NA or cell != cell else cell for cell in row]
+               for row in RAW_ROWS]
+
+    assert expected == _clean(LedgerCleanerEngine, blanked)
+    _assert_same(expected, _clean(VectorizedLedgerEngine, RAW_ROWS))
+    # The credit note has neither a reference nor a positive amount
+    assert [(row['Account Code'], row['Account Name'], row['Reference'], row['Debit'], row['Credit'])
+            for row in expected] == [('10000-A00', 'CASH AT BANK', '', 1200, ''),
+                                     ('10000-A00', 'CASH AT BANK', 'INV-2', '', 1050.5),
+                                     ('20000-B01', 'CASH AT BANK', 'RC-9', '', '')]
+
+
+def test_cells_holding_the_join_separator():
+    rows = [
+        ['ACCOUNT CODE: 10000-A00 first \x00 name'],
+        [datetime(2024, 1, 2), 'GJ1', 'A\x00B', 'x', None, None, 10, None, 10],
+        ['ACCOUNT CODE: 10000-A00 first \x00 other'],
+        [datetime(2024, 1, 3), 'GJ2', 'C', 'y', None, None, 20, None, 30],
+    ]
+
+    expected = _clean(LedgerCleanerEngine, rows)
+
+    assert [row['Account Name'] for row in expected] == ['first \x00 name', 'first \x00 other']
+    _assert_same(expected, _clean(VectorizedLedgerEngine, rows))
@@ -0,0 +1,84 @@
+import math
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from universal_engine import write_output
+from universal_results import OUTPUT_COLUMNS, TransactionStore
+from universal_writers import to_typed_frame, write_csv_chunked
+
+ROWS = [
+    {'Account Code': '1000', 'Account Name': 'CASH', 'Date': datetime(2024, 1, 2), 'Reference': 7,
+     'Debit': 1200, 'Credit': '', 'Balance': '1,200.00 DR'},
+    {'Account Code': '1000', 'Account Name': 'CASH', 'Date': '2024-01-03', 'Reference': 'INV-2',
+     'Debit': '', 'Credit': '1,050.50', 'Balance': '149.50 CR'},
+    {'Account Code': '2000', 'Account Name': 'DEBTORS', 'Date': 45300, 'Reference': '',
+     'Debit': '(75.25)', 'Credit': ' ', 'Balance': -75.25},
+]
+
+
+def _store(rows=ROWS):
+    store = TransactionStore()
+    for row in rows:
+        store.append(row)
+    return store
+
+
+def test_typed_columns():
+    df = to_typed_frame(_store(), OUTPUT_COLUMNS)
+
+    assert df['Debit'].dtype == 'float64' and df['Credit'].dtype == 'float64'
+    assert df['Debit'].tolist()[0] == 1200 and math.isnan(df['Debit'][1])
+    assert df['Debit'][2] == -75.25
+    # Debit/Credit ignore the side suffix; Balance is signed by it
+    assert df['Credit'][1] == 1050.5 and math.isnan(df['Credit'][2])
+    assert df['Balance'].tolist() == [1200, -149.5, -75.25]
+    # Excel serial 45300 is 2024-01-09
+    assert df['Date'].tolist() == [pd.Timestamp(2024, 1, 2), pd.Timestamp(2024, 1, 3),
+                                   pd.Timestamp(2024, 1, 9)]
+    assert df['Account Code'].dtype == 'category'
+    assert list(df['Account Code'].cat.categories) == ['1000', '2000']
+    assert df['Reference'].tolist() == ['7', 'INV-2', '']
+
+
+def test_columns_with_other_text_stay_text():
+    rows = [dict(ROWS[0], Debit='see note', Date='not a date'), ROWS[1]]
+
+    df = to_typed_frame(rows, OUTPUT_COLUMNS)
+
+    assert df['Debit'].tolist() == ['see note', '']
+    assert df['Date'].tolist() == ['not a date', '2024-01-03']
+    # The other columns are typed as usual
+    assert df['Credit'].dtype == 'float64'
+
+
+def test_arrow_export_needs_pyarrow(tmp_path):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        with pytest.raises(ImportError, match='pip install pyarrow'):
+            write_output(_store(), str(tmp_path / 'out.parquet'))
+    else:
+        write_output(_store(), str(tmp_path / 'out.parquet'))
+        df = pd.read_parquet(tmp_path / 'out.parquet')
+        assert df['Balance'].tolist() == [1200, -149.5, -75.25]
+
+
+def test_csv_values_are_written_as_they_are(tmp_path):
+    path = tmp_path / 'out.csv'
+
+    assert write_csv_chunked(_store(), str(path), OUTPUT_COLUMNS, chunk_size=2) == 3
+
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert lines[0] == ','.join(OUTPUT_COLUMNS)
+    assert lines[1] == '1000,CASH,2024-01-02,,7,,1200,,"1,200.00 DR"'
+    assert lines[3].split(',')[2] == '45300'
+
+
+def test_csv_rows_from_a_generator(tmp_path):
+    rows = ({'Reference': f'R{i}'} for i in range(25))
+    path = tmp_path / 'out.csv'
+
+    assert write_csv_chunked(rows, str(path), ['Reference', 'Debit'], chunk_size=10) == 25
+    assert path.read_text(encoding='utf-8').split() == ['Reference,Debit'] + [f'R{i},' for i in range(25)]
@@ -0,0 +1,97 @@
+import datetime
+import math
+import re
+from functools import lru_cache
+
+# "accounting": also read "1,234.56", "$1 500", "(500.00)" and "500.00 CR" as numbers
+# "plain": only what float(str(value)) accepts
+AMOUNT_FORMATS = ("accounting", "plain")
+
+# Cell types whose str() can never parse as a number
+_NEVER_AMOUNT = (bool, datetime.date, datetime.time, datetime.timedelta)
+
+# Optional sign and currency symbol, a number with comma or space thousands
+# separators (or none), all optionally in parentheses, then an optional
+# DR/CR side marker
+_ACCOUNTING_AMOUNT = re.compile(r'''
+    \s*(?P<open>\()?\s*
+    (?P<sign>[+-])?\s*
+    (?:[$€£¥]|RM)?\s*
+    (?P<number>\d{1,3}(?P<sep>[, ])\d{3}(?:(?P=sep)\d{3})*(?:\.\d*)?|\d+(?:\.\d*)?|\.\d+)
+    \s*(?P<close>\))?
+    \s*(?P<side>DR|CR)?\.?\s*''', re.IGNORECASE | re.VERBOSE)
+
+
+def is_missing(value):
+    """Whether a cell holds nothing at all: None, NaN or NaT (or pd.NA).
+
+    Both engines read such cells as '' (a blank), whichever way the grid
+    was built.
+    """
+    if value is None:
+        return True
+    try:
+        return bool(value != value)
+    except TypeError:
+        # pd.NA compares as NA, which has no truth value
+        return True
+
+
+@lru_cache(maxsize=65536)
+def parse_amount_text(text, accounting=True, signed_side=True):
+    """parse_amount for a str (cached, as amount text repeats a lot)"""
+    try:
+        return float(text)
+    except ValueError:
+        if not accounting:
+            return None
+    match = _ACCOUNTING_AMOUNT.fullmatch(text)
+    if match is None or bool(match['open']) != bool(match['close']):
+        return None
+    if match['open'] and match['sign']:
+        # "(-5)" marks the amount negative twice: unclear, so not an amount
+        return None
+    amount = float(match['number'].replace(match['sep'] or ',', ''))
+    if match['open'] or match['sign'] == '-':
+        amount = -amount
+    side = match['side']
+    if side and signed_side:
+        amount = -abs(amount) if side.upper() == 'CR' else abs(amount)
+    return amount
+
+
+def parse_amount(value, accounting=True, signed_side=True):
+    """The number a cell holds, or None if it is not an amount.
+
+    With accounting=False only what float(str(value)) accepts is an amount.
+    With accounting=True, comma or space thousands separators, a currency
+    symbol, parentheses negatives and a DR/CR suffix are understood too;
+    a sign inside parentheses ("(-5)") is not. signed_side makes CR amounts
+    negative and DR ones positive (balance columns); otherwise the suffix
+    only names the side (debit and credit columns) and is ignored.
+    """
+    cell_type = type(value)
+    if cell_type is float or cell_type is int:
+        return float(value)
+    if cell_type is str:
+        return parse_amount_text(value, accounting, signed_side)
+    if isinstance(value, _NEVER_AMOUNT):
+        return None
+    try:
+        return float(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def typed_amount(value, accounting=True, signed_side=True):
+    """value as it goes into the output: amount text becomes a float.
+
+    Numbers, blanks and text that is not a finite amount are returned
+    unchanged.
+    """
+    if type(value) is not str or not value:
+        return value
+    amount = parse_amount_text(value, accounting, signed_side)
+    if amount is None or not math.isfinite(amount):
+        return value
+    return amount
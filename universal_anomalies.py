@@ -0,0 +1,244 @@
+import math
+import os
+import re
+from datetime import date
+
+from universal_amounts import parse_amount
+from universal_config import DEFAULT_CONFIG
+from universal_reconcile import GROUP_COLUMNS
+from universal_results import TransactionStore
+
+# Output Row is the transaction's row in the cleaned output (1 = first transaction)
+FLAG_COLUMNS = ['Output Row', 'Account Code', 'Account Name', 'Date', 'Reference', 'Debit',
+                'Credit', 'Test', 'Detail']
+
+EXACT_DUPLICATE = 'Exact duplicate'
+NEAR_DUPLICATE = 'Near duplicate'
+ROUND_AMOUNT = 'Round amount'
+WEEKEND_POSTING = 'Weekend posting'
+TESTS = (EXACT_DUPLICATE, NEAR_DUPLICATE, ROUND_AMOUNT, WEEKEND_POSTING)
+
+DIGITS = range(1, 10)
+BENFORD_COLUMNS = (['Account Code', 'Account Name', 'Amounts', 'MAD', 'Conformity']
+                   + [f'Digit {digit} %' for digit in DIGITS])
+# Expected share of each first digit
+BENFORD_EXPECTED = [math.log10(1 + 1 / digit) for digit in DIGITS]
+# Nigrini's first-digit MAD bands: (upper bound, conformity)
+BENFORD_CONFORMITY = ((0.006, 'Close'), (0.012, 'Acceptable'), (0.015, 'Marginal'),
+                      (math.inf, 'Nonconformity'))
+GRADES = {label for _, label in BENFORD_CONFORMITY}
+# Amounts below this have no meaningful first digit for the test
+BENFORD_MIN_AMOUNT = 10
+# Account Code of the Benford row over every account
+ALL_ACCOUNTS = '(all accounts)'
+
+_INF = math.inf
+
+_WEEKDAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+# Case, spaces and punctuation do not tell references apart ("INV-001" = "inv 001")
+_REFERENCE_NOISE = re.compile(r'[\W_]+')
+
+
+def _amount(value, accounting):
+    """A debit or credit cell as a finite amount, 0.0 for blanks and non-amounts"""
+    if value == '':
+        return 0.0
+    amount = parse_amount(value, accounting, signed_side=False)
+    return amount if amount is not None and math.isfinite(amount) else 0.0
+
+
+def _day(value):
+    """Day number (date.toordinal) of ISO date text, or None"""
+    if isinstance(value, str) and len(value) >= 10:
+        try:
+            return date.fromisoformat(value[:10]).toordinal()
+        except ValueError:
+            return None
+    return None
+
+
+def _first_digit(amount):
+    """First significant digit ('%e' has no log10 rounding trouble at powers of ten)"""
+    return int(('%e' % amount)[0])
+
+
+def benford_mad(counts):
+    """Mean absolute deviation of first-digit shares (counts[1:10]) from Benford's law"""
+    total = sum(counts[1:])
+    return sum(abs(counts[digit] / total - expected)
+               for digit, expected in zip(DIGITS, BENFORD_EXPECTED)) / len(BENFORD_EXPECTED)
+
+
+def benford_conformity(mad):
+    return next(label for bound, label in BENFORD_CONFORMITY if mad <= bound)
+
+
+class AnomalyReport:
+    """Flagged transactions and per-account Benford results (see detect_anomalies)"""
+
+    def __init__(self, flags, benford):
+        self.flags = flags
+        self.benford = benford
+
+    @staticmethod
+    def report_paths(output_path):
+        """(flags, Benford) paths next to output_path, in its format"""
+        stem, extension = os.path.splitext(output_path)
+        return f"{stem}.anomalies{extension}", f"{stem}.benford{extension}"
+
+    def write(self, output_path):
+        """Write both reports next to output_path; returns their paths"""
+        # Imported here: universal_engine pulls in the readers and pandas writers
+        from universal_engine import write_output
+
+        paths = self.report_paths(output_path)
+        write_output(self.flags, paths[0])
+        write_output(self.benford, paths[1])
+        return paths
+
+    def counts(self):
+        """{test: flagged transactions}"""
+        counts = dict.fromkeys(TESTS, 0)
+        for test in self.flags.column('Test'):
+            counts[test] += 1
+        return counts
+
+    def summary(self):
+        counts = self.counts()
+        tested = [conformity for code, conformity in zip(self.benford.column('Account Code'),
+                                                        self.benford.column('Conformity'))
+                  if code != ALL_ACCOUNTS and conformity in GRADES]
+        # Only Nonconformity deviates; Marginal is close enough to be listed apart
+        deviating = tested.count('Nonconformity')
+        marginal = tested.count('Marginal')
+        return (f"🔎 Audit tests: {counts[EXACT_DUPLICATE]:,} exact duplicates, "
+                f"{counts[NEAR_DUPLICATE]:,} near duplicates, {counts[ROUND_AMOUNT]:,} round amounts, "
+                f"{counts[WEEKEND_POSTING]:,} weekend postings; {deviating:,} of {len(tested):,} "
+                f"accounts deviate from Benford's law ({marginal:,} marginal)")
+
+
+def detect_anomalies(processed_data, config=None):
+    """Flag duplicate and unusual postings in cleaned transactions.
+
+    One pass over the TransactionStore with hash indexes, so the cost
+    grows linearly with the number of transactions:
+    - exact duplicates: same account, date, reference, debit and credit
+      as an earlier transaction (indexed on all five);
+    - near duplicates: same account and amount (debit - credit) as an
+      earlier transaction, a reference that only differs in case, spaces
+      or punctuation, and a date up to "near_duplicate_days" away. The
+      amount-bucket index is keyed by day, so only the days in that
+      window are probed;
+    - round amounts: a debit or credit that is a multiple of
+      "round_amount_unit";
+    - weekend postings: dated on a Saturday or Sunday.
+    Transactions without an amount are not duplicate-tested. Merged and
+    multi-sheet outputs are indexed per source file and sheet.
+
+    It also counts the first digits of the debit and credit amounts of each
+    account (from BENFORD_MIN_AMOUNT up) and compares them with Benford's
+    law by mean absolute deviation. Accounts with fewer than
+    "benford_min_amounts" amounts are not graded.
+
+    Returns an AnomalyReport: one flags row per transaction and test, in
+    output order, and one Benford row per account plus one over all
+    accounts.
+    """
+    config = dict(DEFAULT_CONFIG, **(config or {}))
+    accounting = config.get("amount_format") == "accounting"
+    window = int(config.get("near_duplicate_days"))
+    # 0 turns the round amount test off (every amount % inf is itself)
+    round_unit = float(config.get("round_amount_unit")) or math.inf
+
+    group_columns = [col for col in GROUP_COLUMNS if col in processed_data.columns]
+    value_columns = group_columns + ['Account Code', 'Account Name', 'Date', 'Reference',
+                                     'Debit', 'Credit']
+    n_keys = len(group_columns) + 1
+    flags = TransactionStore(group_columns + FLAG_COLUMNS)
+    exact_index = {}
+    near_index = {}
+    digit_counts = {}
+    offsets = sorted(range(-window, window + 1), key=abs)
+
+    for output_row, values in enumerate(processed_data.iter_values(value_columns), 1):
+        key = values[:n_keys]
+        name, date_value, reference, debit, credit = values[n_keys:]
+        # Finite floats (most amounts after cleaning) are taken as they are
+        debit_amount = debit if type(debit) is float and -_INF < debit < _INF else _amount(debit, accounting)
+        credit_amount = credit if type(credit) is float and -_INF < credit < _INF else _amount(credit, accounting)
+        day = date_value.toordinal() if isinstance(date_value, date) else _day(date_value)
+        row_flags = []
+
+        if debit_amount or credit_amount:
+            # Exact duplicates
+            exact_key = key + (date_value, reference, debit_amount, credit_amount)
+            first_row = exact_index.setdefault(exact_key, output_row)
+            if first_row != output_row:
+                row_flags.append((EXACT_DUPLICATE, f"same as row {first_row:,}"))
+
+            # Near duplicates: amount bucket, probed day by day around this one
+            reference_text = str(reference)
+            normalised = (reference_text if reference_text.isalnum()
+                          else _REFERENCE_NOISE.sub('', reference_text)).upper()
+            if day is not None and normalised:
+                bucket_key = key + (debit_amount - credit_amount, normalised)
+                days = near_index.get(bucket_key)
+                if days is None:
+                    # Most buckets hold one transaction: nothing to probe
+                    near_index[bucket_key] = {day: output_row}
+                else:
+                    if first_row == output_row:
+                        for offset in offsets:
+                            other_row = days.get(day + offset)
+                            if other_row is not None:
+                                apart = ("same day" if not offset else
+                                         f"{abs(offset)} day{'s' if abs(offset) > 1 else ''} apart")
+                                row_flags.append((NEAR_DUPLICATE, f"row {other_row:,}, {apart}"))
+                                break
+                    days.setdefault(day, output_row)
+
+        # Round amounts and Benford first-digit counts
+        counts = digit_counts.get(key)
+        if counts is None:
+            counts = digit_counts[key] = [name, [0] * 10]
+        for amount in (debit_amount, credit_amount):
+            if amount > 0:
+                if amount % round_unit == 0:
+                    row_flags.append((ROUND_AMOUNT, f"{amount:,.0f} is a multiple of {round_unit:,g}"))
+                if amount >= BENFORD_MIN_AMOUNT:
+                    counts[1][_first_digit(amount)] += 1
+
+        # Weekend postings
+        if day is not None:
+            weekday = (day - 1) % 7
+            if weekday >= 5:
+                row_flags.append((WEEKEND_POSTING, _WEEKDAY_NAMES[weekday]))
+
+        for test, detail in row_flags:
+            flags.append_values(key[:-1] + (output_row, key[-1], name, date_value, reference,
+                                            debit, credit, test, detail))
+
+    return AnomalyReport(flags, _benford_report(digit_counts, group_columns, config))
+
+
+def _benford_report(digit_counts, group_columns, config):
+    min_amounts = int(config.get("benford_min_amounts"))
+    report = TransactionStore(group_columns + BENFORD_COLUMNS)
+    totals = [0] * 10
+    rows = [(key[:-1], key[-1], name, counts) for key, (name, counts) in digit_counts.items()]
+    for _, counts in digit_counts.values():
+        totals = [total + count for total, count in zip(totals, counts)]
+    rows.append((('',) * len(group_columns), ALL_ACCOUNTS, '', totals))
+
+    for groups, code, name, counts in rows:
+        amounts = sum(counts)
+        if amounts < max(min_amounts, 1):
+            mad, conformity = '', f"Too few amounts (< {min_amounts:,})"
+        else:
+            mad = benford_mad(counts)
+            conformity = benford_conformity(mad)
+            mad = round(mad, 4)
+        shares = [round(100 * counts[digit] / amounts, 2) if amounts else '' for digit in DIGITS]
+        report.append_values(tuple(groups) + (code, name, amounts, mad, conformity, *shares))
+    return report
@@ -0,0 +1,249 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import nullcontext
+
+from universal_engine import OUTPUT_COLUMNS, create_engine
+from universal_incremental import IncrementalProcessor
+from universal_readers import sheet_sizes
+from universal_results import TransactionStore
+
+# How often a pool run checks its cancel token while waiting for sheets
+CANCEL_POLL_SECONDS = 0.2
+
+SOURCE_COLUMN = 'Source File'
+SHEET_COLUMN = 'Sheet'
+BATCH_COLUMNS = [SOURCE_COLUMN] + OUTPUT_COLUMNS
+
+
+def resolve_workers(workers):
+    """Turn the --workers value into a real worker count (0 = all cores)"""
+    if not workers or workers < 1:
+        return os.cpu_count() or 1
+    return workers
+
+
+def is_multi_sheet(config):
+    """True unless only the first sheet of each workbook is cleaned"""
+    return (config or {}).get("sheets", "first") not in (None, "", "first")
+
+
+def batch_columns(config, merged=True):
+    """Output columns for a batch run: Source File when merged, Sheet in multi-sheet mode"""
+    columns = list(OUTPUT_COLUMNS)
+    if is_multi_sheet(config):
+        columns.insert(0, SHEET_COLUMN)
+    if merged:
+        columns.insert(0, SOURCE_COLUMN)
+    return columns
+
+
+def select_sheets(file_path, sheets, reader="auto"):
+    """[(sheet name, stored row count)] to clean from file_path.
+
+    sheets is "first" (name None: the first sheet), "all", or a list or
+    comma-separated string of sheet names (cleaned in the order given).
+    reader is the backend used to list the sheets (see select_reader).
+    """
+    if sheets in (None, "", "first"):
+        return [(None, 0)]
+    sizes = sheet_sizes(file_path, reader)
+    if sheets == "all":
+        return sizes
+    wanted = [name.strip() for name in sheets.split(',')] if isinstance(sheets, str) else list(sheets)
+    rows_by_name = dict(sizes)
+    missing = [name for name in wanted if name not in rows_by_name]
+    if missing:
+        raise ValueError(f"Sheet not found: {', '.join(missing)}")
+    return [(name, rows_by_name[name]) for name in wanted]
+
+
+def clean_one_sheet(file_path, sheet_name, config):
+    """Clean one sheet and tag rows with its file (and sheet) name"""
+    return _clean_sheet_job(file_path, sheet_name, config)[0]
+
+
+def _clean_sheet_job(file_path, sheet_name, config, progress_callback=None, cancel_token=None):
+    """Worker entry point: (processed_data, the engine's metrics dict or None)"""
+    engine = create_engine(config, progress_callback=progress_callback, cancel_token=cancel_token)
+    if config.get("incremental"):
+        processed_data = IncrementalProcessor(engine).process_file(file_path, sheet_name)
+    else:
+        processed_data = engine.process_file(file_path, sheet_name)
+    if sheet_name is not None:
+        processed_data.insert_constant_column(0, SHEET_COLUMN, sheet_name)
+    processed_data.insert_constant_column(0, SOURCE_COLUMN, os.path.basename(file_path))
+    return processed_data, engine.metrics.to_dict() if engine.metrics is not None else None
+
+
+def clean_one_file(file_path, config):
+    """Clean the selected sheets of one workbook in this process"""
+    merged = TransactionStore(batch_columns(config))
+    for sheet_name, _ in select_sheets(file_path, config.get("sheets"), config.get("reader", "auto")):
+        merged.extend(clean_one_sheet(file_path, sheet_name, config))
+    return merged
+
+
+def clean_files(file_paths, config, workers=1, log_callback=None, progress_callback=None,
+                metrics=None, cancel_token=None, executor=None, shared_progress=None):
+    """Clean many workbooks, sharing their sheets out over a process pool.
+
+    Every selected sheet is its own job, largest first, so the wall time
+    of a run is close to that of its biggest sheet. Returns a list of
+    (file_path, processed_data, error) in input order, each file's sheets
+    merged in sheet order, so the output is deterministic whatever order
+    the workers finish in. processed_data is None when the file failed.
+
+    When a RunMetrics is given the per-sheet timers and counters are added
+    to it (jobs run with the "metrics" switch on). Its profiler, if any,
+    only sees work done in this process, i.e. runs with one worker.
+
+    Cancelling cancel_token stops a run early: in this process the current
+    sheet keeps the rows read so far; with a pool, sheets not yet started
+    are dropped and the ones already running finish, unless the token is
+    process_safe (CancelToken.shared), in which case they stop the same way.
+    Files keep whichever of their sheets completed.
+
+    executor is an already running process pool to share the sheets out
+    over (the service keeps one warm); workers is then ignored.
+
+    With a pool, progress_callback hears of each finished sheet; given a
+    SharedProgress, the workers also report progress within their sheets
+    through it.
+    """
+    if metrics is not None:
+        config = dict(config, metrics=True, profile=False)
+
+    def log(message):
+        if log_callback:
+            log_callback(message)
+
+    def label(job):
+        file_path, sheet_name = job
+        name = os.path.basename(file_path)
+        return name if sheet_name is None else f"{name} [{sheet_name}]"
+
+    def record(job, get_result):
+        try:
+            processed_data, sheet_metrics = get_result()
+            if metrics is not None and sheet_metrics is not None:
+                metrics.merge(sheet_metrics)
+            sheet_results[job] = (processed_data, None)
+            log(f"✅ {label(job)}: {len(sheet_results[job][0])} transactions")
+        except Exception as e:
+            sheet_results[job] = (None, str(e))
+            log(f"❌ {label(job)}: {str(e)}")
+        if progress_callback:
+            progress_callback(len(sheet_results) / len(jobs) * 100)
+
+    # One job per (file, sheet)
+    jobs = []
+    sizes = {}
+    file_errors = {}
+    file_jobs = {}
+    for file_path in file_paths:
+        try:
+            sheets = select_sheets(file_path, config.get("sheets"), config.get("reader", "auto"))
+        except Exception as e:
+            file_errors[file_path] = str(e)
+            log(f"❌ {os.path.basename(file_path)}: {str(e)}")
+            continue
+        file_jobs[file_path] = [(file_path, sheet_name) for sheet_name, _ in sheets]
+        for job, (_, rows) in zip(file_jobs[file_path], sheets):
+            jobs.append(job)
+            sizes[job] = rows
+
+    workers = min(resolve_workers(workers), max(len(jobs), 1))
+    sheet_results = {}
+
+    def sheet_progress(done):
+        # Progress within the current sheet, as a share of the whole run
+        if progress_callback is None:
+            return None
+        return lambda p: progress_callback((done + p / 100) / len(jobs) * 100)
+
+    def cancelled():
+        return cancel_token is not None and cancel_token.cancelled
+
+    if executor is None and workers == 1:
+        with metrics.profiling() if metrics is not None else nullcontext():
+            for done, job in enumerate(jobs):
+                if cancelled():
+                    break
+                record(job, lambda: _clean_sheet_job(job[0], job[1], config,
+                                                     sheet_progress(done), cancel_token))
+    else:
+        if executor is None:
+            log(f"🔄 Cleaning {len(jobs)} sheets on {workers} worker processes...")
+        # A shared pool is left running for the next caller
+        with nullcontext(executor) if executor is not None else ProcessPoolExecutor(workers) as pool:
+            # Running sheets can only be stopped with a token workers can see
+            worker_token = cancel_token if getattr(cancel_token, 'process_safe', False) else None
+            report_rows = progress_callback is not None and shared_progress is not None
+            futures = {pool.submit(_clean_sheet_job, job[0], job[1], config,
+                                   shared_progress.reporter(job) if report_rows else None,
+                                   worker_token): job
+                       for job in sorted(jobs, key=lambda job: -sizes[job])}
+            pending = set(futures)
+            running = {}
+            while pending:
+                finished, pending = wait(pending, timeout=CANCEL_POLL_SECONDS,
+                                         return_when=FIRST_COMPLETED)
+                for future in finished:
+                    if not future.cancelled():
+                        record(futures[future], future.result)
+                if report_rows:
+                    running.update(shared_progress.updates())
+                    running = {job: p for job, p in running.items() if job not in sheet_results}
+                    if running:
+                        progress_callback((len(sheet_results) + sum(running.values()) / 100)
+                                          / len(jobs) * 100)
+                if cancelled():
+                    for future in pending:
+                        future.cancel()
+    if cancelled():
+        log(f"⏹ Cancelled - {len(sheet_results)} of {len(jobs)} sheets cleaned")
+
+    columns = batch_columns(config)
+    results = []
+    for file_path in file_paths:
+        if file_path in file_errors:
+            results.append((file_path, None, file_errors[file_path]))
+            continue
+        merged = None
+        error = None
+        for job in file_jobs[file_path]:
+            if job not in sheet_results:
+                # Never started (cancelled)
+                continue
+            processed_data, sheet_error = sheet_results[job]
+            if sheet_error is not None:
+                error = sheet_error if job[1] is None else f"sheet '{job[1]}': {sheet_error}"
+                break
+            if len(file_jobs[file_path]) == 1:
+                merged = processed_data
+                continue
+            if merged is None:
+                merged = TransactionStore(columns)
+            merged.extend(processed_data)
+        if merged is None and error is None:
+            merged = TransactionStore(columns)
+        results.append((file_path, None, error) if error else (file_path, merged, None))
+    return results
+
+
+def run_batch(file_paths, config, workers=1, log_callback=None, progress_callback=None,
+              metrics=None, cancel_token=None):
+    """Clean many workbooks and merge them into one transaction table.
+
+    Returns (merged, failures) where merged is a TransactionStore with the
+    batch_columns(config) and failures maps file path to the error message.
+    """
+    merged = TransactionStore(batch_columns(config))
+    failures = {}
+    for file_path, processed_data, error in clean_files(file_paths, config, workers, log_callback,
+                                                        progress_callback, metrics, cancel_token):
+        if error is None:
+            merged.extend(processed_data)
+        else:
+            failures[file_path] = error
+    return merged, failures
@@ -0,0 +1,240 @@
+import hashlib
+import os
+import pickle
+import shutil
+import struct
+
+from universal_columnar import MappedSheetReader, build_store, store_size
+from universal_readers import open_sheet
+
+# Bump when the cached grid format or cell conversion changes
+# (2: entries are keyed by reader backend too, 3: NA_STRINGS text read as blanks)
+CACHE_VERSION = 3
+CHUNK_ROWS = 5000
+HASH_BLOCK = 1024 * 1024
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'universal_auditor')
+
+_ROW_COUNT = struct.Struct('<Q')
+
+# (path, size, mtime_ns, ctime_ns) -> content hash, so a file is hashed
+# once per process. ctime changes on every write and cannot be set back,
+# so a rewrite that keeps the size and restores the mtime is still seen.
+_content_hashes = {}
+
+
+def file_content_hash(file_path, stat=None):
+    """BLAKE2 hash of the file bytes (memoised on path, size, mtime and ctime)"""
+    stat = stat or os.stat(file_path)
+    memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+    digest = _content_hashes.get(memo_key)
+    if digest is None:
+        hasher = hashlib.blake2b(digest_size=20)
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK), b''):
+                hasher.update(block)
+        digest = _content_hashes[memo_key] = hasher.hexdigest()
+    return digest
+
+
+class CachedSheetReader:
+    """Rows of one sheet read back from a cache entry.
+
+    An entry is the row count (8 bytes) followed by pickled chunks of
+    CHUNK_ROWS row lists, so rows stream back without loading the whole
+    grid at once.
+    """
+
+    def __init__(self, entry_path):
+        self.entry_path = entry_path
+        self._row_count = None
+
+    def __len__(self):
+        if self._row_count is None:
+            with open(self.entry_path, 'rb') as f:
+                self._row_count = _ROW_COUNT.unpack(f.read(_ROW_COUNT.size))[0]
+        return self._row_count
+
+    def __iter__(self):
+        with open(self.entry_path, 'rb') as f:
+            self._row_count = _ROW_COUNT.unpack(f.read(_ROW_COUNT.size))[0]
+            while True:
+                try:
+                    chunk = pickle.load(f)
+                except EOFError:
+                    return
+                yield from chunk
+
+
+class _CachingReader:
+    """Streams rows from the workbook and writes them to a new cache entry.
+
+    The entry only appears once every row has been read; a partial read
+    (error, early stop) leaves nothing behind.
+    """
+
+    def __init__(self, cache, entry_path, reader):
+        self.cache = cache
+        self.entry_path = entry_path
+        self.reader = reader
+
+    def __len__(self):
+        return len(self.reader)
+
+    def __iter__(self):
+        temp_path = f"{self.entry_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(_ROW_COUNT.pack(0))
+                count = 0
+                chunk = []
+                for row in self.reader:
+                    chunk.append(row)
+                    count += 1
+                    yield row
+                    if len(chunk) == CHUNK_ROWS:
+                        pickle.dump(chunk, f, pickle.HIGHEST_PROTOCOL)
+                        chunk = []
+                if chunk:
+                    pickle.dump(chunk, f, pickle.HIGHEST_PROTOCOL)
+                f.seek(0)
+                f.write(_ROW_COUNT.pack(count))
+            os.replace(temp_path, self.entry_path)
+            self.cache.evict()
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+class WorkbookCache:
+    """On-disk cache of parsed sheets, keyed by path, size, mtime and content hash.
+
+    The first read of a sheet streams it from the workbook as usual and
+    saves the converted rows; later reads of the unchanged file skip XLSX
+    parsing entirely. A sheet can also be kept as a memory-mapped columnar
+    store (mapped_rows) for ledgers too large to hold in memory. Entries
+    of both kinds are evicted least recently used first once the cache
+    grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=2048 * 1024 * 1024):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_config(cls, config):
+        """Cache settings from the "cache_dir" / "cache_max_mb" config keys"""
+        return cls(config.get("cache_dir") or None,
+                   int(config.get("cache_max_mb", 2048)) * 1024 * 1024)
+
+    def entry_key(self, file_path, sheet_name=None, backend=None):
+        stat = os.stat(file_path)
+        key = '|'.join(str(part) for part in (
+            CACHE_VERSION, os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns,
+            file_content_hash(file_path, stat), sheet_name, backend))
+        return hashlib.blake2b(key.encode('utf-8'), digest_size=20).hexdigest()
+
+    def entry_path(self, file_path, sheet_name=None, backend=None):
+        return os.path.join(self.cache_dir, self.entry_key(file_path, sheet_name, backend) + '.grid')
+
+    def rows(self, file_path, sheet_name=None, reader=None):
+        """Row source for a sheet: the cache entry if there is one, else the workbook.
+
+        reader is the row source to parse with on a miss (open_sheet() with
+        the default backend if not given); its backend is part of the key.
+        """
+        if reader is None:
+            reader = open_sheet(file_path, sheet_name)
+        try:
+            entry_path = self.entry_path(file_path, sheet_name, reader.backend)
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except OSError:
+            return reader
+
+        if os.path.exists(entry_path):
+            try:
+                # Mark as recently used for LRU eviction
+                os.utime(entry_path)
+                return CachedSheetReader(entry_path)
+            except OSError:
+                pass
+        return _CachingReader(self, entry_path, reader)
+
+    def is_cached(self, file_path, sheet_name=None, backend=None):
+        return os.path.exists(self.entry_path(file_path, sheet_name, backend))
+
+    def mapped_path(self, file_path, sheet_name=None, backend=None):
+        return os.path.join(self.cache_dir, self.entry_key(file_path, sheet_name, backend) + '.cols')
+
+    def mapped_rows(self, file_path, sheet_name=None, reader=None, cancel_token=None):
+        """The memory-mapped store of a sheet, converting the sheet on first use.
+
+        Unlike rows() the whole sheet is converted before anything is
+        returned, so callers can read any range of rows or columns. Falls
+        back to reader (open_sheet() if not given) when the cache directory
+        is not writable or cancel_token stops the conversion.
+        """
+        if reader is None:
+            reader = open_sheet(file_path, sheet_name)
+        try:
+            store_path = self.mapped_path(file_path, sheet_name, reader.backend)
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except OSError:
+            return reader
+
+        if os.path.isdir(store_path):
+            try:
+                os.utime(store_path)
+                return MappedSheetReader(store_path)
+            except (OSError, ValueError, KeyError):
+                # Unreadable or from an older version: convert again
+                shutil.rmtree(store_path, ignore_errors=True)
+        store = build_store(reader, store_path, reader.backend, cancel_token)
+        if store is None:
+            return reader
+        self.evict(keep=store_path)
+        return store
+
+    def is_mapped(self, file_path, sheet_name=None, backend=None):
+        return os.path.isdir(self.mapped_path(file_path, sheet_name, backend))
+
+    def evict(self, keep=None):
+        """Delete least recently used entries until the cache fits in max_bytes.
+
+        keep is an entry that stays even if it alone is over the limit.
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(('.grid', '.cols')):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                    size = store_size(path) if name.endswith('.cols') else stat.st_size
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                if path.endswith('.cols'):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        """Delete every cache entry"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.grid'):
+                os.remove(os.path.join(self.cache_dir, name))
+            elif name.endswith('.cols'):
+                shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
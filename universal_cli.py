@@ -0,0 +1,193 @@
+import argparse
+import os
+import sys
+from contextlib import nullcontext
+
+from universal_anomalies import detect_anomalies
+from universal_batch import batch_columns, clean_files
+from universal_engine import ENGINES, load_config_file, write_output
+from universal_metrics import create_metrics
+from universal_readers import READERS
+from universal_reconcile import reconcile
+from universal_results import TransactionStore
+
+
+def log_stderr(message):
+    """Print a log line to stderr so stdout stays clean for scripting"""
+    print(message, file=sys.stderr)
+
+
+def build_parser():
+    """Build the command-line argument parser"""
+    parser = argparse.ArgumentParser(
+        description="Universal Auditor Data Cleaner - headless batch mode")
+    parser.add_argument('inputs', nargs='+', help="Ledger files to clean (.xlsx, .xls, .xlsb, .ods, .csv)")
+    parser.add_argument('-c', '--config', default="auditor_config_universal.json",
+                        help="Config JSON (same schema as the desktop app)")
+    parser.add_argument('-o', '--output', required=True,
+                        help="Output file (.csv/.xlsx/.parquet/.feather), or a folder when several inputs are given")
+    parser.add_argument('--format', choices=['csv', 'xlsx', 'parquet', 'feather'], default='csv',
+                        help="Output format when writing into a folder")
+    parser.add_argument('--engine', choices=ENGINES,
+                        help="Classification engine (overrides the config's \"engine\")")
+    parser.add_argument('--reader', choices=READERS,
+                        help="Workbook reader backend (overrides the config's \"reader\"; "
+                             "auto = fastest installed for each file's format)")
+    parser.add_argument('-j', '--workers', type=int,
+                        help="Worker processes, one sheet per job (0 = one per CPU core; "
+                             "default: the config's \"workers\")")
+    parser.add_argument('--sheets',
+                        help="Sheets to clean: 'first', 'all' or comma-separated names "
+                             "(overrides the config's \"sheets\")")
+    cache = parser.add_mutually_exclusive_group()
+    cache.add_argument('--cache', action='store_true',
+                       help="Cache parsed workbooks on disk so the next run of an unchanged file "
+                            "skips parsing it (overrides the config's \"cache_enabled\")")
+    cache.add_argument('--no-cache', action='store_true',
+                       help="Always parse the workbooks (skip the parsed-workbook cache)")
+    parser.add_argument('--mapped', action='store_true',
+                        help="Convert each sheet once into a memory-mapped columnar store in the cache "
+                             "folder and clean it from there (for ledgers larger than memory)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Resume after the rows cleaned last time when earlier rows are unchanged")
+    parser.add_argument('--reconcile', action='store_true',
+                        help="Also write per-account totals (<output>.accounts) and the rows whose "
+                             "Balance does not follow from the movements (<output>.balance_breaks)")
+    parser.add_argument('--anomalies', action='store_true',
+                        help="Also write duplicate, round-amount and weekend-posting flags "
+                             "(<output>.anomalies) and per-account Benford results (<output>.benford)")
+    parser.add_argument('--merge', action='store_true',
+                        help="Merge all inputs into one output file with a Source File column")
+    parser.add_argument('--metrics', action='store_true',
+                        help="Time each stage and write <output>.metrics.json")
+    parser.add_argument('--profile', action='store_true',
+                        help="Also record a cProfile dump, <output>.prof (implies --metrics; "
+                             "only covers single-worker runs)")
+    return parser
+
+
+def output_path_for(input_path, args):
+    """Work out where the cleaned file for input_path goes"""
+    if args.merge or (len(args.inputs) == 1 and not os.path.isdir(args.output)):
+        return args.output
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(args.output, f"{stem}_cleaned.{args.format}")
+
+
+# Reports on the cleaned transactions: config switch (also the metrics stage) -> builder
+REPORTS = (("reconcile", reconcile), ("anomalies", detect_anomalies))
+
+
+def write_reports(processed_data, output_path, config, metrics=None, log=log_stderr):
+    """Build the reports the config switches on and write them next to output_path.
+
+    Returns the paths written.
+    """
+    paths = []
+    for switch, build in REPORTS:
+        if not config.get(switch):
+            continue
+        with metrics.stage(switch) if metrics is not None else nullcontext():
+            report = build(processed_data, config)
+            report_paths = report.write(output_path)
+        log(f"{report.summary()} -> {', '.join(report_paths)}")
+        paths.extend(report_paths)
+    return paths
+
+
+def write_results(results, config, args, metrics=None, log=log_stderr):
+    """Write clean_files() results where args (inputs, output, merge, format) say.
+
+    Returns (number of failed files, [output paths written]).
+    """
+    failures = 0
+    outputs = []
+    merged = TransactionStore(batch_columns(config))
+    for input_path, processed_data, error in results:
+        if error is not None:
+            failures += 1
+            log(f"❌ {os.path.basename(input_path)}: {error}")
+            continue
+        if args.merge:
+            merged.extend(processed_data)
+            continue
+        try:
+            output_path = output_path_for(input_path, args)
+            with metrics.stage('export') if metrics is not None else nullcontext():
+                write_output(processed_data, output_path, columns=batch_columns(config, merged=False))
+            outputs.append(output_path)
+            accounts = len(processed_data.distinct('Account Code'))
+            log(f"✅ {os.path.basename(input_path)}: {len(processed_data)} transactions, "
+                f"{accounts} accounts -> {output_path}")
+            outputs.extend(write_reports(processed_data, output_path, config, metrics, log))
+        except Exception as e:
+            failures += 1
+            log(f"❌ {os.path.basename(input_path)}: {str(e)}")
+
+    if args.merge:
+        try:
+            with metrics.stage('export') if metrics is not None else nullcontext():
+                write_output(merged, args.output)
+            outputs.append(args.output)
+            log(f"✅ Merged {len(merged)} transactions from "
+                f"{len(results) - failures} files -> {args.output}")
+            outputs.extend(write_reports(merged, args.output, config, metrics, log))
+        except Exception as e:
+            failures += 1
+            log(f"❌ Merge failed: {str(e)}")
+    return failures, outputs
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if not os.path.exists(args.config):
+        log_stderr(f"⚠ Config not found, using defaults: {args.config}")
+    config = load_config_file(args.config)
+    if args.engine:
+        config["engine"] = args.engine
+    if args.reader:
+        config["reader"] = args.reader
+    if args.cache:
+        config["cache_enabled"] = True
+    if args.no_cache:
+        config["cache_enabled"] = False
+    if args.sheets:
+        config["sheets"] = args.sheets
+    if args.mapped:
+        config["mapped_store"] = True
+    if args.incremental:
+        config["incremental"] = True
+    if args.reconcile:
+        config["reconcile"] = True
+    if args.anomalies:
+        config["anomalies"] = True
+    if args.metrics or args.profile:
+        config["metrics"] = True
+    if args.profile:
+        config["profile"] = True
+    workers = config.get("workers", 0) if args.workers is None else args.workers
+
+    if len(args.inputs) > 1 and not args.merge:
+        os.makedirs(args.output, exist_ok=True)
+
+    # Per-account lines from worker processes are not forwarded; each file
+    # reports its own total once it has been cleaned.
+    metrics = create_metrics(config)
+    results = clean_files(args.inputs, config, workers, metrics=metrics)
+
+    failures, _ = write_results(results, config, args, metrics)
+
+    if metrics is not None:
+        for line in metrics.summary_lines():
+            log_stderr(line)
+        base = args.output
+        if len(args.inputs) > 1 and not args.merge:
+            base = os.path.join(args.output, 'run')
+        log_stderr(f"📈 Metrics -> {metrics.write(base)}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+import json
+import mmap
+import os
+import pickle
+import shutil
+from datetime import date, datetime, time, timedelta
+from itertools import islice, repeat, zip_longest
+
+import numpy as np
+
+from universal_jobs import cancellable_rows
+
+# Bump when the store layout or cell encoding changes
+STORE_VERSION = 1
+
+# Rows converted, decoded and (vectorized engine) classified at a time
+CHUNK_ROWS = 65536
+
+META_FILE = 'store.json'
+LENGTHS_FILE = 'rows.len'
+TEXT_OFFSETS_FILE = 'text.off'
+TEXT_BYTES_FILE = 'text.bin'
+
+# What a cell is (one uint8 per cell) and what its int64 slot holds
+BLANK = 0       # '' (slot unused)
+INT = 1         # the int
+FLOAT = 2       # the bits of the float
+TEXT = 3        # index into the text heap (UTF-8)
+BOOL = 4        # 0 or 1
+DATETIME = 5    # microseconds since 1970-01-01 (naive datetimes)
+DATE = 6        # days since 1970-01-01
+TIME = 7        # microseconds since midnight (naive times)
+TIMEDELTA = 8   # microseconds
+PICKLED = 9     # index into the text heap, holding the pickled cell (anything else)
+
+# Exact types only: subclasses such as pandas.Timestamp are pickled whole
+_KIND_OF_TYPE = {int: INT, float: FLOAT, str: TEXT, bool: BOOL, datetime: DATETIME,
+                 date: DATE, time: TIME, timedelta: TIMEDELTA}
+
+# NumPy dtypes whose int64 view is the slot
+_SLOT_DTYPES = {INT: np.int64, FLOAT: np.float64, BOOL: np.int64, DATETIME: 'datetime64[us]',
+                DATE: 'datetime64[D]', TIMEDELTA: 'timedelta64[us]'}
+
+_US_PER_SECOND = 1000000
+
+
+def _time_slot(value):
+    return ((value.hour * 60 + value.minute) * 60 + value.second) * _US_PER_SECOND + value.microsecond
+
+
+def _to_slots(kind, values):
+    if kind == TIME:
+        return np.fromiter(map(_time_slot, values), dtype=np.int64, count=len(values))
+    return np.array(values, dtype=_SLOT_DTYPES[kind]).view(np.int64)
+
+
+def _encode_values(kind, values):
+    """Slots for cells of one kind, and the positions that must be pickled instead.
+
+    Timezone-aware datetimes and times and ints or timedeltas outside int64
+    do not fit a slot.
+    """
+    if kind in (DATETIME, TIME):
+        aware = [i for i, value in enumerate(values) if value.tzinfo is not None]
+    else:
+        aware = []
+    if not aware:
+        try:
+            return _to_slots(kind, values), []
+        except (OverflowError, ValueError):
+            pass
+    slots = np.zeros(len(values), dtype=np.int64)
+    unfit = []
+    aware = set(aware)
+    for i, value in enumerate(values):
+        try:
+            if i in aware:
+                raise ValueError(value)
+            slots[i] = _to_slots(kind, [value])[0]
+        except (OverflowError, ValueError):
+            unfit.append(i)
+    return slots, unfit
+
+
+def _decode_time(us):
+    return time(us // 3600000000, us // 60000000 % 60, us // _US_PER_SECOND % 60, us % _US_PER_SECOND)
+
+
+def _object_array(values):
+    """values as an object array, exactly (no NumPy conversion of str, lists, ...)"""
+    return np.fromiter(values, dtype=object, count=len(values))
+
+
+def _map_file(path, dtype, count):
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=(count,))
+
+
+class _TextHeap:
+    """Append-only UTF-8 (and pickle) blobs: text.bin plus int64 end offsets"""
+
+    def __init__(self, store_path):
+        self.bytes_file = open(os.path.join(store_path, TEXT_BYTES_FILE), 'wb')
+        self.offsets_file = open(os.path.join(store_path, TEXT_OFFSETS_FILE), 'wb')
+        np.zeros(1, dtype=np.int64).tofile(self.offsets_file)
+        self.count = 0
+        self.size = 0
+
+    def add(self, blobs):
+        """Append blobs; returns their heap indices"""
+        lengths = np.fromiter(map(len, blobs), dtype=np.int64, count=len(blobs))
+        ends = self.size + np.cumsum(lengths)
+        self.bytes_file.write(b''.join(blobs))
+        ends.tofile(self.offsets_file)
+        indices = np.arange(self.count, self.count + len(blobs), dtype=np.int64)
+        self.count += len(blobs)
+        self.size = int(ends[-1]) if len(blobs) else self.size
+        return indices
+
+    def close(self):
+        self.bytes_file.close()
+        self.offsets_file.close()
+
+
+def _encode_column(cells, heap):
+    """(kinds, slots) arrays for one column of a chunk; text and pickles go to heap"""
+    n_cells = len(cells)
+    kinds = np.fromiter(map(_KIND_OF_TYPE.get, map(type, cells), repeat(PICKLED, n_cells)),
+                        dtype=np.uint8, count=n_cells)
+    slots = np.zeros(n_cells, dtype=np.int64)
+    pickled = []
+    for kind in np.unique(kinds).tolist():
+        if kind == PICKLED:
+            continue
+        index = np.flatnonzero(kinds == kind)
+        values = [cells[i] for i in index.tolist()]
+        if kind == TEXT:
+            filled = np.fromiter(map(len, values), dtype=np.int64, count=len(values)) > 0
+            kinds[index[~filled]] = BLANK
+            texts = [value.encode('utf-8', 'surrogatepass') for value in values if value]
+            slots[index[filled]] = heap.add(texts)
+            continue
+        slots[index], unfit = _encode_values(kind, values)
+        pickled.extend(index[unfit].tolist())
+    pickled.extend(np.flatnonzero(kinds == PICKLED).tolist())
+    if pickled:
+        pickled.sort()
+        kinds[pickled] = PICKLED
+        slots[pickled] = heap.add([pickle.dumps(cells[i], pickle.HIGHEST_PROTOCOL) for i in pickled])
+    return kinds, slots
+
+
+def _append_column(store_path, column, kinds, slots, rows_before=0):
+    """Append a chunk to a column's files (creating them blank for rows_before rows)"""
+    for suffix, values in (('kind', kinds), ('slot', slots)):
+        path = os.path.join(store_path, f"{column}.{suffix}")
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.truncate(rows_before * values.itemsize)
+        with open(path, 'ab') as f:
+            values.tofile(f)
+
+
+def build_store(rows, store_path, backend=None, cancel_token=None):
+    """Convert rows into a memory-mapped store at store_path.
+
+    Rows are read and encoded CHUNK_ROWS at a time, so the sheet never has
+    to fit in memory. The store only appears once every row is written;
+    returns a MappedSheetReader for it, or None if cancel_token stopped the
+    conversion (nothing is left behind).
+    """
+    temp_path = f"{store_path}.{os.getpid()}.tmp"
+    shutil.rmtree(temp_path, ignore_errors=True)
+    os.makedirs(temp_path)
+    try:
+        row_iter = iter(rows) if cancel_token is None else cancellable_rows(rows, cancel_token)
+        heap = _TextHeap(temp_path)
+        row_count = width = 0
+        try:
+            with open(os.path.join(temp_path, LENGTHS_FILE), 'wb') as lengths_file:
+                while True:
+                    chunk = list(islice(row_iter, CHUNK_ROWS))
+                    if not chunk:
+                        break
+                    lengths = np.fromiter(map(len, chunk), dtype=np.uint32, count=len(chunk))
+                    lengths.tofile(lengths_file)
+                    chunk_width = int(lengths.max())
+                    for column, cells in enumerate(zip_longest(*chunk, fillvalue='')):
+                        kinds, slots = _encode_column(cells, heap)
+                        _append_column(temp_path, column, kinds, slots, row_count)
+                    blank_kinds = np.zeros(len(chunk), dtype=np.uint8)
+                    blank_slots = np.zeros(len(chunk), dtype=np.int64)
+                    for column in range(chunk_width, width):
+                        _append_column(temp_path, column, blank_kinds, blank_slots)
+                    width = max(width, chunk_width)
+                    row_count += len(chunk)
+        finally:
+            heap.close()
+        if cancel_token is not None and cancel_token.cancelled:
+            return None
+
+        meta = {"version": STORE_VERSION, "rows": row_count, "width": width,
+                "texts": heap.count, "text_bytes": heap.size, "backend": backend}
+        with open(os.path.join(temp_path, META_FILE), 'w') as f:
+            json.dump(meta, f)
+        try:
+            os.rename(temp_path, store_path)
+        except OSError:
+            # Another process finished the same store first
+            if not os.path.isdir(store_path):
+                raise
+    finally:
+        shutil.rmtree(temp_path, ignore_errors=True)
+    return MappedSheetReader(store_path)
+
+
+class MappedSheetReader:
+    """Rows of one sheet read back from a memory-mapped columnar store.
+
+    A store is a directory with, per column, a uint8 file of cell kinds
+    and an int64 file of slots (the value, or an index into a shared text
+    heap), plus the length of every row. Columns are mapped, not loaded,
+    so rows and column chunks are decoded on demand and the operating
+    system pages the files in and out; cells come back as the exact values
+    the reader gave.
+    """
+
+    def __init__(self, store_path):
+        self.store_path = store_path
+        with open(os.path.join(store_path, META_FILE)) as f:
+            meta = json.load(f)
+        if meta.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported mapped store version: {meta.get('version')}")
+        self.row_count = meta["rows"]
+        self.width = meta["width"]
+        self.backend = meta.get("backend")
+        self._lengths = _map_file(os.path.join(store_path, LENGTHS_FILE), np.uint32, self.row_count)
+        self._text_offsets = _map_file(os.path.join(store_path, TEXT_OFFSETS_FILE), np.int64,
+                                       meta["texts"] + 1)
+        self._text_bytes = None
+        self._text_size = meta["text_bytes"]
+        self._columns = {}
+
+    def __len__(self):
+        return self.row_count
+
+    def __iter__(self):
+        width = self.width
+        for start in range(0, self.row_count, CHUNK_ROWS):
+            stop = min(start + CHUNK_ROWS, self.row_count)
+            lengths = self._lengths[start:stop].tolist()
+            if width == 0:
+                yield from ([] for _ in lengths)
+                continue
+            for cells, length in zip(zip(*self.columns(start, stop)), lengths):
+                yield list(cells[:length]) if length < width else list(cells)
+
+    def columns(self, start=0, stop=None):
+        """Every column of rows start:stop as object arrays ('' for blank cells)"""
+        return [self.column(column, start, stop) for column in range(self.width)]
+
+    def column(self, column, start=0, stop=None):
+        """Cells start:stop of a column as an object array ('' for blank cells)"""
+        kinds, slots = self._mapped_column(column)
+        kinds = np.asarray(kinds[start:stop])
+        slots = np.asarray(slots[start:stop])
+        cells = np.full(len(kinds), '', dtype=object)
+        for kind in np.flatnonzero(np.bincount(kinds, minlength=PICKLED + 1)).tolist():
+            if kind == BLANK:
+                continue
+            index = np.flatnonzero(kinds == kind)
+            cells[index] = _object_array(self._decode(kind, slots[index]))
+        return cells
+
+    def _mapped_column(self, column):
+        mapped = self._columns.get(column)
+        if mapped is None:
+            mapped = self._columns[column] = (
+                _map_file(os.path.join(self.store_path, f"{column}.kind"), np.uint8, self.row_count),
+                _map_file(os.path.join(self.store_path, f"{column}.slot"), np.int64, self.row_count))
+        return mapped
+
+    def _decode(self, kind, slots):
+        if kind == INT:
+            return slots.tolist()
+        if kind == FLOAT:
+            return slots.view(np.float64).tolist()
+        if kind == BOOL:
+            return (slots != 0).tolist()
+        if kind == DATETIME:
+            return slots.view('datetime64[us]').tolist()
+        if kind == DATE:
+            return slots.view('datetime64[D]').tolist()
+        if kind == TIMEDELTA:
+            return slots.view('timedelta64[us]').tolist()
+        if kind == TIME:
+            return [_decode_time(us) for us in slots.tolist()]
+        blobs = self._blobs(slots)
+        if kind == TEXT:
+            return [blob.decode('utf-8', 'surrogatepass') for blob in blobs]
+        return [pickle.loads(blob) for blob in blobs]
+
+    def _blobs(self, indices):
+        if self._text_bytes is None:
+            if self._text_size == 0:
+                self._text_bytes = b''
+            else:
+                with open(os.path.join(self.store_path, TEXT_BYTES_FILE), 'rb') as f:
+                    self._text_bytes = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        data = self._text_bytes
+        starts = self._text_offsets[indices].tolist()
+        ends = self._text_offsets[indices + 1].tolist()
+        return [data[start:end] for start, end in zip(starts, ends)]
+
+
+def store_size(store_path):
+    """Bytes used by a store directory"""
+    total = 0
+    for entry in os.scandir(store_path):
+        try:
+            total += entry.stat().st_size
+        except OSError:
+            pass
+    return total
@@ -0,0 +1,110 @@
+import json
+import os
+import re
+
+# Default configuration (same schema as auditor_config_universal.json)
+DEFAULT_CONFIG = {
+    "col_date": "A",
+    "col_journal": "C",
+    "col_reference": "G",
+    "col_description": "I",
+    "col_debit": "W",
+    "col_credit": "auto",
+    "col_balance_start": "AF",
+    "col_balance_end": "AF",
+    "col_account_code": "E",
+    "col_account_name": "K",
+    "running_credit_mode": "auto",
+    "debit_type": "auto",
+    "credit_type": "auto",
+    "balance_type": "auto",
+    "amount_format": "accounting",
+    "credit_inference": "auto",
+    "credit_sample_rows": 1000,
+    "credit_min_confidence": 0.6,
+    "engine": "stream",
+    "reader": "auto",
+    "cache_enabled": False,
+    "cache_dir": "",
+    "cache_max_mb": 2048,
+    "mapped_store": False,
+    "detect_sample_rows": 50,
+    "sheets": "first",
+    "workers": 0,
+    "incremental": False,
+    "reconcile": False,
+    "balance_side": "auto",
+    "balance_tolerance": 0.005,
+    "anomalies": False,
+    "near_duplicate_days": 3,
+    "round_amount_unit": 1000,
+    "benford_min_amounts": 100,
+    "metrics": False,
+    "profile": False
+}
+
+# "stream": per-row loop over openpyxl read-only rows (low memory)
+# "vectorized": column-wise pandas/NumPy classification (fast, whole sheet in memory)
+ENGINES = ("stream", "vectorized")
+
+# Where an "auto" (or blank) credit cell gets its amount from:
+# "auto": columns inferred once per run from a sample, scanning each row
+#         only when no column is clear
+# "scan": the first positive amount in the row (outside debit/balance)
+CREDIT_INFERENCE_MODES = ("auto", "scan")
+
+# Which way an account's balance moves in the reconciliation report:
+# "debit": up with debits, "credit": up with credits (liabilities, income),
+# "auto": per account, whichever matches the reported balances best
+BALANCE_SIDES = ("auto", "debit", "credit")
+
+
+# A column letter, and the 0-based number of Excel's last column (XFD)
+_COLUMN_LETTERS = re.compile('[A-Z]{1,3}')
+MAX_COLUMN_NUMBER = 16383
+
+
+def load_config_file(config_path):
+    """Load a config JSON on top of the defaults"""
+    config = dict(DEFAULT_CONFIG)
+    if config_path and os.path.exists(config_path):
+        with open(config_path, 'r') as f:
+            config.update(json.load(f))
+    return config
+
+
+def column_letter_to_number(column_letter):
+    """Convert Excel column letter to 0-based number.
+
+    Raises ValueError for anything but one to three letters up to XFD
+    (Excel's last column); case and surrounding spaces are ignored.
+    """
+    if not column_letter or (isinstance(column_letter, str) and column_letter.lower() == 'auto'):
+        return 'auto'
+
+    letters = column_letter.strip().upper() if isinstance(column_letter, str) else ''
+    if not _COLUMN_LETTERS.fullmatch(letters):
+        raise ValueError(f"Invalid column letter: '{column_letter}'")
+    number = 0
+
+    for i, char in enumerate(letters[::-1]):
+        number += (ord(char) - 64) * (26 ** i)
+
+    if number - 1 > MAX_COLUMN_NUMBER:
+        raise ValueError(f"Invalid column letter: '{column_letter}' (the last column is XFD)")
+    return number - 1
+
+
+def column_number_to_letter(column_number):
+    """Convert 0-based number to Excel column letter"""
+    if column_number < 0:
+        return ''
+
+    letters = ''
+    num = column_number + 1
+
+    while num > 0:
+        num, remainder = divmod(num - 1, 26)
+        letters = chr(65 + remainder) + letters
+
+    return letters
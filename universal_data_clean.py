@@ -1,12 +1,25 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-import pandas as pd
-import openpyxl
+from contextlib import nullcontext
+import importlib
 import json
 import os
 from pathlib import Path
 import threading
-import re
+import time
+
+# Only modules that load without pandas, NumPy or openpyxl are imported up
+# front, so the window appears at once; see ENGINE_MODULES
+from universal_config import DEFAULT_CONFIG, column_number_to_letter
+from universal_jobs import JobManager
+from universal_log import LogBuffer
+from universal_preview import VirtualTreeview
+from universal_results import TransactionStore
+
+# Imported on a background thread once the window is up (they pull in
+# pandas, NumPy and openpyxl); methods import what they use from them
+ENGINE_MODULES = ("universal_readers", "universal_engine", "universal_vectorized",
+                  "universal_detect", "universal_batch", "universal_incremental")
 
 class AuditorAppUniversal:
     def __init__(self, root):
@@ -17,31 +30,35 @@ class AuditorAppUniversal:
         
         # Variables
         self.file_path = None
-        self.df = None
-        self.processed_data = []
+        self.processed_data = TransactionStore()
+        self.run_metrics = None
+        self.jobs = JobManager()
+        self.current_job = None
         self.config_file = "auditor_config_universal.json"
         
         # Default configuration
-        self.config = {
-            "col_date": "A",
-            "col_journal": "C", 
-            "col_reference": "G",
-            "col_description": "I",
-            "col_debit": "W",
-            "col_credit": "auto",
-            "col_balance_start": "AF",
-            "col_balance_end": "AF",
-            "col_account_code": "E",
-            "col_account_name": "K",
-            "running_credit_mode": "auto",
-            "debit_type": "auto",
-            "credit_type": "auto", 
-            "balance_type": "auto"
-        }
+        self.config = dict(DEFAULT_CONFIG)
         
         self.load_config()
         self.create_widgets()
         self.create_credit_section()
+        # Idle callbacks run after the pending geometry and map work
+        self.root.after_idle(self._warm_up_engine)
+
+    def _warm_up_engine(self):
+        """Import ENGINE_MODULES on a background thread after first paint"""
+        def load():
+            start = time.perf_counter()
+            try:
+                for name in ENGINE_MODULES:
+                    importlib.import_module(name)
+            except ImportError as e:
+                self.log_message(f"⚠ Could not load the cleaning engine: {e}")
+                return
+            self.log_message(f"⚙️ Engine ready ({time.perf_counter() - start:.2f}s)")
+
+        self.warm_up_thread = threading.Thread(target=load, daemon=True)
+        self.warm_up_thread.start()
     
     def create_credit_section(self):
         """Create credit section at the bottom"""
@@ -121,12 +138,39 @@ class AuditorAppUniversal:
         
         ttk.Button(button_frame, text="PROCESS FILE", 
                   command=self.process_file).pack(side=tk.LEFT, padx=(0, 10))
+        self.cancel_btn = ttk.Button(button_frame, text="CANCEL",
+                                     command=self.cancel_processing, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(button_frame, text="Auto-Detect Columns", 
                   command=self.auto_detect).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(button_frame, text="Save Config", 
                   command=self.save_config).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(button_frame, text="Reset Config", 
-                  command=self.reset_config).pack(side=tk.LEFT)
+                  command=self.reset_config).pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.cache_var = tk.BooleanVar(value=self.config.get("cache_enabled", False))
+        ttk.Checkbutton(button_frame, text="Cache parsed workbooks (faster re-runs)",
+                        variable=self.cache_var).pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.incremental_var = tk.BooleanVar(value=self.config.get("incremental", False))
+        ttk.Checkbutton(button_frame, text="Incremental (only process rows added since the last run)",
+                        variable=self.incremental_var).pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.reconcile_var = tk.BooleanVar(value=self.config.get("reconcile", False))
+        ttk.Checkbutton(button_frame, text="Reconcile balances (account report on export)",
+                        variable=self.reconcile_var).pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.anomalies_var = tk.BooleanVar(value=self.config.get("anomalies", False))
+        ttk.Checkbutton(button_frame, text="Audit tests (duplicates, round amounts, weekends, Benford)",
+                        variable=self.anomalies_var).pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.metrics_var = tk.BooleanVar(value=self.config.get("metrics", False))
+        ttk.Checkbutton(button_frame, text="Profile run (stage timings)",
+                        variable=self.metrics_var).pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.profile_var = tk.BooleanVar(value=self.config.get("profile", False))
+        ttk.Checkbutton(button_frame, text="cProfile dump (.prof on export)",
+                        variable=self.profile_var).pack(side=tk.LEFT)
         
         # Progress bar
         self.progress = ttk.Progressbar(main_frame, mode='determinate')
@@ -139,6 +183,10 @@ class AuditorAppUniversal:
         self.diagnostic_text = scrolledtext.ScrolledText(diag_frame, height=6, width=100)
         self.diagnostic_text.pack(fill=tk.BOTH, expand=True)
         
+        # Worker threads post log lines here; the main loop drains them in batches
+        self.log_buffer = LogBuffer(self.root, self.diagnostic_text)
+        self.log_buffer.start()
+        
         # Export buttons (initially hidden)
         export_frame = ttk.LabelFrame(main_frame, text="3. EXPORT RESULTS", padding="10")
         export_frame.pack(fill=tk.X, pady=(0, 10))
@@ -152,7 +200,11 @@ class AuditorAppUniversal:
         
         self.export_excel_btn = ttk.Button(export_inner, text="📥 EXPORT AS EXCEL", 
                                           command=self.export_excel, state=tk.DISABLED)
-        self.export_excel_btn.pack(side=tk.LEFT)
+        self.export_excel_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.export_parquet_btn = ttk.Button(export_inner, text="📥 EXPORT AS PARQUET", 
+                                            command=self.export_parquet, state=tk.DISABLED)
+        self.export_parquet_btn.pack(side=tk.LEFT)
         
         # Instructions
         instructions = ttk.Label(export_frame, text="💡 After processing, click above to save your cleaned data to a file", 
@@ -167,8 +219,6 @@ class AuditorAppUniversal:
         columns = ('Account Code', 'Account Name', 'Date', 'Journal', 'Reference', 
                   'Description', 'Debit', 'Credit', 'Balance')
         
-        self.tree = ttk.Treeview(table_frame, columns=columns, show='headings', height=12)
-        
         # Define headings
         column_widths = {
             'Account Code': 100,
@@ -182,23 +232,36 @@ class AuditorAppUniversal:
             'Balance': 80
         }
         
-        for col in columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=column_widths.get(col, 100))
-        
-        # Add scrollbars
-        v_scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        h_scrollbar = ttk.Scrollbar(table_frame, orient=tk.HORIZONTAL, command=self.tree.xview)
-        self.tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
-        
-        # Grid treeview and scrollbars
-        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        v_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        h_scrollbar.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        # Browse controls: jump to a row or filter by account code
+        browse_frame = ttk.Frame(table_frame)
+        browse_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+        
+        ttk.Label(browse_frame, text="Go to row:").pack(side=tk.LEFT, padx=(0, 5))
+        self.entry_jump = ttk.Entry(browse_frame, width=10)
+        self.entry_jump.pack(side=tk.LEFT, padx=(0, 5))
+        self.entry_jump.bind('<Return>', lambda e: self.jump_to_row())
+        ttk.Button(browse_frame, text="Go", command=self.jump_to_row).pack(side=tk.LEFT, padx=(0, 15))
+        
+        ttk.Label(browse_frame, text="Account Code:").pack(side=tk.LEFT, padx=(0, 5))
+        self.combo_account_filter = ttk.Combobox(browse_frame, width=18)
+        self.combo_account_filter.pack(side=tk.LEFT, padx=(0, 5))
+        self.combo_account_filter.bind('<Return>', lambda e: self.apply_account_filter())
+        self.combo_account_filter.bind('<<ComboboxSelected>>', lambda e: self.apply_account_filter())
+        ttk.Button(browse_frame, text="Filter", command=self.apply_account_filter).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(browse_frame, text="Clear", command=self.clear_account_filter).pack(side=tk.LEFT, padx=(0, 15))
+        
+        self.preview_label = ttk.Label(browse_frame, text="", foreground='gray')
+        self.preview_label.pack(side=tk.LEFT)
+        
+        # Virtualised treeview: only the visible rows exist as Treeview items
+        self.preview = VirtualTreeview(table_frame, columns, column_widths, height=12)
+        self.preview.on_change = self._update_preview_label
+        self.tree = self.preview.tree
+        self.preview.grid(row=1)
         
         # Configure grid weights
         table_frame.columnconfigure(0, weight=1)
-        table_frame.rowconfigure(0, weight=1)
+        table_frame.rowconfigure(1, weight=1)
 
     def create_config_controls(self, parent):
         """Create configuration controls"""
@@ -271,12 +334,20 @@ class AuditorAppUniversal:
         self.entry_account_name.insert(0, self.config.get("col_account_name", "K"))
         self.entry_account_name.grid(row=4, column=1, sticky=tk.W, padx=(0, 15), pady=2)
         ttk.Label(parent, text="(K = Column 11)", foreground='gray', font=('Arial', 8)).grid(row=4, column=2, sticky=tk.W, pady=2)
+        
+        ttk.Label(parent, text="Sheets:").grid(row=4, column=3, sticky=tk.W, padx=(0, 5), pady=2)
+        self.entry_sheets = ttk.Entry(parent, width=8)
+        self.entry_sheets.insert(0, self.config.get("sheets", "first"))
+        self.entry_sheets.grid(row=4, column=4, sticky=tk.W, padx=(0, 15), pady=2)
+        ttk.Label(parent, text="('first', 'all' or names, comma-separated)", foreground='gray', font=('Arial', 8)).grid(row=4, column=5, sticky=tk.W, pady=2)
 
     def browse_file(self):
         """Browse for Excel file"""
         file_path = filedialog.askopenfilename(
             title="Select Excel File",
-            filetypes=[("Excel files", "*.xlsx *.xls"), ("All files", "*.*")]
+            filetypes=[("Ledger files", "*.xlsx *.xlsm *.xls *.xlsb *.ods *.csv *.txt"),
+                       ("Excel files", "*.xlsx *.xlsm *.xls *.xlsb"), ("CSV files", "*.csv *.txt"),
+                       ("All files", "*.*")]
         )
         
         if file_path:
@@ -287,146 +358,63 @@ class AuditorAppUniversal:
             # Try to auto-detect columns
             self.auto_detect()
 
-    def column_letter_to_number(self, column_letter):
-        """Convert Excel column letter to 0-based number"""
-        if not column_letter or column_letter.lower() == 'auto':
-            return 'auto'
-        
-        letters = column_letter.upper().replace('[^A-Z]', '')
-        number = 0
-        
-        for i, char in enumerate(letters[::-1]):
-            number += (ord(char) - 64) * (26 ** i)
-        
-        return number - 1
-
-    def column_number_to_letter(self, column_number):
-        """Convert 0-based number to Excel column letter"""
-        if column_number < 0:
-            return ''
-        
-        letters = ''
-        num = column_number + 1
-        
-        while num > 0:
-            num, remainder = divmod(num - 1, 26)
-            letters = chr(65 + remainder) + letters
-        
-        return letters
-
-    def is_account_line(self, text):
-        """Check if text contains account information"""
-        if not text:
-            return False
-        text_lower = str(text).lower()
-        return ('account code' in text_lower or 
-                'account' in text_lower and 'code' in text_lower)
-
-    def extract_account_info(self, row):
-        """Extract account code and name from row"""
-        row_text = ' '.join(str(cell) for cell in row if cell)
-        
-        # Method 1: Look for "ACCOUNT CODE:" pattern
-        if self.is_account_line(row_text):
-            # Pattern like "ACCOUNT CODE: 12399-D01 ATTACHMENT ALLOWANCES..."
-            match = re.search(r'account\s*code[:\s]*([^\s]+)\s*(.*)', row_text, re.IGNORECASE)
-            if match:
-                code = match.group(1).strip()
-                name = match.group(2).strip()
-                if code and any(c.isalnum() for c in code):
-                    return code, name
-        
-        # Method 2: Check specific columns for account codes
-        account_code_col = self.column_letter_to_number(self.config.get("col_account_code", "E"))
-        account_name_col = self.column_letter_to_number(self.config.get("col_account_name", "K"))
-        
-        if account_code_col != 'auto' and account_code_col < len(row):
-            code_candidate = str(row[account_code_col]).strip()
-            # Check if it looks like an account code (numbers, dashes, etc.)
-            if code_candidate and re.match(r'^[\d\-A-Z]+$', code_candidate) and len(code_candidate) > 2:
-                name_candidate = ""
-                if account_name_col != 'auto' and account_name_col < len(row):
-                    name_candidate = str(row[account_name_col]).strip()
-                return code_candidate, name_candidate
-        
-        # Method 3: Look for patterns like "12399-D01" anywhere in row
-        for cell in row:
-            cell_str = str(cell).strip()
-            # Pattern for account codes like 12399-D01, 14101-A01, etc.
-            if re.match(r'^\d{4,5}-[A-Z]\d{2}$', cell_str):
-                return cell_str, "Detected Account"
-        
-        return None, None
-
     def auto_detect(self):
         """Auto-detect columns from the loaded file"""
         if not self.file_path:
             messagebox.showwarning("Warning", "Please load a file first")
             return
         
+        from universal_detect import DEFAULT_SAMPLE_ROWS, detect_columns, sample_rows
+        from universal_readers import open_sheet
+
         try:
-            self.df = pd.read_excel(self.file_path, header=None, engine='openpyxl')
-            rows = self.df.head(20).fillna('').astype(str).values.tolist()
-            
-            detected = {}
-            
-            for i, row in enumerate(rows):
-                for col_idx, cell in enumerate(row):
-                    cell_lower = cell.lower().strip()
-                    
-                    if 'date' in cell_lower and 'date' not in detected:
-                        detected['date'] = col_idx
-                    elif ('journal' in cell_lower or 'journ' in cell_lower) and 'journal' not in detected:
-                        detected['journal'] = col_idx
-                    elif ('ref' in cell_lower or 'reference' in cell_lower) and 'reference' not in detected:
-                        detected['reference'] = col_idx
-                    elif ('desc' in cell_lower or 'description' in cell_lower) and 'description' not in detected:
-                        detected['description'] = col_idx
-                    elif 'debit' in cell_lower and 'debit' not in detected:
-                        detected['debit'] = col_idx
-                    elif 'credit' in cell_lower and 'credit' not in detected:
-                        detected['credit'] = col_idx
-                    elif 'balance' in cell_lower and 'balance' not in detected:
-                        detected['balance'] = col_idx
-                    elif ('account' in cell_lower and 'code' in cell_lower) and 'account_code' not in detected:
-                        detected['account_code'] = col_idx
+            # Only the first rows are parsed, straight from the workbook
+            # (hashing the file for a cache lookup would cost more), with a
+            # streaming reader: calamine would parse the whole sheet first
+            sample_size = int(self.config.get("detect_sample_rows", DEFAULT_SAMPLE_ROWS))
+            rows = sample_rows(open_sheet(self.file_path, reader=self.config.get("reader", "auto"),
+                                          streaming=True),
+                               sample_size)
+            detected, header_row = detect_columns(rows)
             
             # Update UI with detected columns
             if 'date' in detected:
                 self.entry_date.delete(0, tk.END)
-                self.entry_date.insert(0, self.column_number_to_letter(detected['date']))
+                self.entry_date.insert(0, column_number_to_letter(detected['date']))
             
             if 'journal' in detected:
                 self.entry_journal.delete(0, tk.END)
-                self.entry_journal.insert(0, self.column_number_to_letter(detected['journal']))
+                self.entry_journal.insert(0, column_number_to_letter(detected['journal']))
             
             if 'reference' in detected:
                 self.entry_reference.delete(0, tk.END)
-                self.entry_reference.insert(0, self.column_number_to_letter(detected['reference']))
+                self.entry_reference.insert(0, column_number_to_letter(detected['reference']))
             
             if 'description' in detected:
                 self.entry_description.delete(0, tk.END)
-                self.entry_description.insert(0, self.column_number_to_letter(detected['description']))
+                self.entry_description.insert(0, column_number_to_letter(detected['description']))
             
             if 'debit' in detected:
                 self.entry_debit.delete(0, tk.END)
-                self.entry_debit.insert(0, self.column_number_to_letter(detected['debit']))
+                self.entry_debit.insert(0, column_number_to_letter(detected['debit']))
             
             if 'balance' in detected:
                 self.entry_balance_start.delete(0, tk.END)
-                self.entry_balance_start.insert(0, self.column_number_to_letter(detected['balance']))
+                self.entry_balance_start.insert(0, column_number_to_letter(detected['balance']))
                 self.entry_balance_end.delete(0, tk.END)
-                self.entry_balance_end.insert(0, self.column_number_to_letter(detected['balance']))
+                self.entry_balance_end.insert(0, column_number_to_letter(detected['balance']))
             
             if 'account_code' in detected:
                 self.entry_account_code.delete(0, tk.END)
-                self.entry_account_code.insert(0, self.column_number_to_letter(detected['account_code']))
+                self.entry_account_code.insert(0, column_number_to_letter(detected['account_code']))
             
             self.log_message("✅ Auto-detection completed!")
+            if header_row is not None:
+                self.log_message(f"📋 Header row: {header_row + 1} (best of the first {len(rows)} rows)")
             
             # Show detected columns
             detected_text = "Detected: " + ", ".join(
-                [f"{key.title().replace('_', ' ')}={self.column_number_to_letter(val)}" 
+                [f"{key.title().replace('_', ' ')}={column_number_to_letter(val)}" 
                  for key, val in detected.items()])
             self.log_message(detected_text)
             
@@ -445,7 +433,14 @@ class AuditorAppUniversal:
             "col_balance_start": self.entry_balance_start.get().strip().upper() or "AF",
             "col_balance_end": self.entry_balance_end.get().strip().upper() or "AF",
             "col_account_code": self.entry_account_code.get().strip().upper() or "E",
-            "col_account_name": self.entry_account_name.get().strip().upper() or "K"
+            "col_account_name": self.entry_account_name.get().strip().upper() or "K",
+            "sheets": self.entry_sheets.get().strip() or "first",
+            "cache_enabled": self.cache_var.get(),
+            "incremental": self.incremental_var.get(),
+            "reconcile": self.reconcile_var.get(),
+            "anomalies": self.anomalies_var.get(),
+            "metrics": self.metrics_var.get(),
+            "profile": self.profile_var.get()
         }
 
     def reset_config(self):
@@ -480,6 +475,15 @@ class AuditorAppUniversal:
         self.entry_account_name.delete(0, tk.END)
         self.entry_account_name.insert(0, "K")
         
+        self.entry_sheets.delete(0, tk.END)
+        self.entry_sheets.insert(0, "first")
+        
+        self.incremental_var.set(False)
+        self.reconcile_var.set(False)
+        self.anomalies_var.set(False)
+        self.metrics_var.set(False)
+        self.profile_var.set(False)
+        
         self.log_message("✅ Configuration reset to defaults!")
 
     def process_file(self):
@@ -491,146 +495,131 @@ class AuditorAppUniversal:
         # Update config from UI
         self.config.update(self.get_current_config())
         
-        # Run processing in thread to avoid GUI freeze
-        thread = threading.Thread(target=self._process_file_thread)
-        thread.daemon = True
-        thread.start()
+        # One job per file: a second click waits for (or cancels) the first
+        if self.jobs.active(self.file_path):
+            messagebox.showwarning("Warning", "This file is already being processed. "
+                                              "Wait for it to finish or click CANCEL.")
+            return
+        
+        # Per-account log lines are listed again from the start of this run
+        self.log_buffer.reset_counts()
+        self._update_ui_processing_start()
+        
+        # Run processing in a background job to avoid GUI freeze; the job
+        # gets its own copy of the settings
+        file_path, config = self.file_path, dict(self.config)
+        self.current_job = self.jobs.start(
+            file_path, lambda token: self._process_file_thread(file_path, config, token))
 
-    def _process_file_thread(self):
-        """Process file in separate thread"""
+    def cancel_processing(self):
+        """Ask the running job to stop; it keeps the transactions found so far"""
+        if self.current_job is not None and self.current_job.running:
+            self.current_job.cancel()
+            self.cancel_btn.config(state=tk.DISABLED)
+            self.log_message("⏹ Cancelling...")
+
+    def _process_file_thread(self, file_path, config, token):
+        """Process file in a background job (cancelled through token)"""
         try:
-            self.root.after(0, self._update_ui_processing_start)
-            
-            # Read file
-            self.df = pd.read_excel(self.file_path, header=None, engine='openpyxl')
-            rows = self.df.fillna('').values.tolist()
-            
-            # Convert config to column numbers
-            number_config = {}
-            for key, value in self.config.items():
-                if key.startswith('col_'):
-                    number_config[key] = self.column_letter_to_number(value)
-            
-            # Process data with account detection
-            processed_data = []
-            current_account_code = "Unknown"
-            current_account_name = "Unknown Account"
-            
-            for i, row in enumerate(rows):
-                # Update progress
-                if i % 100 == 0:
-                    progress = (i / len(rows)) * 100
-                    self.root.after(0, lambda p=progress: self.progress.config(value=p))
-                
-                # Check for account information
-                account_code, account_name = self.extract_account_info(row)
-                if account_code:
-                    current_account_code = account_code
-                    if account_name:
-                        current_account_name = account_name
-                    self.log_message(f"🔍 Found account: {account_code} - {account_name}")
-                    continue
-                
-                # Extract transaction data
-                date_val = self._get_cell_value(row, number_config.get('col_date', 0))
-                journal_val = self._get_cell_value(row, number_config.get('col_journal', 2))
-                ref_val = self._get_cell_value(row, number_config.get('col_reference', 6))
-                desc_val = self._get_cell_value(row, number_config.get('col_description', 8))
-                debit_val = self._get_cell_value(row, number_config.get('col_debit', 22))
-                credit_val = self._get_cell_value(row, number_config.get('col_credit', 'auto'))
-                balance_val = self._get_cell_value(row, number_config.get('col_balance_start', 31))
-                
-                # Auto-detect credit if set to auto
-                if credit_val == 'auto' or not credit_val:
-                    credit_val = self._auto_detect_credit(row, number_config)
-                
-                # Check if this is a transaction row
-                if self._is_transaction_row(date_val, ref_val, debit_val, credit_val):
-                    processed_data.append({
-                        'Account Code': current_account_code,
-                        'Account Name': current_account_name,
-                        'Date': date_val,
-                        'Journal': journal_val,
-                        'Reference': ref_val,
-                        'Description': desc_val,
-                        'Debit': debit_val,
-                        'Credit': credit_val,
-                        'Balance': balance_val
-                    })
+            from universal_batch import is_multi_sheet, run_batch
+            from universal_engine import create_engine
+            from universal_incremental import IncrementalProcessor
+            from universal_metrics import create_metrics
+
+            start_time = time.perf_counter()
             
-            self.processed_data = processed_data
+            progress_callback = lambda p: self.root.after(0, lambda: self._update_progress(token, p))
+            if is_multi_sheet(config):
+                # Several sheets: one worker process per sheet, merged with
+                # Source File and Sheet columns in sheet order
+                metrics = create_metrics(config)
+                processed_data, failures = run_batch(
+                    [file_path], config, config.get("workers", 0),
+                    log_callback=self.log_message, progress_callback=progress_callback,
+                    metrics=metrics, cancel_token=token)
+                if failures:
+                    raise ValueError(failures[file_path])
+            else:
+                # Clean with the configured engine (streaming row loop by default)
+                engine = create_engine(
+                    config,
+                    log_callback=self.log_message,
+                    progress_callback=progress_callback,
+                    cancel_token=token)
+                if config.get("incremental"):
+                    with engine.metrics.profiling() if engine.metrics is not None else nullcontext():
+                        processed_data = IncrementalProcessor(engine).process_file(file_path)
+                else:
+                    processed_data = engine.process_file(file_path)
+                metrics = engine.metrics
+            elapsed = time.perf_counter() - start_time
             
             # Update UI on main thread
-            self.root.after(0, lambda: self._update_ui_processing_done(processed_data))
+            self.root.after(0, lambda: self._update_ui_processing_done(
+                token, processed_data, metrics, elapsed))
             
         except Exception as e:
-            self.root.after(0, lambda: self.log_message(f"❌ Processing error: {str(e)}"))
-
-    def _auto_detect_credit(self, row, number_config):
-        """Auto-detect credit amount from row"""
-        # Skip debit and balance columns
-        skip_cols = []
-        if number_config.get('col_debit') != 'auto':
-            skip_cols.append(number_config['col_debit'])
-        if number_config.get('col_balance_start') != 'auto':
-            skip_cols.extend(range(number_config['col_balance_start'], 
-                                 number_config.get('col_balance_end', number_config['col_balance_start']) + 1))
-        
-        # Look for numeric values in other columns
-        for col_idx, cell in enumerate(row):
-            if col_idx in skip_cols:
-                continue
-            if self._is_numeric(cell) and float(cell) > 0:
-                return cell
-        return ""
-
-    def _is_transaction_row(self, date, reference, debit, credit):
-        """Check if row contains transaction data"""
-        has_date = bool(str(date).strip())
-        has_ref = bool(str(reference).strip())
-        has_debit = self._is_numeric(debit) and float(debit) > 0
-        has_credit = self._is_numeric(credit) and float(credit) > 0
-        
-        return (has_date and has_ref) or (has_date and (has_debit or has_credit))
-
-    def _get_cell_value(self, row, col_index):
-        """Safely get cell value from row"""
-        if col_index == 'auto' or col_index >= len(row):
-            return ''
-        value = row[col_index]
-        return value if value is not None else ''
-
-    def _is_numeric(self, value):
-        """Check if value is numeric"""
-        try:
-            float(str(value))
-            return True
-        except:
-            return False
+            message = f"❌ Processing error: {str(e)}"
+            self.root.after(0, lambda: self._update_ui_processing_failed(token, message))
+
+    def _is_current(self, token):
+        """Whether token belongs to the job the UI is showing"""
+        return self.current_job is not None and self.current_job.token is token
+
+    def _update_progress(self, token, value):
+        if self._is_current(token):
+            self.progress.config(value=value)
 
     def _update_ui_processing_start(self):
         """Update UI when processing starts"""
         self.progress.config(value=0)
         self.log_message("🔄 Processing file...")
+        self.cancel_btn.config(state=tk.NORMAL)
         self.export_csv_btn.config(state=tk.DISABLED)
         self.export_excel_btn.config(state=tk.DISABLED)
+        self.export_parquet_btn.config(state=tk.DISABLED)
         
         # Clear previous results
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.preview.set_data([])
 
-    def _update_ui_processing_done(self, processed_data):
-        """Update UI when processing is done"""
-        self.progress.config(value=100)
-        self.log_message(f"✅ PROCESSING COMPLETE! Found {len(processed_data)} transactions")
-        self.log_message(f"📊 Accounts detected: {len(set([d['Account Code'] for d in processed_data]))} unique account codes")
+    def _update_ui_processing_failed(self, token, message):
+        """Update UI when processing raised an error"""
+        self.log_message(message)
+        if self._is_current(token):
+            self.cancel_btn.config(state=tk.DISABLED)
+
+    def _update_ui_processing_done(self, token, processed_data, metrics, elapsed):
+        """Update UI when processing is done (or was cancelled)"""
+        if not self._is_current(token):
+            # A newer run (of another file) owns the results area
+            self.log_message(f"ℹ An earlier run finished with {len(processed_data)} transactions "
+                             f"in {elapsed:.2f}s - not shown, the newer run's results are kept")
+            return
+        self.processed_data = processed_data
+        self.run_metrics = metrics
+        self.cancel_btn.config(state=tk.DISABLED)
+        self.log_buffer.summarize('account', 'account headers')
+        if token.cancelled:
+            self.log_message(f"⏹ PROCESSING CANCELLED after {elapsed:.2f}s - kept {len(processed_data)} "
+                             f"transactions from the rows read so far (you can still export them)")
+        else:
+            self.progress.config(value=100)
+            self.log_message(f"✅ PROCESSING COMPLETE! Found {len(processed_data)} transactions in {elapsed:.2f}s")
+        self.log_message(f"📊 Accounts detected: {len(processed_data.distinct('Account Code'))} unique account codes")
         
         # Enable export buttons
         self.export_csv_btn.config(state=tk.NORMAL)
         self.export_excel_btn.config(state=tk.NORMAL)
+        self.export_parquet_btn.config(state=tk.NORMAL)
         
         # Update results table
-        self.update_results_table(processed_data)
+        if self.run_metrics is not None:
+            with self.run_metrics.stage('preview'):
+                self.update_results_table(processed_data)
+            for line in self.run_metrics.summary_lines():
+                self.log_message(line)
+        else:
+            self.update_results_table(processed_data)
         
         # Show export instructions
         self.log_message("💡 **NEXT STEP:** Click 'EXPORT AS CSV' or 'EXPORT AS EXCEL' above to save your file!")
@@ -638,25 +627,40 @@ class AuditorAppUniversal:
 
     def update_results_table(self, data):
         """Update the results table with processed data"""
-        # Clear existing data
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Add new data
-        for row in data[:500]:  # Limit to 500 rows for performance
-            self.tree.insert('', tk.END, values=(
-                row.get('Account Code', ''),
-                row.get('Account Name', ''),
-                row.get('Date', ''),
-                row.get('Journal', ''),
-                row.get('Reference', ''),
-                row.get('Description', ''),
-                row.get('Debit', ''),
-                row.get('Credit', ''),
-                row.get('Balance', '')
-            ))
-        
-        self.log_message(f"📊 Displaying {min(len(data), 500)} of {len(data)} rows in preview")
+        self.preview.set_data(data)
+        self.combo_account_filter.set('')
+        self.combo_account_filter.config(values=sorted(set(str(code) for code in data.distinct('Account Code'))))
+        
+        self.log_message(f"📊 Preview holds all {len(data)} rows - scroll, go to a row or filter by account code")
+
+    def jump_to_row(self):
+        """Scroll the preview to the row number typed in the Go to row box"""
+        text = self.entry_jump.get().strip()
+        if not text.isdigit():
+            messagebox.showwarning("Warning", "Please enter a row number")
+            return
+        self.preview.jump_to(max(int(text) - 1, 0))
+
+    def apply_account_filter(self):
+        """Only show rows for the account code in the filter box"""
+        account_code = self.combo_account_filter.get().strip()
+        matches = self.preview.set_filter(account_code)
+        if account_code:
+            self.log_message(f"🔍 Filter '{account_code}': {matches} rows")
+
+    def clear_account_filter(self):
+        """Show all rows again"""
+        self.combo_account_filter.set('')
+        self.preview.set_filter('')
+
+    def _update_preview_label(self):
+        """Show which rows are on screen"""
+        first, last = self.preview.visible_range()
+        total = len(self.preview)
+        if total:
+            self.preview_label.config(text=f"Showing {first + 1:,}-{last:,} of {total:,}")
+        else:
+            self.preview_label.config(text="")
 
     def export_csv(self):
         """Export processed data to CSV"""
@@ -673,8 +677,7 @@ class AuditorAppUniversal:
         
         if file_path:
             try:
-                df = pd.DataFrame(self.processed_data)
-                df.to_csv(file_path, index=False)
+                self._write_export(file_path)
                 self.log_message(f"✅ CSV file saved: {file_path}")
                 messagebox.showinfo("Success", f"File saved successfully!\n\n{file_path}")
             except Exception as e:
@@ -696,19 +699,55 @@ class AuditorAppUniversal:
         
         if file_path:
             try:
-                df = pd.DataFrame(self.processed_data)
-                df.to_excel(file_path, index=False, engine='openpyxl')
+                self._write_export(file_path)
                 self.log_message(f"✅ Excel file saved: {file_path}")
                 messagebox.showinfo("Success", f"File saved successfully!\n\n{file_path}")
             except Exception as e:
                 self.log_message(f"❌ Export failed: {str(e)}")
                 messagebox.showerror("Error", f"Failed to save file:\n{str(e)}")
 
-    def log_message(self, message):
-        """Add message to diagnostic area"""
-        self.diagnostic_text.insert(tk.END, message + "\n")
-        self.diagnostic_text.see(tk.END)
-        self.diagnostic_text.update()
+    def export_parquet(self):
+        """Export processed data to Parquet or Feather with typed columns"""
+        if not self.processed_data:
+            messagebox.showwarning("Warning", "No data to export. Please process a file first.")
+            return
+        
+        file_path = filedialog.asksaveasfilename(
+            title="Save As Parquet",
+            defaultextension=".parquet",
+            filetypes=[("Parquet files", "*.parquet"), ("Feather files", "*.feather"), ("All files", "*.*")],
+            initialfile="cleaned_ledger_with_accounts.parquet"
+        )
+        
+        if file_path:
+            try:
+                if not file_path.lower().endswith(('.parquet', '.feather')):
+                    file_path += '.parquet'
+                self._write_export(file_path)
+                self.log_message(f"✅ Parquet file saved: {file_path}")
+                messagebox.showinfo("Success", f"File saved successfully!\n\n{file_path}")
+            except Exception as e:
+                self.log_message(f"❌ Export failed: {str(e)}")
+                messagebox.showerror("Error", f"Failed to save file:\n{str(e)}")
+
+    def _write_export(self, file_path):
+        """Write the results, plus the ticked reports and the run's metrics file when asked for"""
+        from universal_cli import write_reports
+        from universal_engine import write_output
+
+        metrics = self.run_metrics
+        with metrics.stage('export') if metrics is not None else nullcontext():
+            write_output(self.processed_data, file_path)
+        config = dict(self.config, reconcile=self.reconcile_var.get(), anomalies=self.anomalies_var.get())
+        write_reports(self.processed_data, file_path, config, metrics, self.log_message)
+        if metrics is not None:
+            self.log_message(f"📈 Metrics saved: {metrics.write(file_path)}")
+            if metrics.profiler is not None:
+                self.log_message(f"🔬 cProfile dump saved: {file_path}.prof")
+
+    def log_message(self, message, kind=None):
+        """Add message to diagnostic area (safe to call from any thread)"""
+        self.log_buffer.post(message, kind)
 
 def main():
     root = tk.Tk()
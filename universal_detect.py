@@ -0,0 +1,156 @@
+from dataclasses import dataclass
+from itertools import chain, islice
+
+from universal_amounts import is_missing, parse_amount
+
+DEFAULT_SAMPLE_ROWS = 50
+
+# Credit column inference: rows profiled, the score a candidate needs, and
+# how close to the best score a runner-up must be to stay a candidate
+CREDIT_SAMPLE_ROWS = 1000
+CREDIT_MIN_CONFIDENCE = 0.6
+CREDIT_CANDIDATE_RATIO = 0.5
+MAX_CREDIT_CANDIDATES = 3
+
+# Header keywords per field, tried in this order for each cell; a cell is
+# assigned to the first field it matches that has no column yet
+HEADER_FIELDS = (
+    ('date', ('date',)),
+    ('journal', ('journal', 'journ')),
+    ('reference', ('ref', 'reference')),
+    ('description', ('desc', 'description')),
+    ('debit', ('debit',)),
+    ('credit', ('credit',)),
+    ('balance', ('balance',)),
+    ('account_code', ()),
+)
+
+
+def _match_field(cell_lower, detected):
+    for field, keywords in HEADER_FIELDS:
+        if field in detected:
+            continue
+        if field == 'account_code':
+            if 'account' in cell_lower and 'code' in cell_lower:
+                return field
+        elif any(keyword in cell_lower for keyword in keywords):
+            return field
+    return None
+
+
+def scan_header_cells(rows, detected=None):
+    """First column per field across rows, in reading order"""
+    detected = {} if detected is None else detected
+    for row in rows:
+        for col_idx, cell in enumerate(row):
+            field = _match_field(str(cell).lower().strip(), detected)
+            if field:
+                detected[field] = col_idx
+    return detected
+
+
+def detect_columns(rows):
+    """Detect column positions from a sample of rows.
+
+    Every row is scored by how many different fields its cells name; the
+    best row (earliest on a tie) is taken as the header row. Fields it does
+    not name are filled from the first matching cell anywhere in the sample.
+    Returns (detected, header_row) where detected maps field -> 0-based
+    column and header_row is a 0-based row index, or None when no row names
+    at least two fields.
+    """
+    rows = [list(row) for row in rows]
+    header_row, best = None, {}
+    for i, row in enumerate(rows):
+        fields = scan_header_cells([row])
+        if len(fields) >= 2 and len(fields) > len(best):
+            header_row, best = i, fields
+
+    detected = scan_header_cells(rows, dict(best))
+    # Keep the fields in HEADER_FIELDS order for display
+    order = [field for field, _ in HEADER_FIELDS]
+    return {field: detected[field] for field in order if field in detected}, header_row
+
+
+def peek_rows(row_source, sample_size):
+    """(first sample_size rows, iterator over every row including those)"""
+    row_iter = iter(row_source)
+    head = list(islice(row_iter, sample_size))
+    return head, chain(head, row_iter)
+
+
+def sample_rows(row_source, sample_size=DEFAULT_SAMPLE_ROWS):
+    """The first sample_size rows of a reader; the rest is never parsed"""
+    row_iter = iter(row_source)
+    try:
+        return list(islice(row_iter, sample_size))
+    finally:
+        # Close streaming readers (and their workbook) straight away
+        if hasattr(row_iter, 'close'):
+            row_iter.close()
+
+
+@dataclass(frozen=True)
+class CreditColumnInference:
+    """Outcome of infer_credit_column().
+
+    columns are the candidate credit columns, best first, or empty when no
+    column scored min_confidence (rows are then scanned one by one).
+    best is the top-scoring column even when it did not qualify.
+    """
+    columns: tuple
+    best: object
+    confidence: float
+    rows_sampled: int
+
+
+def infer_credit_column(sample, date_col, debit_col, exclude=(), accounting=True,
+                        min_confidence=CREDIT_MIN_CONFIDENCE):
+    """Pick the credit column from a sample of rows.
+
+    Only rows with a date are profiled. A column scores
+    coverage x exclusivity. Coverage is the share of rows without a debit
+    that hold a positive amount in the column. Exclusivity is the share of
+    the column's positive amounts that sit on rows without a debit. A
+    credit column scores close to 1. Columns that are filled on every row
+    (running totals, quantities, serial dates) score about the share of
+    credit rows, and sparse memo numbers score low.
+    """
+    exclude = set(exclude)
+    profiled = without_debit = 0
+    positive = {}
+    positive_without_debit = {}
+    for row in sample:
+        if date_col is None or date_col >= len(row):
+            continue
+        date = row[date_col]
+        if is_missing(date) or not str(date).strip():
+            continue
+        profiled += 1
+        debit = row[debit_col] if debit_col is not None and debit_col < len(row) else ''
+        has_debit = (parse_amount(debit, accounting, signed_side=False) or 0) > 0
+        without_debit += not has_debit
+        for col_idx, cell in enumerate(row):
+            if col_idx in exclude:
+                continue
+            amount = parse_amount(cell, accounting, signed_side=False)
+            if amount is not None and amount > 0:
+                positive[col_idx] = positive.get(col_idx, 0) + 1
+                if not has_debit:
+                    positive_without_debit[col_idx] = positive_without_debit.get(col_idx, 0) + 1
+
+    scores = {}
+    if without_debit:
+        for col_idx, hits in positive_without_debit.items():
+            scores[col_idx] = (hits / without_debit) * (hits / positive[col_idx])
+    if not scores:
+        return CreditColumnInference((), None, 0.0, profiled)
+
+    ranked = sorted(scores, key=lambda col_idx: (-scores[col_idx], col_idx))
+    best = ranked[0]
+    confidence = scores[best]
+    # Runners-up must qualify on their own as well
+    cutoff = max(min_confidence, confidence * CREDIT_CANDIDATE_RATIO)
+    columns = tuple(col_idx for col_idx in ranked[:MAX_CREDIT_CANDIDATES]
+                    if scores[col_idx] >= cutoff)
+    return CreditColumnInference(columns, best, confidence, profiled)
@@ -0,0 +1,442 @@
+import os
+import re
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+
+from universal_amounts import AMOUNT_FORMATS, is_missing, parse_amount, typed_amount
+from universal_cache import CachedSheetReader, WorkbookCache
+from universal_columnar import MappedSheetReader
+from universal_config import (CREDIT_INFERENCE_MODES, DEFAULT_CONFIG, ENGINES,  # noqa: F401
+                              column_letter_to_number, column_number_to_letter,
+                              load_config_file)
+from universal_detect import (CREDIT_MIN_CONFIDENCE, CREDIT_SAMPLE_ROWS, infer_credit_column,
+                              peek_rows)
+from universal_headers import AccountHeaderDetector, cell_text
+from universal_jobs import cancellable_rows
+from universal_metrics import create_metrics
+from universal_readers import open_sheet
+from universal_results import OUTPUT_COLUMNS, TransactionStore
+from universal_writers import ARROW_FORMATS, results_frame, write_arrow, write_csv_chunked
+
+# Account code/name for transactions before the first account header
+INITIAL_ACCOUNT_STATE = ("Unknown", "Unknown Account")
+
+
+@dataclass(frozen=True)
+class ExtractionPlan:
+    """Config compiled once per run for the row loop.
+
+    Column fields are validated 0-based indices, or None for 'auto'.
+    accounting_amounts says whether amount text such as "1,234.56",
+    "(500.00)" or "500.00 CR" is read as a number (see universal_amounts).
+    """
+    col_date: object
+    col_journal: object
+    col_reference: object
+    col_description: object
+    col_debit: object
+    col_credit: object
+    col_balance_start: object
+    col_balance_end: object
+    col_account_code: object
+    col_account_name: object
+    credit_skip_cols: frozenset
+    accounting_amounts: bool
+    account_line_pattern: re.Pattern
+    code_column_pattern: re.Pattern
+    detected_code_pattern: re.Pattern
+    detected_code_hint: re.Pattern
+
+    @classmethod
+    def from_config(cls, config):
+        """Validate the column letters in config and compile the plan"""
+        columns = {}
+        for key in ('col_date', 'col_journal', 'col_reference', 'col_description',
+                    'col_debit', 'col_credit', 'col_balance_start', 'col_balance_end',
+                    'col_account_code', 'col_account_name'):
+            value = config.get(key, DEFAULT_CONFIG[key])
+            try:
+                number = column_letter_to_number(value)
+            except ValueError:
+                raise ValueError(f"Invalid column letter for {key}: '{value}'")
+            columns[key] = None if number == 'auto' else number
+
+        amount_format = config.get("amount_format", DEFAULT_CONFIG["amount_format"])
+        if amount_format not in AMOUNT_FORMATS:
+            raise ValueError(f"Unknown amount_format '{amount_format}' "
+                             f"(expected one of: {', '.join(AMOUNT_FORMATS)})")
+
+        # Credit auto-detection skips the debit and balance columns
+        if columns['col_balance_end'] is None:
+            columns['col_balance_end'] = columns['col_balance_start']
+        skip_cols = set()
+        if columns['col_debit'] is not None:
+            skip_cols.add(columns['col_debit'])
+        if columns['col_balance_start'] is not None:
+            skip_cols.update(range(columns['col_balance_start'], columns['col_balance_end'] + 1))
+
+        return cls(
+            credit_skip_cols=frozenset(skip_cols),
+            accounting_amounts=amount_format == "accounting",
+            # Pattern like "ACCOUNT CODE: 12399-D01 ATTACHMENT ALLOWANCES..."
+            account_line_pattern=re.compile(r'account\s*code[:\s]*([^\s]+)\s*(.*)', re.IGNORECASE),
+            # Looks like an account code (numbers, dashes, etc.)
+            code_column_pattern=re.compile(r'^[\d\-A-Z]+$'),
+            # Account codes like 12399-D01, 14101-A01, etc.
+            detected_code_pattern=re.compile(r'^\d{4,5}-[A-Z]\d{2}$'),
+            # Text cells each followed by NUL hold a match wherever a cell
+            # matches detected_code_pattern (see AccountHeaderDetector)
+            detected_code_hint=re.compile(r'-[A-Z]\d{2}\s*\x00'),
+            **columns)
+
+
+def create_engine(config=None, log_callback=None, progress_callback=None, cancel_token=None):
+    """Build the engine selected by config["engine"]"""
+    engine_name = (config or {}).get("engine", "stream")
+    if engine_name == "vectorized":
+        from universal_vectorized import VectorizedLedgerEngine
+        return VectorizedLedgerEngine(config, log_callback, progress_callback, cancel_token)
+    if engine_name != "stream":
+        raise ValueError(f"Unknown engine '{engine_name}' (expected one of: {', '.join(ENGINES)})")
+    return LedgerCleanerEngine(config, log_callback, progress_callback, cancel_token)
+
+
+class LedgerCleanerEngine:
+    """GUI-free cleaning engine shared by the desktop app and the batch CLI"""
+
+    # Rows are classified as they stream in, so large files are read with a
+    # backend that does not load the whole sheet (see select_reader)
+    low_memory_reads = True
+
+    def __init__(self, config=None, log_callback=None, progress_callback=None, cancel_token=None):
+        self.config = dict(DEFAULT_CONFIG)
+        if config:
+            self.config.update(config)
+        self.log_callback = log_callback
+        self.progress_callback = progress_callback
+        self.cancel_token = cancel_token
+        # Set when the last process_rows stopped early on cancel_token
+        self.cancelled = False
+        self.account_state = INITIAL_ACCOUNT_STATE
+        # Credit columns used by the last run; () means each row was scanned
+        self.credit_columns = None
+        self.metrics = create_metrics(self.config)
+
+    def log_message(self, message, kind=None):
+        """Forward a log line to the caller (GUI log, stderr, ...).
+
+        Repetitive per-row lines carry a kind (e.g. 'account') so the caller
+        can summarise them; callbacks taking only the message still work.
+        """
+        if self.log_callback:
+            if kind is None:
+                self.log_callback(message)
+            else:
+                self.log_callback(message, kind)
+
+    def _stage(self, name):
+        """Time a block as a metrics stage (no-op when metrics are off)"""
+        return self.metrics.stage(name) if self.metrics is not None else nullcontext()
+
+    def _lap(self, name):
+        if self.metrics is not None:
+            self.metrics.lap(name)
+
+    def _count(self, name, n=1):
+        if self.metrics is not None:
+            self.metrics.count(name, n)
+
+    def _profiling(self):
+        return self.metrics.profiling() if self.metrics is not None else nullcontext()
+
+    def _cancellable(self, rows):
+        """rows, cut short (at a row boundary) if cancel_token is cancelled"""
+        self.cancelled = False
+        if self.cancel_token is None:
+            return rows
+        return cancellable_rows(rows, self.cancel_token, self._on_cancel)
+
+    def _on_cancel(self, row_count):
+        self.cancelled = True
+        self.log_message(f"⏹ Cancelled after {row_count:,} rows - keeping the transactions found so far")
+
+    def is_account_line(self, text):
+        """Check if text contains account information"""
+        if not text:
+            return False
+        text_lower = str(text).lower()
+        return ('account code' in text_lower or
+                'account' in text_lower and 'code' in text_lower)
+
+    def compile_plan(self):
+        """Compile the current config into an ExtractionPlan"""
+        return ExtractionPlan.from_config(self.config)
+
+    def extract_account_info(self, row, plan=None):
+        """Extract account code and name from row"""
+        if plan is None:
+            plan = self.compile_plan()
+        row_text = ' '.join(str(cell) for cell in row if not is_missing(cell) and cell)
+
+        # Method 1: Look for "ACCOUNT CODE:" pattern
+        if self.is_account_line(row_text):
+            match = plan.account_line_pattern.search(row_text)
+            if match:
+                code = match.group(1).strip()
+                name = match.group(2).strip()
+                if code and any(c.isalnum() for c in code):
+                    self._count('method_1_hits')
+                    return code, name
+
+        # Method 2: Check specific columns for account codes
+        account_code_col = plan.col_account_code
+        account_name_col = plan.col_account_name
+
+        if account_code_col is not None and account_code_col < len(row):
+            code_candidate = cell_text(row[account_code_col])
+            if code_candidate and plan.code_column_pattern.match(code_candidate) and len(code_candidate) > 2:
+                name_candidate = ""
+                if account_name_col is not None and account_name_col < len(row):
+                    name_candidate = cell_text(row[account_name_col])
+                self._count('method_2_hits')
+                return code_candidate, name_candidate
+
+        # Method 3: Look for patterns like "12399-D01" anywhere in row
+        for cell in row:
+            cell_str = str(cell).strip()
+            if plan.detected_code_pattern.match(cell_str):
+                self._count('method_3_hits')
+                return cell_str, "Detected Account"
+
+        return None, None
+
+    def infer_credit_columns(self, sample, plan):
+        """Credit columns to use for a run, from a sample of its first rows.
+
+        Returns the ranked candidate columns, or () when credit cells
+        should be found by scanning each row (credit_inference "scan", or
+        no column scored credit_min_confidence).
+        """
+        mode = self.config.get("credit_inference", "auto")
+        if mode not in CREDIT_INFERENCE_MODES:
+            raise ValueError(f"Unknown credit_inference '{mode}' "
+                             f"(expected one of: {', '.join(CREDIT_INFERENCE_MODES)})")
+        if mode == "scan":
+            return ()
+
+        # The credit amount never comes from a column mapped to another field
+        exclude = set(plan.credit_skip_cols)
+        exclude.update(col for col in (plan.col_date, plan.col_journal, plan.col_reference,
+                                       plan.col_description, plan.col_credit,
+                                       plan.col_account_code, plan.col_account_name)
+                       if col is not None)
+        min_confidence = float(self.config.get("credit_min_confidence", CREDIT_MIN_CONFIDENCE))
+        inference = infer_credit_column(sample, plan.col_date, plan.col_debit, exclude,
+                                        plan.accounting_amounts, min_confidence)
+
+        if inference.columns:
+            letters = [column_number_to_letter(col) for col in inference.columns]
+            also = f" (then {', '.join(letters[1:])})" if len(letters) > 1 else ""
+            self.log_message(f"💳 Credit column: {letters[0]}{also} - "
+                             f"{inference.confidence:.0%} confidence from {inference.rows_sampled} sample rows")
+        elif inference.best is not None:
+            self.log_message(f"⚠ No clear credit column (best: {column_number_to_letter(inference.best)} "
+                             f"at {inference.confidence:.0%}) - scanning each row for a credit amount")
+        else:
+            self.log_message("⚠ No credit amounts in the sample - scanning each row for a credit amount")
+        return inference.columns
+
+    def _credit_sample_size(self):
+        return int(self.config.get("credit_sample_rows", CREDIT_SAMPLE_ROWS))
+
+    def process_rows(self, rows, start_state=None, credit_columns=None):
+        """Run the account/transaction state machine over rows.
+
+        rows can be a list or a streaming reader; rows are consumed one at a
+        time and never indexed, so only the output is kept in memory. Returns
+        a TransactionStore with the OUTPUT_COLUMNS.
+
+        start_state is the (account code, account name) in force before the
+        first row, for resuming a run; the state after the last row is left
+        in self.account_state. If cancel_token is cancelled the run stops at
+        the next check with the transactions found so far and sets
+        self.cancelled.
+
+        credit_columns fixes where auto credit amounts come from (see
+        infer_credit_columns) when resuming a run. By default they are
+        inferred from the first rows. The columns used are left in
+        self.credit_columns.
+        """
+        plan = self.compile_plan()
+        accounting = plan.accounting_amounts
+
+        # Process data with account detection
+        processed_data = TransactionStore()
+        current_account_code, current_account_name = start_state or INITIAL_ACCOUNT_STATE
+
+        detect_header = AccountHeaderDetector(plan, self.extract_account_info, self._count)
+        auto_detect_credit = self._auto_detect_credit
+        row_source = self._cancellable(rows)
+        if credit_columns is None:
+            sample, row_source = peek_rows(row_source, self._credit_sample_size())
+            credit_columns = self.infer_credit_columns(sample, plan)
+        self.credit_columns = credit_columns
+        metrics = self.metrics
+        if metrics is not None:
+            detect_header = metrics.timed('account_detection', detect_header)
+            auto_detect_credit = metrics.timed('credit_auto_detect', auto_detect_credit)
+            row_source = metrics.timed_rows('read', row_source)
+        rows_seen = account_headers = credit_scans = 0
+
+        for i, row in enumerate(row_source):
+            # Update progress
+            if i % 100 == 0 and self.progress_callback:
+                total_rows = len(rows)
+                if total_rows:
+                    self.progress_callback(min((i / total_rows) * 100, 100))
+
+            # Check for account information
+            rows_seen += 1
+            account_code, account_name = detect_header(row)
+            if account_code:
+                account_headers += 1
+                current_account_code = account_code
+                if account_name:
+                    current_account_name = account_name
+                self.log_message(f"🔍 Found account: {account_code} - {account_name}", 'account')
+                continue
+
+            # Extract transaction data
+            date_val = self._get_cell_value(row, plan.col_date)
+            journal_val = self._get_cell_value(row, plan.col_journal)
+            ref_val = self._get_cell_value(row, plan.col_reference)
+            desc_val = self._get_cell_value(row, plan.col_description)
+            debit_val = self._get_cell_value(row, plan.col_debit)
+            credit_val = self._get_cell_value(row, plan.col_credit)
+            balance_val = self._get_cell_value(row, plan.col_balance_start)
+
+            # Auto-detect credit if set to auto
+            if credit_val == 'auto' or not credit_val:
+                credit_scans += 1
+                credit_val = auto_detect_credit(row, plan)
+
+            # Amount text becomes a number once, here
+            if accounting:
+                debit_val = typed_amount(debit_val, signed_side=False)
+                credit_val = typed_amount(credit_val, signed_side=False)
+                balance_val = typed_amount(balance_val)
+
+            # Check if this is a transaction row
+            if self._is_transaction_row(date_val, ref_val, debit_val, credit_val):
+                processed_data.append_values((
+                    current_account_code, current_account_name, date_val, journal_val,
+                    ref_val, desc_val, debit_val, credit_val, balance_val))
+
+        self.account_state = (current_account_code, current_account_name)
+        if metrics is not None:
+            metrics.count('rows_seen', rows_seen)
+            metrics.count('account_headers', account_headers)
+            metrics.count('credit_auto_scans', credit_scans)
+            metrics.count('transactions', len(processed_data))
+        return processed_data
+
+    def open_rows(self, file_path, sheet_name=None):
+        """Rows of a sheet (the first by default), from the workbook cache when it is enabled.
+
+        The reader backend comes from the "reader" config key; "auto" picks
+        the fastest one installed for the file's format (see select_reader).
+        With "mapped_store" the rows come from the sheet's memory-mapped
+        store instead, converted on the first run (see mapped_rows).
+        """
+        with self._stage('open'):
+            mapped = self.config.get("mapped_store")
+            reader = open_sheet(file_path, sheet_name, self.config.get("reader", "auto"),
+                                low_memory=self.low_memory_reads or mapped)
+            rows = reader
+            if mapped:
+                rows = self._mapped_rows(file_path, sheet_name, reader)
+            elif self.config.get("cache_enabled"):
+                rows = WorkbookCache.from_config(self.config).rows(file_path, sheet_name, reader)
+            if not isinstance(rows, (CachedSheetReader, MappedSheetReader)):
+                self.log_message(f"📖 Reading {os.path.basename(file_path)} with {reader.backend}")
+            return rows
+
+    def _mapped_rows(self, file_path, sheet_name, reader):
+        cache = WorkbookCache.from_config(self.config)
+        if cache.is_mapped(file_path, sheet_name, reader.backend):
+            return cache.mapped_rows(file_path, sheet_name, reader, self.cancel_token)
+        self.log_message(f"🗄 Converting {os.path.basename(file_path)} into a memory-mapped store "
+                         f"with {reader.backend} (first run only)...")
+        start = time.perf_counter()
+        rows = cache.mapped_rows(file_path, sheet_name, reader, self.cancel_token)
+        if isinstance(rows, MappedSheetReader):
+            self.log_message(f"🗄 Stored {len(rows):,} rows x {rows.width} columns "
+                             f"in {time.perf_counter() - start:.1f}s")
+        return rows
+
+    def process_file(self, file_path, sheet_name=None):
+        """Stream and clean one sheet (the first by default) of a workbook"""
+        with self._profiling():
+            return self.process_rows(self.open_rows(file_path, sheet_name))
+
+    def _auto_detect_credit(self, row, plan):
+        """Auto-detect credit amount from row"""
+        accounting = plan.accounting_amounts
+        if self.credit_columns:
+            # First positive amount in the inferred columns, best first
+            for col_idx in self.credit_columns:
+                if col_idx < len(row):
+                    cell = row[col_idx]
+                    amount = parse_amount(cell, accounting, signed_side=False)
+                    if amount is not None and amount > 0:
+                        return cell
+            return ""
+
+        # Fallback: scan the row, skipping debit and balance columns
+        skip_cols = plan.credit_skip_cols
+
+        # Look for numeric values in other columns
+        for col_idx, cell in enumerate(row):
+            if col_idx in skip_cols:
+                continue
+            amount = parse_amount(cell, accounting, signed_side=False)
+            if amount is not None and amount > 0:
+                return cell
+        return ""
+
+    def _is_transaction_row(self, date, reference, debit, credit):
+        """Check if row contains transaction data (amount text already converted)"""
+        has_date = bool(str(date).strip())
+        has_ref = bool(str(reference).strip())
+        has_debit = (parse_amount(debit, accounting=False) or 0) > 0
+        has_credit = (parse_amount(credit, accounting=False) or 0) > 0
+
+        return (has_date and has_ref) or (has_date and (has_debit or has_credit))
+
+    def _get_cell_value(self, row, col_index):
+        """Safely get cell value from row"""
+        if col_index is None or col_index >= len(row):
+            return ''
+        value = row[col_index]
+        if type(value) is str:
+            return value
+        return '' if is_missing(value) else value
+
+
+def write_output(processed_data, output_path, columns=None):
+    """Write cleaned transactions to CSV, Parquet, Feather or Excel based on extension.
+
+    columns defaults to the store's own columns (OUTPUT_COLUMNS for a list
+    of dicts).
+    """
+    if columns is None:
+        columns = getattr(processed_data, 'columns', OUTPUT_COLUMNS)
+    extension = os.path.splitext(output_path)[1].lower()
+    if extension == '.csv':
+        write_csv_chunked(processed_data, output_path, columns)
+    elif extension in ARROW_FORMATS:
+        write_arrow(processed_data, output_path, columns)
+    else:
+        df = results_frame(processed_data, columns)
+        df.to_excel(output_path, index=False, engine='openpyxl')
@@ -0,0 +1,72 @@
+from universal_amounts import is_missing
+
+# Follows every text cell in the joined text the detector scans
+CELL_END = '\x00'
+
+# Code column verdicts remembered per run (the column repeats a few values)
+MAX_CODE_CACHE = 4096
+
+# isinstance(cell, str) without a Python-level call per cell
+_is_text = str.__instancecheck__
+
+
+def cell_text(cell):
+    """str(cell).strip(), with '' for a missing cell (None, NaN, NaT)"""
+    return '' if is_missing(cell) else str(cell).strip()
+
+
+class AccountHeaderDetector:
+    """extract_account_info for a whole run, rejecting ordinary rows cheaply.
+
+    Method 1 needs "account" inside a text cell and Method 3 a text cell
+    that is a bare 12399-D01 style code; str() of numbers, dates, times and
+    booleans holds neither. So the text cells of a row are joined in one
+    C-level pass and checked with a substring test and one search with
+    plan.detected_code_hint (which starts at a literal "-", so re skips
+    ahead to the few dashes). Rows that pass go through the exact
+    extract_account_info (methods 1, 2 and 3 in order); all other rows can
+    only be Method 2 headers, a single cell lookup whose verdict is
+    remembered per run for text the code column repeats.
+
+    exact is the engine's extract_account_info and count its counter (for
+    the method hits of the fast path).
+    """
+
+    def __init__(self, plan, exact, count=None):
+        self.plan = plan
+        self.exact = exact
+        self.count = count
+        self._code_hint = plan.detected_code_hint.search
+        self._code_cache = {}
+
+    def __call__(self, row):
+        plan = self.plan
+        text = CELL_END.join(filter(_is_text, row)) + CELL_END
+        if 'account' in text.lower() or self._code_hint(text):
+            return self.exact(row, plan)
+        code_col = plan.col_account_code
+        if code_col is None or code_col >= len(row):
+            return None, None
+        code = self._code_column_value(row[code_col])
+        if code is None:
+            return None, None
+        name_col = plan.col_account_name
+        name = cell_text(row[name_col]) if name_col is not None and name_col < len(row) else ""
+        if self.count is not None:
+            self.count('method_2_hits')
+        return code, name
+
+    def _code_column_value(self, cell):
+        """The account code Method 2 reads from the code column cell, or None"""
+        cacheable = type(cell) is str
+        if cacheable:
+            try:
+                return self._code_cache[cell]
+            except KeyError:
+                pass
+        code = str(cell).strip()
+        if not (code and len(code) > 2 and self.plan.code_column_pattern.match(code)):
+            code = None
+        if cacheable and len(self._code_cache) < MAX_CODE_CACHE:
+            self._code_cache[cell] = code
+        return code
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import pickle
+
+from universal_cache import DEFAULT_CACHE_DIR
+from universal_detect import peek_rows
+
+# Bump when the checkpoint layout, row hashing or cell conversion changes
+CHECKPOINT_VERSION = 3
+
+# Settings besides the col_* columns that change the cleaned output
+OUTPUT_SETTINGS = ("amount_format", "credit_inference", "credit_sample_rows", "credit_min_confidence")
+
+
+def checkpoint_dir(config):
+    """Checkpoints live next to the workbook cache"""
+    return os.path.join(config.get("cache_dir") or DEFAULT_CACHE_DIR, 'checkpoints')
+
+
+def config_fingerprint(config):
+    """Hash of the settings that change which rows become transactions"""
+    settings = {key: config[key] for key in sorted(config)
+                if key.startswith('col_') or key in OUTPUT_SETTINGS}
+    return hashlib.blake2b(json.dumps(settings, sort_keys=True).encode('utf-8'),
+                           digest_size=16).hexdigest()
+
+
+class _HashingRows:
+    """Pass rows through while counting them and feeding them to a hash"""
+
+    def __init__(self, row_iter, hasher, length):
+        self.row_iter = row_iter
+        self.hasher = hasher
+        self.length = length
+        self.count = 0
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        update = self.hasher.update
+        for row in self.row_iter:
+            update(pickle.dumps(row, 4))
+            self.count += 1
+            yield row
+
+
+class IncrementalProcessor:
+    """Re-process a growing ledger by resuming after the rows already seen.
+
+    After each run a checkpoint records the row count, a hash of those rows,
+    the account state after the last row, the credit columns in use and the
+    cleaned output. The next
+    run hashes the same number of leading rows; if they are unchanged only
+    the new rows are classified and their transactions appended, otherwise
+    the sheet is rebuilt from row 0. Changing the column settings also
+    forces a rebuild.
+
+    A checkpoint of fewer rows than credit_sample_rows had its credit
+    columns inferred from a shorter sample than a full run of the grown
+    sheet would use, so they are inferred again from the current first
+    rows, and a change also forces a rebuild.
+    """
+
+    def __init__(self, engine, directory=None):
+        self.engine = engine
+        self.directory = directory or checkpoint_dir(engine.config)
+
+    def _paths(self, file_path, sheet_name):
+        key = hashlib.blake2b(f"{os.path.abspath(file_path)}|{sheet_name}".encode('utf-8'),
+                              digest_size=20).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + '.json', base + '.store'
+
+    def load_checkpoint(self, file_path, sheet_name=None):
+        """The stored checkpoint for a sheet, or None if there is no usable one"""
+        meta_path, store_path = self._paths(file_path, sheet_name)
+        try:
+            with open(meta_path, 'r') as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (checkpoint.get("version") != CHECKPOINT_VERSION
+                or checkpoint.get("config") != config_fingerprint(self.engine.config)
+                or not os.path.exists(store_path)):
+            return None
+        return checkpoint
+
+    def save_checkpoint(self, file_path, sheet_name, row_count, prefix_hash, processed_data):
+        meta_path, store_path = self._paths(file_path, sheet_name)
+        os.makedirs(self.directory, exist_ok=True)
+        # Write the output before the metadata that points to it
+        with open(store_path + '.tmp', 'wb') as f:
+            pickle.dump(processed_data, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(store_path + '.tmp', store_path)
+        checkpoint = {
+            "version": CHECKPOINT_VERSION,
+            "file": os.path.abspath(file_path),
+            "sheet": sheet_name,
+            "config": config_fingerprint(self.engine.config),
+            "row_count": row_count,
+            "prefix_hash": prefix_hash,
+            "account_state": list(self.engine.account_state),
+            "credit_columns": list(self.engine.credit_columns or ()),
+            "transactions": len(processed_data)
+        }
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump(checkpoint, f, indent=2)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    def clear_checkpoint(self, file_path, sheet_name=None):
+        for path in self._paths(file_path, sheet_name):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def process_file(self, file_path, sheet_name=None):
+        """Clean a sheet, resuming from its checkpoint when the prefix is unchanged"""
+        checkpoint = self.load_checkpoint(file_path, sheet_name)
+        if checkpoint is not None:
+            processed_data = self._resume(file_path, sheet_name, checkpoint)
+            if processed_data is not None:
+                return processed_data
+            self.engine.log_message("⚠ Earlier rows have changed - rebuilding from the first row")
+        return self._rebuild(file_path, sheet_name)
+
+    def _rebuild(self, file_path, sheet_name):
+        rows = self.engine.open_rows(file_path, sheet_name)
+        hashing = _HashingRows(iter(rows), hashlib.blake2b(digest_size=20), len(rows))
+        processed_data = self.engine.process_rows(hashing)
+        self.save_checkpoint(file_path, sheet_name, hashing.count, hashing.hasher.hexdigest(),
+                             processed_data)
+        return processed_data
+
+    def _resume(self, file_path, sheet_name, checkpoint):
+        rows = self.engine.open_rows(file_path, sheet_name)
+        row_iter = iter(rows)
+        hasher = hashlib.blake2b(digest_size=20)
+        sample_size = self.engine._credit_sample_size()
+        sample = []
+        try:
+            for _ in range(checkpoint["row_count"]):
+                row = next(row_iter, None)
+                if row is None:
+                    return None
+                hasher.update(pickle.dumps(row, 4))
+                if len(sample) < sample_size:
+                    sample.append(row)
+            if hasher.hexdigest() != checkpoint["prefix_hash"]:
+                return None
+
+            credit_columns = tuple(checkpoint["credit_columns"])
+            new_rows = row_iter
+            if checkpoint["row_count"] < sample_size:
+                head, new_rows = peek_rows(row_iter, sample_size - len(sample))
+                if head and self.engine.infer_credit_columns(
+                        sample + head, self.engine.compile_plan()) != credit_columns:
+                    self.engine.log_message("⚠ Credit columns differ with the new rows")
+                    return None
+
+            _, store_path = self._paths(file_path, sheet_name)
+            with open(store_path, 'rb') as f:
+                processed_data = pickle.load(f)
+
+            # Only the appended rows go through the engine
+            hashing = _HashingRows(new_rows, hasher, max(len(rows) - checkpoint["row_count"], 0))
+            new_data = self.engine.process_rows(hashing, start_state=tuple(checkpoint["account_state"]),
+                                                credit_columns=credit_columns)
+        finally:
+            if hasattr(row_iter, 'close'):
+                row_iter.close()
+
+        processed_data.extend(new_data)
+        self.engine.log_message(f"⏩ Resumed after row {checkpoint['row_count']:,}: "
+                                f"{hashing.count:,} new rows, {len(new_data):,} new transactions")
+        self.save_checkpoint(file_path, sheet_name, checkpoint["row_count"] + hashing.count,
+                             hasher.hexdigest(), processed_data)
+        return processed_data
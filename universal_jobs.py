@@ -0,0 +1,165 @@
+import os
+import queue
+import threading
+from itertools import islice
+
+# Rows read between cancellation checks
+CANCEL_CHECK_ROWS = 100
+
+
+class CancelToken:
+    """Flag a running job checks between batches of rows.
+
+    Cancellation is cooperative: the engine stops pulling rows at the next
+    check and returns what it has classified so far.
+    """
+
+    def __init__(self, event=None):
+        self._event = event if event is not None else threading.Event()
+        # A multiprocessing.Manager Event can be checked from worker processes
+        self.process_safe = event is not None
+
+    @classmethod
+    def shared(cls, manager):
+        """A token worker processes can check (manager: a multiprocessing.Manager)"""
+        return cls(manager.Event())
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+class SharedProgress:
+    """Progress of sheets cleaned in worker processes, sent back over a queue.
+
+    A worker job reports through reporter(key), which only sends whole
+    percent changes (engines report every few hundred rows); the calling
+    process collects them with updates().
+    """
+
+    def __init__(self, progress_queue):
+        self.queue = progress_queue
+
+    @classmethod
+    def shared(cls, manager):
+        """Progress worker processes can send (manager: a multiprocessing.Manager)"""
+        return cls(manager.Queue())
+
+    def reporter(self, key):
+        return _ProgressReporter(self.queue, key)
+
+    def updates(self):
+        """{key: latest percent} sent since the last call"""
+        latest = {}
+        while True:
+            try:
+                key, percent = self.queue.get_nowait()
+            except queue.Empty:
+                return latest
+            latest[key] = percent
+
+
+class _ProgressReporter:
+    """progress_callback for one worker job (picklable, unlike a closure)"""
+
+    def __init__(self, progress_queue, key):
+        self.queue = progress_queue
+        self.key = key
+        self.sent = None
+
+    def __call__(self, percent):
+        percent = int(percent)
+        if percent != self.sent:
+            self.sent = percent
+            self.queue.put((self.key, percent))
+
+
+def cancellable_rows(rows, token, on_cancel=None):
+    """Yield rows until token is cancelled, checking every CANCEL_CHECK_ROWS rows.
+
+    Rows are pulled in whole batches, so every row taken from the source is
+    also yielded; a consumer that stops early has seen an exact prefix.
+    on_cancel(row_count) is called if the token stops the iteration.
+    """
+    row_iter = iter(rows)
+    count = 0
+    while not token.cancelled:
+        batch = list(islice(row_iter, CANCEL_CHECK_ROWS))
+        if not batch:
+            return
+        count += len(batch)
+        yield from batch
+    if on_cancel:
+        on_cancel(count)
+
+
+class Job:
+    """One background cleaning run"""
+
+    def __init__(self, key, target):
+        self.key = key
+        self.token = CancelToken()
+        self.state = 'running'
+        self.result = None
+        self.error = None
+        self._target = target
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        try:
+            self.result = self._target(self.token)
+            self.state = 'cancelled' if self.token.cancelled else 'done'
+        except Exception as e:
+            self.error = e
+            self.state = 'failed'
+
+    def cancel(self):
+        self.token.cancel()
+
+    @property
+    def running(self):
+        return self.thread.is_alive()
+
+
+class JobManager:
+    """Runs cleaning jobs on background threads, at most one per file"""
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(file_path):
+        return os.path.abspath(file_path)
+
+    def start(self, file_path, target):
+        """Start target(token) for file_path; None if that file already has a running job"""
+        key = self._key(file_path)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.running:
+                return None
+            job = self._jobs[key] = Job(key, target)
+            job.thread.start()
+        return job
+
+    def active(self, file_path):
+        """The running job for file_path, or None"""
+        job = self._jobs.get(self._key(file_path))
+        return job if job is not None and job.running else None
+
+    def cancel(self, file_path):
+        """Ask the running job for file_path to stop; False if there is none"""
+        job = self.active(file_path)
+        if job is None:
+            return False
+        job.cancel()
+        return True
+
+    def cancel_all(self):
+        for job in list(self._jobs.values()):
+            if job.running:
+                job.cancel()
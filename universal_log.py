@@ -0,0 +1,73 @@
+import queue
+import threading
+import tkinter as tk
+
+
+class LogBuffer:
+    """Thread-safe processing log drained into a Text widget on a timer.
+
+    Any thread may call post(); the Tk main loop picks the messages up in
+    batches every flush_interval_ms, inserts them with a single Text insert
+    and never forces a redraw. Only the last max_lines lines are kept.
+
+    Messages posted with a kind (e.g. 'account') are listed individually up
+    to detail_limit per run; the rest are only counted and reported by
+    summarize(), e.g. "Found 5,000 accounts" instead of 5,000 lines.
+    """
+
+    def __init__(self, root, text_widget, max_lines=2000, flush_interval_ms=100, detail_limit=20):
+        self.root = root
+        self.text_widget = text_widget
+        self.max_lines = max_lines
+        self.flush_interval_ms = flush_interval_ms
+        self.detail_limit = detail_limit
+        self._queue = queue.Queue()
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start draining the queue from the Tk main loop"""
+        self.root.after(self.flush_interval_ms, self._drain)
+
+    def post(self, message, kind=None):
+        """Queue a log line (safe to call from any thread)"""
+        if kind is not None:
+            with self._lock:
+                count = self._counts.get(kind, 0) + 1
+                self._counts[kind] = count
+            if count > self.detail_limit:
+                return
+        self._queue.put(message)
+
+    def reset_counts(self):
+        """Start a new run: list the first detail_limit lines of each kind again"""
+        with self._lock:
+            self._counts = {}
+
+    def summarize(self, kind, label, icon="🔍"):
+        """Post a one-line total for a kind and reset its counter"""
+        with self._lock:
+            count = self._counts.pop(kind, 0)
+        if count > self.detail_limit:
+            self._queue.put(f"{icon} Found {count:,} {label} "
+                            f"(first {self.detail_limit} listed above)")
+        return count
+
+    def _drain(self):
+        lines = []
+        try:
+            while True:
+                lines.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        if lines:
+            # Only the tail can survive the line cap, so skip the rest
+            lines = lines[-self.max_lines:]
+            self.text_widget.insert(tk.END, "\n".join(lines) + "\n")
+            line_count = int(self.text_widget.index('end-1c').split('.')[0])
+            if line_count > self.max_lines:
+                self.text_widget.delete('1.0', f"{line_count - self.max_lines}.0")
+            self.text_widget.see(tk.END)
+
+        self.root.after(self.flush_interval_ms, self._drain)
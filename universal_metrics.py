@@ -0,0 +1,133 @@
+import cProfile
+import io
+import json
+import pstats
+import time
+from contextlib import contextmanager
+
+
+class RunMetrics:
+    """Per-stage timers and counters for one cleaning run.
+
+    Engines only create one when the "metrics" config switch is on, and
+    check for None before recording, so an ordinary run pays nothing.
+    With "profile" also on, the run is recorded with cProfile and the
+    stats are dumped next to the metrics file.
+    """
+
+    def __init__(self, profile=False):
+        self.timings = {}
+        self.counters = {}
+        self.profiler = cProfile.Profile() if profile else None
+        self._lap_start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block and add it to the stage's total"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def start_laps(self):
+        self._lap_start = time.perf_counter()
+
+    def lap(self, name):
+        """Charge the time since the previous lap (or start_laps) to a stage"""
+        now = time.perf_counter()
+        self.add_time(name, now - self._lap_start)
+        self._lap_start = now
+
+    def add_time(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def timed(self, name, function):
+        """Wrap function so every call adds to the stage's total"""
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.add_time(name, time.perf_counter() - start)
+        return wrapper
+
+    def timed_rows(self, name, rows):
+        """Yield rows from an iterable, timing how long each one takes to read"""
+        row_iter = iter(rows)
+        while True:
+            start = time.perf_counter()
+            try:
+                row = next(row_iter)
+            except StopIteration:
+                self.add_time(name, time.perf_counter() - start)
+                return
+            self.add_time(name, time.perf_counter() - start)
+            yield row
+
+    @contextmanager
+    def profiling(self):
+        """Record the block with cProfile when profiling is on"""
+        if self.profiler is None:
+            yield
+            return
+        self.profiler.enable()
+        try:
+            yield
+        finally:
+            self.profiler.disable()
+
+    def merge(self, other):
+        """Add the timers and counters of another run (or its to_dict())"""
+        if isinstance(other, RunMetrics):
+            other = other.to_dict()
+        for name, seconds in other.get("timings", {}).items():
+            self.add_time(name, seconds)
+        for name, n in other.get("counters", {}).items():
+            self.count(name, n)
+
+    def to_dict(self):
+        return {
+            "timings": {name: round(seconds, 6) for name, seconds in self.timings.items()},
+            "counters": dict(self.counters),
+        }
+
+    def summary_lines(self):
+        """Summary table for the processing log"""
+        lines = ["⏱ Stage timings:"]
+        total = sum(self.timings.values()) or 1.0
+        for name, seconds in sorted(self.timings.items(), key=lambda item: -item[1]):
+            lines.append(f"   {name:<22} {seconds:9.3f}s  {seconds / total:6.1%}")
+        if self.counters:
+            lines.append("🔢 Counters:")
+            for name, n in self.counters.items():
+                lines.append(f"   {name:<22} {n:>12,}")
+        return lines
+
+    def profile_summary(self, limit=20):
+        """Top functions by cumulative time, as text"""
+        if self.profiler is None:
+            return ""
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+        return out.getvalue()
+
+    def write(self, output_path):
+        """Write <output>.metrics.json (and <output>.prof when profiling)"""
+        metrics_path = output_path + '.metrics.json'
+        with open(metrics_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        if self.profiler is not None:
+            self.profiler.dump_stats(output_path + '.prof')
+        return metrics_path
+
+
+def create_metrics(config):
+    """RunMetrics when the "metrics" (or "profile") config switch is on, else None"""
+    config = config or {}
+    if not (config.get("metrics") or config.get("profile")):
+        return None
+    return RunMetrics(profile=bool(config.get("profile")))
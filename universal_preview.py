@@ -0,0 +1,150 @@
+import tkinter as tk
+from tkinter import ttk
+from array import array
+
+
+class VirtualTreeview:
+    """Results preview that only keeps the visible rows in the Treeview.
+
+    The full result set stays in the backing store passed to set_data()
+    (a TransactionStore or any sequence of row dicts). Scrolling, jumping and filtering only move
+    a window offset and rewrite the handful of Treeview items on screen, so
+    browsing millions of rows costs the same as browsing a hundred.
+    """
+
+    DEFAULT_ROW_HEIGHT = 20
+
+    def __init__(self, parent, columns, column_widths, height=12):
+        self.columns = columns
+        self.height = height
+        self.data = []
+        self.view = None  # array of row indices while a filter is active
+        self.offset = 0
+        self.on_change = None
+
+        self.tree = ttk.Treeview(parent, columns=columns, show='tree headings',
+                                 height=height, selectmode='browse')
+        self.tree.heading('#0', text='Row')
+        self.tree.column('#0', width=70, stretch=False, anchor=tk.E)
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=column_widths.get(col, 100))
+
+        # The vertical scrollbar tracks the position in the whole result
+        # set, not in the Treeview itself
+        self.v_scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.h_scrollbar = ttk.Scrollbar(parent, orient=tk.HORIZONTAL, command=self.tree.xview)
+        self.tree.configure(xscrollcommand=self.h_scrollbar.set)
+
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll(3))
+        self.tree.bind('<Up>', lambda e: self.scroll(-1))
+        self.tree.bind('<Down>', lambda e: self.scroll(1))
+        self.tree.bind('<Prior>', lambda e: self.scroll(-self.height))
+        self.tree.bind('<Next>', lambda e: self.scroll(self.height))
+        self.tree.bind('<Home>', lambda e: self.jump_to(0))
+        self.tree.bind('<End>', lambda e: self.jump_to(len(self)))
+        self.tree.bind('<Configure>', self._on_resize)
+
+    def grid(self, row=0):
+        """Grid the Treeview and scrollbars into the parent frame"""
+        self.tree.grid(row=row, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.v_scrollbar.grid(row=row, column=1, sticky=(tk.N, tk.S))
+        self.h_scrollbar.grid(row=row + 1, column=0, sticky=(tk.W, tk.E))
+
+    def __len__(self):
+        return len(self.data) if self.view is None else len(self.view)
+
+    def set_data(self, data):
+        """Show a new result set, clearing any filter"""
+        self.data = data
+        self.view = None
+        self.offset = 0
+        self._render()
+
+    def set_filter(self, account_code):
+        """Only show rows whose Account Code is account_code ("1000" is not "10001")"""
+        account_code = (account_code or '').strip()
+        if not account_code:
+            self.view = None
+        else:
+            if hasattr(self.data, 'column'):
+                # TransactionStore: scan the column without building row dicts
+                codes = self.data.column('Account Code')
+            else:
+                codes = [row.get('Account Code', '') for row in self.data]
+            self.view = array('L', (i for i, code in enumerate(codes)
+                                    if str(code) == account_code))
+        self.offset = 0
+        self._render()
+        return len(self)
+
+    def jump_to(self, row_number):
+        """Scroll so that row_number (0-based, within the current view) is on top"""
+        self.offset = row_number
+        self._render()
+        return 'break'
+
+    def scroll(self, rows):
+        self.offset += rows
+        self._render()
+        return 'break'
+
+    def visible_range(self):
+        """(first, last) 0-based rows currently shown, last exclusive"""
+        return self.offset, min(self.offset + self.height, len(self))
+
+    def _row_index(self, position):
+        return position if self.view is None else self.view[position]
+
+    def _render(self):
+        total = len(self)
+        self.offset = max(0, min(self.offset, total - self.height))
+
+        rows = []
+        for position in range(self.offset, min(self.offset + self.height, total)):
+            index = self._row_index(position)
+            row = self.data[index]
+            rows.append((index + 1, tuple(row.get(col, '') for col in self.columns)))
+
+        # Reuse the existing items so the Treeview never grows
+        items = self.tree.get_children()
+        for item, (row_number, values) in zip(items, rows):
+            self.tree.item(item, text=row_number, values=values)
+        if len(items) > len(rows):
+            self.tree.delete(*items[len(rows):])
+        for row_number, values in rows[len(items):]:
+            self.tree.insert('', tk.END, text=row_number, values=values)
+
+        if total:
+            self.v_scrollbar.set(self.offset / total, (self.offset + len(rows)) / total)
+        else:
+            self.v_scrollbar.set(0, 1)
+
+        if self.on_change:
+            self.on_change()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == 'moveto':
+            self.offset = int(float(args[1]) * len(self))
+        elif args[0] == 'scroll':
+            step = self.height if args[2] == 'pages' else 1
+            self.offset += int(args[1]) * step
+        self._render()
+
+    def _on_mousewheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def _on_resize(self, event):
+        """Fill the space the Treeview was given with rows"""
+        items = self.tree.get_children()
+        bbox = self.tree.bbox(items[0]) if items else None
+        if bbox:
+            heading_height, row_height = bbox[1], bbox[3]
+        else:
+            heading_height, row_height = self.DEFAULT_ROW_HEIGHT + 5, self.DEFAULT_ROW_HEIGHT
+        height = max(1, (event.height - heading_height) // max(row_height, 1))
+        if height != self.height:
+            self.height = height
+            self._render()
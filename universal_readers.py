@@ -0,0 +1,489 @@
+import csv
+import datetime
+import importlib
+import importlib.util
+import io
+import os
+import re
+
+import openpyxl
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+# Reader backends ("reader" in the config); "auto" picks one per file
+READERS = ("auto", "openpyxl", "calamine", "xlrd", "pyxlsb", "csv")
+
+# Module each optional backend imports, and the package that provides it
+READER_PACKAGES = {
+    "calamine": ("python_calamine", "python-calamine"),
+    "xlrd": ("xlrd", "xlrd"),
+    "pyxlsb": ("pyxlsb", "pyxlsb"),
+}
+
+# Backends that can read each file format, fastest first
+FORMAT_READERS = {
+    "xlsx": ("calamine", "openpyxl"),
+    "xls": ("calamine", "xlrd"),
+    "xlsb": ("calamine", "pyxlsb"),
+    "ods": ("calamine",),
+    "csv": ("csv",),
+}
+
+# Backends that hold one row at a time rather than the whole sheet
+STREAMING_READERS = frozenset({"openpyxl", "pyxlsb", "csv"})
+
+# Above this file size a low-memory read prefers a streaming backend
+IN_MEMORY_MAX_BYTES = 100 * 1024 * 1024
+
+_EXTENSION_FORMATS = {
+    '.xlsx': "xlsx", '.xlsm': "xlsx", '.xltx': "xlsx", '.xltm': "xlsx",
+    '.xls': "xls", '.xlsb': "xlsb", '.ods': "ods",
+    '.csv': "csv", '.txt': "csv", '.tsv': "csv",
+}
+_ZIP_MAGIC = b'PK\x03\x04'
+_OLE2_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+# Text cells read as blanks: pandas' default na_values, which the sheets were
+# read with before the readers here (so "N/A" references and "nan" account
+# names are blank cells, as they always were)
+NA_STRINGS = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+})
+
+# Bytes read to pick the CSV encoding and delimiter
+CSV_SNIFF_BYTES = 64 * 1024
+# CSV text that becomes a number (leading zeros, as in account codes, stay text)
+_CSV_NUMBER = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?')
+
+
+def file_format(file_path):
+    """"xlsx", "xls", "xlsb", "ods" or "csv", from the file signature and extension.
+
+    ERP exports are often mislabelled (an .xls that is really a zipped
+    .xlsx, or tab-separated text), so the first bytes decide the family
+    and the extension only tells the zipped formats apart.
+    """
+    extension_format = _EXTENSION_FORMATS.get(os.path.splitext(file_path)[1].lower())
+    with open(file_path, 'rb') as f:
+        head = f.read(len(_OLE2_MAGIC))
+    if head.startswith(_ZIP_MAGIC):
+        return extension_format if extension_format in ("xlsb", "ods") else "xlsx"
+    if head == _OLE2_MAGIC:
+        return "xls"
+    if not head or b'\x00' in head:
+        # Empty, or binary without a known signature: trust the extension
+        return extension_format or "csv"
+    # Text, whatever the extension says
+    return "csv"
+
+
+def reader_available(reader):
+    """Whether the backend's library is installed (without importing it)"""
+    if reader not in READER_PACKAGES:
+        return reader in READERS
+    return importlib.util.find_spec(READER_PACKAGES[reader][0]) is not None
+
+
+def select_reader(file_path, reader="auto", low_memory=True, streaming=False):
+    """Name of the backend to read file_path with.
+
+    With reader "auto" this is the fastest installed backend for the file
+    format. When low_memory is set and the file is larger than
+    IN_MEMORY_MAX_BYTES, a streaming backend is preferred over one that
+    loads the whole sheet; streaming prefers one whatever the file size
+    (for reading only the first rows). Any other reader name is used as
+    given.
+    """
+    if reader not in (None, "", "auto"):
+        if reader not in READERS:
+            raise ValueError(f"Unknown reader '{reader}' (expected one of: {', '.join(READERS)})")
+        if not reader_available(reader):
+            raise ValueError(f"The {reader} reader needs: pip install {READER_PACKAGES[reader][1]}")
+        return reader
+
+    fmt = file_format(file_path)
+    candidates = [name for name in FORMAT_READERS[fmt] if reader_available(name)]
+    if not candidates:
+        packages = ' or '.join(READER_PACKAGES[name][1] for name in FORMAT_READERS[fmt])
+        raise ValueError(f"Reading .{fmt} files needs {packages} (pip install {packages.split(' or ')[-1]})")
+    if streaming or (low_memory and os.path.getsize(file_path) > IN_MEMORY_MAX_BYTES):
+        streaming_candidates = [name for name in candidates if name in STREAMING_READERS]
+        if streaming_candidates:
+            return streaming_candidates[0]
+    return candidates[0]
+
+
+def open_sheet(file_path, sheet_name=None, reader="auto", low_memory=True, streaming=False):
+    """Row source for one sheet (the first by default) of file_path.
+
+    Every backend gives the same rows: lists of cells with '' for blanks,
+    errors and NA_STRINGS text, whole numbers as int, dates as datetime.
+    len() is the stored row count, used for progress reporting only.
+    low_memory and streaming pick the backend as in select_reader.
+    """
+    return SHEET_READERS[select_reader(file_path, reader, low_memory, streaming)](file_path, sheet_name)
+
+
+def read_rows(file_path, reader="auto"):
+    """Read the first sheet of a workbook into a list of row lists"""
+    return list(open_sheet(file_path, reader=reader, low_memory=False))
+
+
+def sheet_sizes(file_path, reader="auto"):
+    """(sheet name, stored row count) for every worksheet, in workbook order"""
+    return SHEET_READERS[select_reader(file_path, reader)].sheet_sizes(file_path)
+
+
+def _whole_number(value):
+    """A float cell value, as an int when it is a whole number (pandas style)"""
+    return int(value) if value.is_integer() else value
+
+
+def _csv_value(text):
+    """A CSV field, as a number when it is a plain one"""
+    if not _CSV_NUMBER.fullmatch(text):
+        return '' if text in NA_STRINGS else text
+    if '.' in text or 'e' in text or 'E' in text:
+        return _whole_number(float(text))
+    return int(text)
+
+
+def convert_cell(cell):
+    """Convert an openpyxl cell the same way pandas does ('' for blanks)"""
+    value = cell.value
+    if value is None or cell.data_type == TYPE_ERROR:
+        return ''
+    if cell.data_type == TYPE_NUMERIC:
+        as_int = int(value)
+        return as_int if as_int == value else float(value)
+    if type(value) is str and value in NA_STRINGS:
+        return ''
+    return value
+
+
+class StreamingSheetReader:
+    """Iterate over one sheet a row at a time using openpyxl read-only mode.
+
+    Only the current row is held in memory, so peak memory no longer
+    depends on the size of the input workbook. len() returns the row count
+    recorded in the sheet dimensions (0 if the writer did not store one);
+    it is only used for progress reporting.
+    """
+
+    backend = "openpyxl"
+
+    def __init__(self, file_path, sheet_name=None):
+        self.file_path = file_path
+        self.sheet_name = sheet_name
+        self._row_count = None
+
+    @staticmethod
+    def sheet_sizes(file_path):
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            return [(sheet.title, sheet.max_row or 0) for sheet in workbook.worksheets]
+        finally:
+            workbook.close()
+
+    def _open_sheet(self, workbook):
+        if self.sheet_name is None:
+            return workbook.worksheets[0]
+        return workbook[self.sheet_name]
+
+    def __len__(self):
+        if self._row_count is None:
+            workbook = openpyxl.load_workbook(self.file_path, read_only=True, data_only=True)
+            try:
+                self._row_count = self._open_sheet(workbook).max_row or 0
+            finally:
+                workbook.close()
+        return self._row_count
+
+    def __iter__(self):
+        workbook = openpyxl.load_workbook(self.file_path, read_only=True, data_only=True)
+        try:
+            sheet = self._open_sheet(workbook)
+            if self._row_count is None:
+                self._row_count = sheet.max_row or 0
+            # Stored dimensions are often wrong and would clip wide rows
+            sheet.reset_dimensions()
+            for row in sheet.rows:
+                yield [convert_cell(cell) for cell in row]
+        finally:
+            workbook.close()
+
+
+class CalamineSheetReader:
+    """One sheet read with python-calamine (Rust), for .xlsx, .xls, .xlsb and .ods.
+
+    Several times faster than openpyxl, but the sheet is parsed into memory
+    before the first row is returned.
+    """
+
+    backend = "calamine"
+
+    def __init__(self, file_path, sheet_name=None):
+        self.file_path = file_path
+        self.sheet_name = sheet_name
+        self._row_count = None
+
+    @staticmethod
+    def _workbook(file_path):
+        return importlib.import_module("python_calamine").CalamineWorkbook.from_path(file_path)
+
+    @classmethod
+    def sheet_sizes(cls, file_path):
+        workbook = cls._workbook(file_path)
+        try:
+            return [(name, cls._height(workbook.get_sheet_by_name(name)))
+                    for name in workbook.sheet_names]
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _height(sheet):
+        # Rows from A1 to the last used row, as iter_rows() returns them
+        return sheet.end[0] + 1 if sheet.end else 0
+
+    def _sheet(self, workbook):
+        if self.sheet_name is None:
+            return workbook.get_sheet_by_index(0)
+        return workbook.get_sheet_by_name(self.sheet_name)
+
+    def __len__(self):
+        if self._row_count is None:
+            workbook = self._workbook(self.file_path)
+            try:
+                self._row_count = self._height(self._sheet(workbook))
+            finally:
+                workbook.close()
+        return self._row_count
+
+    def __iter__(self):
+        workbook = self._workbook(self.file_path)
+        try:
+            sheet = self._sheet(workbook)
+            self._row_count = self._height(sheet)
+            for row in sheet.iter_rows():
+                yield [self._convert(value) for value in row]
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _convert(value):
+        # calamine gives floats for every number and date for date-only cells
+        value_type = type(value)
+        if value_type is float:
+            return _whole_number(value)
+        if value_type is datetime.date:
+            return datetime.datetime(value.year, value.month, value.day)
+        if value_type is str and value in NA_STRINGS:
+            return ''
+        return value
+
+
+class XlrdSheetReader:
+    """One sheet of a legacy .xls workbook read with xlrd (converted as pandas does)"""
+
+    backend = "xlrd"
+
+    def __init__(self, file_path, sheet_name=None):
+        self.file_path = file_path
+        self.sheet_name = sheet_name
+        self._row_count = None
+
+    @staticmethod
+    def _workbook(file_path):
+        return importlib.import_module("xlrd").open_workbook(file_path, on_demand=True)
+
+    @classmethod
+    def sheet_sizes(cls, file_path):
+        workbook = cls._workbook(file_path)
+        try:
+            return [(sheet.name, sheet.nrows) for sheet in workbook.sheets()]
+        finally:
+            workbook.release_resources()
+
+    def _sheet(self, workbook):
+        if self.sheet_name is None:
+            return workbook.sheet_by_index(0)
+        return workbook.sheet_by_name(self.sheet_name)
+
+    def __len__(self):
+        if self._row_count is None:
+            workbook = self._workbook(self.file_path)
+            try:
+                self._row_count = self._sheet(workbook).nrows
+            finally:
+                workbook.release_resources()
+        return self._row_count
+
+    def __iter__(self):
+        xlrd = importlib.import_module("xlrd")
+        workbook = self._workbook(self.file_path)
+        try:
+            sheet = self._sheet(workbook)
+            self._row_count = sheet.nrows
+            convert = self._converter(xlrd, workbook.datemode)
+            for i in range(sheet.nrows):
+                yield list(map(convert, sheet.row_types(i), sheet.row_values(i)))
+        finally:
+            workbook.release_resources()
+
+    @staticmethod
+    def _converter(xlrd, datemode):
+        number, date, boolean, error = (xlrd.XL_CELL_NUMBER, xlrd.XL_CELL_DATE,
+                                        xlrd.XL_CELL_BOOLEAN, xlrd.XL_CELL_ERROR)
+        # Day 0 of the workbook's date system: times of day have no date part
+        time_only_day = (1904, 1, 1) if datemode else (1899, 12, 31)
+
+        def convert(cell_type, value):
+            if cell_type == number:
+                return _whole_number(value)
+            if cell_type == date:
+                try:
+                    value = xlrd.xldate.xldate_as_datetime(value, datemode)
+                except (OverflowError, ValueError):
+                    return value
+                if (value.year, value.month, value.day) == time_only_day:
+                    return value.time()
+                return value
+            if cell_type == boolean:
+                return bool(value)
+            if cell_type == error or value in NA_STRINGS:
+                return ''
+            return value
+
+        return convert
+
+
+class PyxlsbSheetReader:
+    """One sheet of an .xlsb workbook streamed with pyxlsb.
+
+    pyxlsb does not read cell styles, so dates come through as Excel serial
+    numbers (as with pandas); calamine reads them as dates.
+    """
+
+    backend = "pyxlsb"
+
+    def __init__(self, file_path, sheet_name=None):
+        self.file_path = file_path
+        self.sheet_name = sheet_name
+        self._row_count = None
+
+    @staticmethod
+    def _workbook(file_path):
+        return importlib.import_module("pyxlsb").open_workbook(file_path)
+
+    @staticmethod
+    def _height(sheet):
+        dimension = sheet.dimension
+        return dimension.r + dimension.h if dimension else 0
+
+    @classmethod
+    def sheet_sizes(cls, file_path):
+        with cls._workbook(file_path) as workbook:
+            sizes = []
+            for name in workbook.sheets:
+                with workbook.get_sheet(name) as sheet:
+                    sizes.append((name, cls._height(sheet)))
+            return sizes
+
+    def _sheet(self, workbook):
+        return workbook.get_sheet(1 if self.sheet_name is None else self.sheet_name)
+
+    def __len__(self):
+        if self._row_count is None:
+            with self._workbook(self.file_path) as workbook, self._sheet(workbook) as sheet:
+                self._row_count = self._height(sheet)
+        return self._row_count
+
+    def __iter__(self):
+        with self._workbook(self.file_path) as workbook, self._sheet(workbook) as sheet:
+            self._row_count = self._height(sheet)
+            for row in sheet.rows():
+                yield [self._convert(cell.v) for cell in row]
+
+    @staticmethod
+    def _convert(value):
+        if value is None:
+            return ''
+        value_type = type(value)
+        if value_type is float:
+            return _whole_number(value)
+        if value_type is str and value in NA_STRINGS:
+            return ''
+        return value
+
+
+class CsvSheetReader:
+    """A CSV/TSV export streamed with the csv module, as a one-sheet workbook.
+
+    The encoding (UTF-8, else Windows-1252) and delimiter are sniffed from
+    the start of the file. Plain numbers become int/float like numeric
+    Excel cells; everything else, including codes with leading zeros,
+    stays text. The sheet is named after the file.
+    """
+
+    backend = "csv"
+
+    def __init__(self, file_path, sheet_name=None):
+        self.file_path = file_path
+        self.sheet_name = sheet_name
+        self._row_count = None
+
+    @staticmethod
+    def _sheet_name(file_path):
+        return os.path.splitext(os.path.basename(file_path))[0]
+
+    @classmethod
+    def sheet_sizes(cls, file_path):
+        return [(cls._sheet_name(file_path), len(cls(file_path)))]
+
+    def _check_sheet(self):
+        if self.sheet_name not in (None, self._sheet_name(self.file_path)):
+            raise ValueError(f"Sheet not found: {self.sheet_name}")
+
+    def __len__(self):
+        if self._row_count is None:
+            # Line count; quoted fields spanning lines make it an estimate
+            count = 0
+            last = b'\n'
+            with open(self.file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    count += block.count(b'\n')
+                    last = block[-1:]
+            self._row_count = count + (last != b'\n')
+        return self._row_count
+
+    def _dialect(self):
+        with open(self.file_path, 'rb') as f:
+            sample = f.read(CSV_SNIFF_BYTES)
+        try:
+            # A multi-byte character cut at the end of the sample is fine
+            sample.decode('utf-8-sig')
+            encoding = 'utf-8-sig'
+        except UnicodeDecodeError as e:
+            encoding = 'utf-8-sig' if e.start >= len(sample) - 3 else 'cp1252'
+        text = sample.decode(encoding, errors='replace')
+        try:
+            dialect = csv.Sniffer().sniff(text, delimiters=',;\t|')
+        except csv.Error:
+            dialect = csv.excel_tab if self.file_path.lower().endswith('.tsv') else csv.excel
+        return encoding, dialect
+
+    def __iter__(self):
+        self._check_sheet()
+        encoding, dialect = self._dialect()
+        with io.open(self.file_path, 'r', encoding=encoding, errors='replace', newline='') as f:
+            for row in csv.reader(f, dialect):
+                yield list(map(_csv_value, row))
+
+
+SHEET_READERS = {
+    "openpyxl": StreamingSheetReader,
+    "calamine": CalamineSheetReader,
+    "xlrd": XlrdSheetReader,
+    "pyxlsb": PyxlsbSheetReader,
+    "csv": CsvSheetReader,
+}
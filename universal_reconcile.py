@@ -0,0 +1,192 @@
+import math
+import os
+
+from universal_amounts import parse_amount
+from universal_config import BALANCE_SIDES, DEFAULT_CONFIG
+from universal_results import TransactionStore
+
+# Columns that keep otherwise equal account codes apart (merged / multi-sheet runs)
+GROUP_COLUMNS = ('Source File', 'Sheet')
+
+ACCOUNT_COLUMNS = ['Account Code', 'Account Name', 'Transactions', 'Total Debit', 'Total Credit',
+                   'Net Movement', 'Opening Balance', 'Closing Balance', 'Computed Closing',
+                   'Difference', 'Balance Side', 'Balance Breaks']
+
+# Output Row is the transaction's row in the cleaned output (1 = first transaction)
+BREAK_COLUMNS = ['Output Row', 'Account Code', 'Account Name', 'Date', 'Reference', 'Debit',
+                 'Credit', 'Reported Balance', 'Computed Balance', 'Difference']
+
+# Sign of debit - credit in the balance: debit-normal balances go up with debits
+_SIDE_SIGNS = {"debit": 1.0, "credit": -1.0}
+
+# Float noise from summing many amounts (1234741.129999998) is rounded
+# off the report figures
+_REPORT_DIGITS = 6
+
+
+def _amount(value, accounting, signed_side):
+    amount = parse_amount(value, accounting, signed_side)
+    return amount if amount is not None and math.isfinite(amount) else None
+
+
+def _figure(value):
+    # + 0.0 turns -0.0 into 0.0
+    return '' if value is None else round(value, _REPORT_DIGITS) + 0.0
+
+
+class _BalanceCheck:
+    """Running balance of one account under one sign convention.
+
+    The first reported balance fixes the opening balance (the reported
+    figure less the movement up to and including that row). After that
+    each reported balance is compared with the previous balance plus the
+    row's movement; a difference beyond the tolerance is a break, and the
+    running balance restarts from the reported figure. A single wrong
+    figure is so reported where it appears and where the balance returns
+    to the right figure, rather than on every row after it.
+    """
+
+    __slots__ = ('sign', 'opening', 'balance', 'closing', 'breaks')
+
+    def __init__(self, sign):
+        self.sign = sign
+        self.opening = None
+        self.balance = None
+        self.closing = None
+        self.breaks = []
+
+
+class _AccountTotals:
+    __slots__ = ('name', 'transactions', 'debit', 'credit', 'checks')
+
+    def __init__(self, name, signs):
+        self.name = name
+        self.transactions = 0
+        self.debit = 0.0
+        self.credit = 0.0
+        self.checks = [_BalanceCheck(sign) for sign in signs]
+
+    def best_check(self):
+        """The sign convention with the fewest breaks (debit-normal on a tie)"""
+        return min(self.checks, key=lambda check: len(check.breaks))
+
+
+class Reconciliation:
+    """Per-account totals and balance breaks of a run (see reconcile)"""
+
+    def __init__(self, accounts, breaks):
+        self.accounts = accounts
+        self.breaks = breaks
+
+    @staticmethod
+    def report_paths(output_path):
+        """(accounts report, balance breaks) paths next to output_path, in its format"""
+        stem, extension = os.path.splitext(output_path)
+        return f"{stem}.accounts{extension}", f"{stem}.balance_breaks{extension}"
+
+    def write(self, output_path):
+        """Write both reports next to output_path; returns their paths"""
+        # Imported here: universal_engine pulls in the readers and pandas writers
+        from universal_engine import write_output
+
+        paths = self.report_paths(output_path)
+        write_output(self.accounts, paths[0])
+        write_output(self.breaks, paths[1])
+        return paths
+
+    def summary(self):
+        unreconciled = sum(1 for breaks in self.accounts.column('Balance Breaks') if breaks)
+        return (f"⚖ Reconciled {len(self.accounts):,} accounts: {len(self.breaks):,} balance breaks "
+                f"in {unreconciled:,} accounts")
+
+
+def reconcile(processed_data, config=None):
+    """Aggregate cleaned transactions per account and check the Balance column.
+
+    One pass over the TransactionStore, in output order, keeping a few
+    running figures per account. For each account (per source file and
+    sheet when the output has those columns) the report gives the number
+    of transactions, total debit and credit, net movement (debit -
+    credit), the opening balance implied by the first reported balance,
+    the last reported (closing) balance and the closing balance computed
+    from the opening plus the movements. Rows whose reported balance is
+    not the previous balance plus their movement (within
+    "balance_tolerance") are listed as balance breaks.
+
+    "balance_side" says whether balances go up with debits ("debit") or
+    with credits ("credit", e.g. liabilities shown as positive figures);
+    "auto" picks, per account, whichever gives fewer breaks. Amount text
+    is read per "amount_format", with DR/CR suffixes signing balances.
+
+    Returns a Reconciliation holding both reports as TransactionStores.
+    """
+    config = dict(DEFAULT_CONFIG, **(config or {}))
+    accounting = config.get("amount_format") == "accounting"
+    tolerance = float(config.get("balance_tolerance"))
+    side = config.get("balance_side")
+    if side not in BALANCE_SIDES:
+        raise ValueError(f"Unknown balance_side '{side}' (expected one of: {', '.join(BALANCE_SIDES)})")
+    signs = tuple(_SIDE_SIGNS.values()) if side == "auto" else (_SIDE_SIGNS[side],)
+
+    group_columns = [col for col in GROUP_COLUMNS if col in processed_data.columns]
+    value_columns = group_columns + ['Account Code', 'Account Name', 'Date', 'Reference',
+                                     'Debit', 'Credit', 'Balance']
+    n_keys = len(group_columns) + 1
+    accounts = {}
+    for output_row, values in enumerate(processed_data.iter_values(value_columns), 1):
+        key = values[:n_keys]
+        name, date, reference, debit, credit, balance = values[n_keys:]
+        account = accounts.get(key)
+        if account is None:
+            account = accounts[key] = _AccountTotals(name, signs)
+
+        debit_amount = _amount(debit, accounting, signed_side=False) or 0.0
+        credit_amount = _amount(credit, accounting, signed_side=False) or 0.0
+        movement = debit_amount - credit_amount
+        account.transactions += 1
+        account.debit += debit_amount
+        account.credit += credit_amount
+        reported = _amount(balance, accounting, signed_side=True)
+
+        for check in account.checks:
+            change = check.sign * movement
+            if reported is None:
+                if check.balance is not None:
+                    check.balance += change
+                continue
+            if check.balance is None:
+                check.opening = reported - (check.sign * (account.debit - account.credit))
+            else:
+                expected = check.balance + change
+                if abs(reported - expected) > tolerance:
+                    check.breaks.append((output_row, date, reference, debit, credit, reported, expected))
+            check.balance = check.closing = reported
+
+    return Reconciliation(*_reports(accounts, group_columns))
+
+
+def _reports(accounts, group_columns):
+    account_report = TransactionStore(group_columns + ACCOUNT_COLUMNS)
+    breaks = []
+    for key, account in accounts.items():
+        check = account.best_check()
+        net_movement = account.debit - account.credit
+        computed = difference = None
+        if check.opening is not None:
+            computed = check.opening + check.sign * net_movement
+            difference = check.closing - computed
+        has_balances = check.closing is not None
+        account_report.append_values(key + (
+            account.name, account.transactions, _figure(account.debit), _figure(account.credit),
+            _figure(net_movement), _figure(check.opening), _figure(check.closing), _figure(computed),
+            _figure(difference), ('debit' if check.sign > 0 else 'credit') if has_balances else '',
+            len(check.breaks)))
+        breaks.extend((entry, key, account.name) for entry in check.breaks)
+
+    break_report = TransactionStore(group_columns + BREAK_COLUMNS)
+    breaks.sort(key=lambda item: item[0][0])
+    for (output_row, date, reference, debit, credit, reported, expected), key, name in breaks:
+        break_report.append_values(key[:-1] + (
+            output_row, key[-1], name, date, reference, debit, credit,
+            _figure(reported), _figure(expected), _figure(reported - expected)))
+    return account_report, break_report
@@ -0,0 +1,198 @@
+from array import array
+
+OUTPUT_COLUMNS = ['Account Code', 'Account Name', 'Date', 'Journal', 'Reference',
+                  'Description', 'Debit', 'Credit', 'Balance']
+
+# Columns with few distinct values, stored once and referenced by index
+DICTIONARY_COLUMNS = ('Source File', 'Account Code', 'Account Name')
+
+
+class _Dictionary:
+    """Distinct values of one column plus an array of indices into them"""
+
+    __slots__ = ('values', 'index', 'codes')
+
+    def __init__(self):
+        self.values = []
+        self.index = {}
+        self.codes = array('I')
+
+    def encode(self, value):
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self):
+        values = self.values
+        return [values[code] for code in self.codes]
+
+
+class TransactionStore:
+    """Compact, column-backed replacement for a list of transaction dicts.
+
+    Account (and source file) columns are dictionary-encoded: each distinct
+    value is kept once and rows hold a 4-byte index into it. The other
+    columns are plain lists of the cell values. Rows read back as dicts, so
+    code written for the old list of dicts (len, indexing, slicing,
+    iteration, row['Account Code']) keeps working, while exports go
+    straight from the columns to pandas.
+    """
+
+    def __init__(self, columns=OUTPUT_COLUMNS):
+        self.columns = list(columns)
+        self._data = {col: _Dictionary() if col in DICTIONARY_COLUMNS else []
+                      for col in self.columns}
+        self._length = 0
+        self._bind_appenders()
+
+    def _bind_appenders(self):
+        # One bound append per column, so append_values does no type checks
+        self._appenders = []
+        for col in self.columns:
+            data = self._data[col]
+            if isinstance(data, _Dictionary):
+                self._appenders.append(
+                    lambda value, codes=data.codes, encode=data.encode: codes.append(encode(value)))
+            else:
+                self._appenders.append(data.append)
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Build a store from a {column name: list of values} mapping"""
+        store = cls(list(columns))
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("All columns must have the same length")
+        for col, values in columns.items():
+            target = store._data[col]
+            if isinstance(target, _Dictionary):
+                target.codes.extend(map(target.encode, values))
+            else:
+                target.extend(values)
+        store._length = lengths.pop() if lengths else 0
+        return store
+
+    def append_values(self, values):
+        """Append one transaction given as values in column order"""
+        for append, value in zip(self._appenders, values):
+            append(value)
+        self._length += 1
+
+    def append(self, row):
+        """Append one transaction given as a dict (missing columns -> '')"""
+        self.append_values([row.get(col, '') for col in self.columns])
+
+    def extend(self, rows):
+        """Append the rows of another store (or any iterable of dicts)"""
+        if not isinstance(rows, TransactionStore):
+            for row in rows:
+                self.append(row)
+            return
+        for col in self.columns:
+            target = self._data[col]
+            source = rows._data.get(col)
+            if source is None:
+                source = [''] * len(rows)
+            if isinstance(target, _Dictionary):
+                if isinstance(source, _Dictionary):
+                    remap = [target.encode(value) for value in source.values]
+                    target.codes.extend(remap[code] for code in source.codes)
+                else:
+                    target.codes.extend(map(target.encode, source))
+            else:
+                target.extend(source.decode() if isinstance(source, _Dictionary) else source)
+        self._length += len(rows)
+
+    def insert_constant_column(self, position, name, value):
+        """Add a column holding the same value on every row (e.g. Source File)"""
+        column = _Dictionary()
+        code = column.encode(value)
+        column.codes.extend(array('I', [code]) * self._length)
+        self.columns.insert(position, name)
+        self._data[name] = column
+        self._bind_appenders()
+
+    def column(self, name):
+        """All values of one column as a list"""
+        data = self._data[name]
+        return data.decode() if isinstance(data, _Dictionary) else list(data)
+
+    def distinct(self, name):
+        """Distinct values of a column (cheap for dictionary-encoded columns)"""
+        data = self._data[name]
+        if isinstance(data, _Dictionary):
+            used = set(data.codes)
+            return [value for code, value in enumerate(data.values) if code in used]
+        return list(dict.fromkeys(data))
+
+    def iter_values(self, columns=None):
+        """Yield each row as a tuple of values in the order of columns"""
+        columns = self.columns if columns is None else columns
+        lists = []
+        for col in columns:
+            data = self._data.get(col)
+            if data is None:
+                lists.append([''] * self._length)
+            elif isinstance(data, _Dictionary):
+                lists.append(map(data.values.__getitem__, data.codes))
+            else:
+                lists.append(data)
+        return zip(*lists)
+
+    def to_dataframe(self, columns=None):
+        """Hand the columns to pandas; dictionary columns become categoricals"""
+        # Imported here so the desktop app can show its window before pandas loads
+        import numpy as np
+        import pandas as pd
+
+        columns = self.columns if columns is None else columns
+        frame = {}
+        for col in columns:
+            data = self._data.get(col)
+            if data is None:
+                frame[col] = pd.Series([''] * self._length, dtype=object)
+            elif isinstance(data, _Dictionary):
+                codes = np.frombuffer(data.codes, dtype=np.uint32) if self._length else np.zeros(0, dtype=np.uint32)
+                categories = pd.Index(data.values, dtype=object)
+                frame[col] = pd.Categorical.from_codes(codes.astype(np.int32), categories)
+            else:
+                frame[col] = pd.Series(data, dtype=object)
+        return pd.DataFrame(frame, columns=columns)
+
+    def __getstate__(self):
+        # The bound appenders are rebuilt after unpickling (process pools)
+        state = self.__dict__.copy()
+        del state['_appenders']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._bind_appenders()
+
+    def _row(self, i):
+        row = {}
+        for col in self.columns:
+            data = self._data[col]
+            row[col] = data.values[data.codes[i]] if isinstance(data, _Dictionary) else data[i]
+        return row
+
+    def __len__(self):
+        return self._length
+
+    def __bool__(self):
+        return self._length > 0
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._row(i) for i in range(*key.indices(self._length))]
+        if key < 0:
+            key += self._length
+        if not 0 <= key < self._length:
+            raise IndexError("TransactionStore index out of range")
+        return self._row(key)
+
+    def __iter__(self):
+        for values in self.iter_values():
+            yield dict(zip(self.columns, values))
@@ -0,0 +1,531 @@
+import argparse
+import hmac
+import json
+import multiprocessing
+import os
+import secrets
+import socket
+import socketserver
+import stat
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from universal_anomalies import AnomalyReport
+from universal_batch import clean_files, resolve_workers
+from universal_cli import log_stderr, output_path_for, write_results
+from universal_engine import load_config_file
+from universal_jobs import CancelToken, SharedProgress
+from universal_reconcile import Reconciliation
+
+DEFAULT_PORT = 8765
+OUTPUT_FORMATS = ('csv', 'xlsx', 'parquet', 'feather')
+
+# Finished jobs kept for GET /jobs/<id>; older ones are forgotten
+MAX_FINISHED_JOBS = 200
+# Seconds an event stream waits before re-checking a quiet job
+EVENT_WAIT_SECONDS = 15
+
+# Host header values of a local client; any other name may be a web page
+# that rebound its own domain to 127.0.0.1
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '::1')
+# Config keys a request may not override (they name paths the service
+# writes), and the endings of any other key that names a path
+LOCKED_KEYS = ('cache_dir', 'checkpoint_dir', 'metrics_path', 'profile_path', 'profile')
+LOCKED_SUFFIXES = ('_dir', '_path')
+
+
+def _host_name(host):
+    """Host header without its port ('[::1]:8765' -> '::1')"""
+    if host.startswith('['):
+        return host[1:].split(']')[0]
+    return host.rsplit(':', 1)[0] if host.count(':') == 1 else host
+
+
+def _locked_keys(overrides):
+    return [key for key in overrides if key in LOCKED_KEYS or key.endswith(LOCKED_SUFFIXES)]
+
+
+def _is_socket(path):
+    try:
+        return stat.S_ISSOCK(os.lstat(path).st_mode)
+    except OSError:
+        return False
+
+
+def _report_paths(output_path):
+    return Reconciliation.report_paths(output_path) + AnomalyReport.report_paths(output_path)
+
+
+def _warm_up():
+    """Pool initializer: import the heavy modules once per worker process"""
+    import openpyxl  # noqa: F401
+    import pandas  # noqa: F401
+    import universal_engine  # noqa: F401
+    import universal_vectorized  # noqa: F401
+
+
+def _worker_ready():
+    return os.getpid()
+
+
+class ServiceJob:
+    """One submitted cleaning job and the events it has produced"""
+
+    def __init__(self, job_id, request, config, token):
+        self.id = job_id
+        self.inputs = request["inputs"]
+        self.output = request["output"]
+        self.merge = request["merge"]
+        self.format = request["format"]
+        self.config = config
+        self.token = token
+        self.state = 'queued'
+        self.progress = 0.0
+        self.outputs = []
+        self.failures = 0
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.events = []
+        self._changed = threading.Condition()
+
+    @property
+    def done(self):
+        return self.state in ('done', 'failed', 'cancelled')
+
+    def emit(self, event, **fields):
+        with self._changed:
+            self.events.append(dict(fields, event=event, job=self.id, time=round(time.time(), 3)))
+            self._changed.notify_all()
+
+    def log(self, message):
+        self.emit('log', message=message)
+
+    def set_progress(self, value):
+        self.progress = round(value, 1)
+        self.emit('progress', progress=self.progress)
+
+    def wait_events(self, start, timeout):
+        """Events from index start on, waiting up to timeout for the first one"""
+        with self._changed:
+            if len(self.events) <= start and not self.done:
+                self._changed.wait(timeout)
+            return self.events[start:], self.done
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "state": self.state,
+            "progress": self.progress,
+            "inputs": self.inputs,
+            "output": self.output,
+            "outputs": self.outputs,
+            "failures": self.failures,
+            "error": self.error,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class CleaningService:
+    """Queue of cleaning jobs run over a warm pool of worker processes.
+
+    At most max_jobs jobs run at once (the rest wait in submission order)
+    so several large ledgers cannot all be held in memory together; each
+    job shares its sheets out over the same pool of `workers` processes,
+    which import pandas and openpyxl once when the service starts.
+
+    Outputs and request config files must be inside root (the current
+    folder if not given), and a job may not write over one of its inputs.
+    """
+
+    def __init__(self, workers=0, max_jobs=1, max_queue=100, config_path=None, root=None):
+        self.workers = resolve_workers(workers)
+        self.max_jobs = max_jobs
+        self.max_queue = max_queue
+        self.config_path = config_path
+        self.root = os.path.realpath(root or os.getcwd())
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+        # Serves the cancel flags running sheets check and their progress queues
+        self.manager = multiprocessing.Manager()
+        self.pool = self._start_pool()
+        self.runner = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix='job')
+
+    def _start_pool(self):
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_up)
+        # Start every worker now rather than on the first job
+        for future in [pool.submit(_worker_ready) for _ in range(self.workers)]:
+            future.result()
+        return pool
+
+    def _restart_pool(self, broken):
+        with self._pool_lock:
+            if self.pool is broken:
+                broken.shutdown(wait=False)
+                self.pool = self._start_pool()
+
+    def _count(self, state):
+        return sum(1 for job in self.jobs.values() if job.state == state)
+
+    def counts(self):
+        with self._lock:
+            return {state: self._count(state) for state in ('queued', 'running')}
+
+    def _inside_root(self, path, key):
+        """path resolved (symlinks too); ValueError unless it is inside root"""
+        real_path = os.path.realpath(path)
+        if os.path.commonpath([real_path, self.root]) != self.root:
+            raise ValueError(f"'{key}' must be inside {self.root}")
+        return real_path
+
+    def _check_outputs(self, inputs, output, merge, output_format):
+        """ValueError if a file the job writes (report files too) is one of its inputs"""
+        args = argparse.Namespace(inputs=inputs, output=output, merge=merge, format=output_format)
+        input_paths = {os.path.realpath(path) for path in inputs}
+        for output_path in {output_path_for(path, args) for path in inputs}:
+            for path in (output_path,) + _report_paths(output_path):
+                if os.path.realpath(path) in input_paths:
+                    raise ValueError(f"Output would overwrite the input file {path}")
+
+    def submit(self, request):
+        """Validate a job request and queue it; raises ValueError for a bad request"""
+        if not isinstance(request, dict):
+            raise ValueError("Request body must be a JSON object")
+        inputs = request.get("inputs")
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        if not inputs or not all(isinstance(path, str) for path in inputs):
+            raise ValueError("'inputs' must be a file path or a list of file paths")
+        missing = [path for path in inputs if not os.path.isfile(path)]
+        if missing:
+            raise ValueError(f"File not found: {', '.join(missing)}")
+        output = request.get("output")
+        if not isinstance(output, str) or not output:
+            raise ValueError("'output' must be an output file or folder path")
+        output = self._inside_root(output, "output")
+        output_format = request.get("format", "csv")
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"'format' must be one of: {', '.join(OUTPUT_FORMATS)}")
+        merge = bool(request.get("merge"))
+        self._check_outputs(inputs, output, merge, output_format)
+        overrides = request.get("config") or {}
+        if not isinstance(overrides, dict):
+            raise ValueError("'config' must be a JSON object")
+        locked = _locked_keys(overrides)
+        if locked:
+            raise ValueError(f"'config' may not set: {', '.join(locked)}")
+        config_path = request.get("config_path")
+        if config_path is not None:
+            if not isinstance(config_path, str) or not config_path:
+                raise ValueError("'config_path' must be a config file path")
+            config_path = self._inside_root(config_path, "config_path")
+
+        config = load_config_file(config_path or self.config_path)
+        config.update(overrides)
+        # cProfile only sees the calling process, which here does no cleaning
+        # (and requests may not set it)
+        config["profile"] = False
+
+        with self._lock:
+            if self._count('queued') >= self.max_queue:
+                raise OverflowError(f"Queue is full ({self.max_queue} jobs waiting)")
+            job = ServiceJob(uuid.uuid4().hex[:12],
+                             {"inputs": inputs, "output": output,
+                              "merge": merge, "format": output_format},
+                             config, CancelToken.shared(self.manager))
+            self.jobs[job.id] = job
+            self._forget_old_jobs()
+        job.emit('queued', position=self.counts()['queued'])
+        self.runner.submit(self._run, job)
+        return job
+
+    def _forget_old_jobs(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self):
+        with self._lock:
+            return [job.to_dict() for job in self.jobs.values()]
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job; None if there is no such job"""
+        job = self.get(job_id)
+        if job is not None and not job.done:
+            job.token.cancel()
+            job.log("⏹ Cancelling...")
+        return job
+
+    def _clean(self, job):
+        # Workers send progress within their sheets, not only when one ends
+        progress = SharedProgress.shared(self.manager)
+        for attempt in range(2):
+            pool = self.pool
+            try:
+                return clean_files(job.inputs, job.config, log_callback=job.log,
+                                   progress_callback=job.set_progress,
+                                   cancel_token=job.token, executor=pool,
+                                   shared_progress=progress)
+            except BrokenProcessPool:
+                # A worker died (e.g. out of memory) on an earlier job
+                job.log("⚠ Worker pool was broken - restarting it")
+                self._restart_pool(pool)
+        raise RuntimeError("Worker pool keeps failing")
+
+    def _run(self, job):
+        if job.token.cancelled:
+            job.state = 'cancelled'
+            job.finished = time.time()
+            job.emit('finished', **job.to_dict())
+            return
+        job.state = 'running'
+        job.started = time.time()
+        job.emit('started')
+        try:
+            args = argparse.Namespace(inputs=job.inputs, output=job.output,
+                                      merge=job.merge, format=job.format)
+            if len(job.inputs) > 1 and not job.merge:
+                os.makedirs(job.output, exist_ok=True)
+            results = self._clean(job)
+            job.failures, job.outputs = write_results(results, job.config, args, log=job.log)
+            if job.token.cancelled:
+                job.state = 'cancelled'
+            else:
+                job.state = 'done' if job.outputs or not job.failures else 'failed'
+        except Exception as e:
+            job.error = str(e)
+            job.state = 'failed'
+            job.log(f"❌ {str(e)}")
+        job.finished = time.time()
+        job.emit('finished', **job.to_dict())
+
+    def shutdown(self):
+        for job in list(self.jobs.values()):
+            if not job.done:
+                job.token.cancel()
+        self.runner.shutdown(wait=True)
+        self.pool.shutdown(wait=True)
+        self.manager.shutdown()
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """JSON API (every request needs "Authorization: Bearer <token>"):
+
+    GET  /health                 pool size, queued and running jobs
+    POST /jobs                   {"inputs": [...], "output": "...", "merge": false,
+                                  "format": "csv", "config": {...}} -> 202 + job
+    GET  /jobs                   every job kept
+    GET  /jobs/<id>              one job
+    GET  /jobs/<id>/events       newline-delimited JSON events until the job ends
+    POST /jobs/<id>/cancel       stop a queued or running job
+
+    POST bodies must be sent as application/json. Requests from a browser
+    page (any Origin header) or to a host name other than localhost are
+    refused, so a web page cannot reach the service through the browser.
+    """
+
+    server_version = "UniversalAuditorService/1"
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def address_string(self):
+        # Unix socket peers have no host/port
+        if isinstance(self.client_address, tuple) and self.client_address:
+            return str(self.client_address[0])
+        return 'unix'
+
+    def log_message(self, format, *args):
+        log_stderr(f"{self.address_string()} - {format % args}")
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _refusal(self):
+        """(status, message) when the request must not be served, else None"""
+        if self.headers.get('Origin') is not None:
+            return 403, "Browser (cross-origin) requests are not accepted"
+        if self.server.check_host and _host_name(self.headers.get('Host', '')) not in LOCAL_HOSTS:
+            return 403, "Host must be localhost"
+        scheme, _, token = self.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not hmac.compare_digest(token.strip().encode('utf-8'),
+                                                                  self.server.token.encode('utf-8')):
+            return 401, "Missing or wrong token (send 'Authorization: Bearer <token>')"
+        return None
+
+    def _refused(self, post=False):
+        """Answer a request that must not be served; True if it was refused"""
+        refusal = self._refusal()
+        if refusal is None and post and self.headers.get_content_type() != 'application/json':
+            refusal = 415, "Content-Type must be application/json"
+        if refusal is not None:
+            self._send_json(refusal[0], {"error": refusal[1]})
+        return refusal is not None
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            raise ValueError("Request body is not valid JSON")
+
+    def _job_or_404(self, job_id):
+        job = self.service.get(job_id)
+        if job is None:
+            self._send_json(404, {"error": f"No job '{job_id}'"})
+        return job
+
+    def do_GET(self):
+        if self._refused():
+            return
+        parts = [part for part in self.path.split('?')[0].split('/') if part]
+        if parts == ['health']:
+            self._send_json(200, dict(self.service.counts(), status="ok",
+                                      workers=self.service.workers, max_jobs=self.service.max_jobs))
+        elif parts == ['jobs']:
+            self._send_json(200, {"jobs": self.service.list_jobs()})
+        elif len(parts) == 2 and parts[0] == 'jobs':
+            job = self._job_or_404(parts[1])
+            if job is not None:
+                self._send_json(200, job.to_dict())
+        elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'events':
+            job = self._job_or_404(parts[1])
+            if job is not None:
+                self._stream_events(job)
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self._refused(post=True):
+            return
+        parts = [part for part in self.path.split('?')[0].split('/') if part]
+        if parts == ['jobs']:
+            try:
+                job = self.service.submit(self._read_json())
+            except OverflowError as e:
+                self._send_json(503, {"error": str(e)})
+            except ValueError as e:
+                self._send_json(400, {"error": str(e)})
+            else:
+                self._send_json(202, dict(job.to_dict(), url=f"/jobs/{job.id}"))
+        elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'cancel':
+            job = self.service.cancel(parts[1])
+            if job is None:
+                self._send_json(404, {"error": f"No job '{parts[1]}'"})
+            else:
+                self._send_json(200, job.to_dict())
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def _stream_events(self, job):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        sent = 0
+        try:
+            while True:
+                events, finished = job.wait_events(sent, EVENT_WAIT_SECONDS)
+                for event in events:
+                    self.wfile.write(json.dumps(event).encode('utf-8') + b'\n')
+                self.wfile.flush()
+                sent += len(events)
+                if finished and sent == len(job.events):
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped listening; the job carries on
+            return
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Universal Auditor Data Cleaner - local cleaning service")
+    parser.add_argument('--host', default='127.0.0.1',
+                        help="Address to listen on (keep this on localhost: jobs read any "
+                             "path this user can, and only localhost host names are served)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--socket', help="Listen on this Unix socket instead of TCP")
+    parser.add_argument('-c', '--config', default="auditor_config_universal.json",
+                        help="Base config for jobs (requests can override keys)")
+    parser.add_argument('-j', '--workers', type=int, default=0,
+                        help="Warm worker processes (0 = one per CPU core)")
+    parser.add_argument('--max-jobs', type=int, default=1,
+                        help="Jobs cleaned at the same time; the rest wait in the queue")
+    parser.add_argument('--max-queue', type=int, default=100,
+                        help="Jobs allowed to wait before new ones are refused")
+    parser.add_argument('--token',
+                        help="Token clients send as 'Authorization: Bearer <token>' "
+                             "(default: a new random token, printed at startup)")
+    parser.add_argument('--root',
+                        help="Folder job outputs and request config files must be in "
+                             "(default: the current folder)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.socket and not hasattr(socket, 'AF_UNIX'):
+        log_stderr("❌ Unix sockets are not available on this platform; use --port")
+        return 2
+
+    # A socket left by an earlier run is replaced; anything else is not ours
+    if args.socket and os.path.lexists(args.socket) and not _is_socket(args.socket):
+        log_stderr(f"❌ {args.socket} exists and is not a socket; not replacing it")
+        return 2
+
+    token = args.token or secrets.token_urlsafe(24)
+    service = CleaningService(args.workers, max(args.max_jobs, 1), args.max_queue, args.config,
+                              args.root)
+    if args.socket:
+        if _is_socket(args.socket):
+            os.remove(args.socket)
+        server = UnixHTTPServer(args.socket, ServiceRequestHandler)
+        address = args.socket
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), ServiceRequestHandler)
+        address = f"http://{args.host}:{server.server_address[1]}"
+    server.service = service
+    server.token = token
+    # Unix socket clients are local already; any Host name is fine there
+    server.check_host = not args.socket
+    log_stderr(f"✅ Listening on {address} with {service.workers} warm workers, "
+               f"{service.max_jobs} job(s) at a time; outputs go under {service.root}")
+    if not args.token:
+        log_stderr(f"🔑 Token: {token}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        if args.socket and _is_socket(args.socket):
+            os.remove(args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import csv
+import os
+from datetime import datetime
+from itertools import islice
+
+import pandas as pd
+
+from universal_amounts import parse_amount
+from universal_results import TransactionStore
+
+AMOUNT_COLUMNS = ('Debit', 'Credit', 'Balance')
+# Amount columns whose DR/CR suffix signs the figure (CR negative)
+SIGNED_AMOUNT_COLUMNS = ('Balance',)
+CATEGORY_COLUMNS = ('Account Code', 'Account Name', 'Source File')
+
+# Extensions that need pyarrow (optional dependency)
+ARROW_FORMATS = {'.parquet': 'Parquet', '.feather': 'Feather'}
+
+# Excel date serials (day 1 = 1900-01-01 in Excel's count, which takes
+# 1900 as a leap year, hence the 1899-12-30 origin) up to 9999-12-31
+EXCEL_EPOCH = '1899-12-30'
+EXCEL_MAX_SERIAL = 2958465
+
+
+def write_csv_chunked(rows, output_path, columns, chunk_size=10000):
+    """Write rows to CSV chunk_size rows at a time, without building a DataFrame.
+
+    rows can be a TransactionStore or any iterable of dicts. A generator is
+    consumed a chunk at a time, so only that chunk is held; a store (what
+    the engines return) is already in memory, and what is saved is the
+    DataFrame copy of it. Each value is written as-is, so whole-number
+    amounts stay '1200' rather than the '1200.0' a float64 DataFrame column
+    gives; midnight datetimes are written as plain dates (YYYY-MM-DD).
+    Returns the number of rows written.
+    """
+    if isinstance(rows, TransactionStore):
+        rows = rows.iter_values(columns)
+    else:
+        rows = ([row.get(col, '') for col in columns] for row in rows)
+    written = 0
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator=os.linesep)
+        writer.writerow(columns)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            writer.writerows(map(_csv_values, chunk))
+            written += len(chunk)
+    return written
+
+
+def _csv_values(values):
+    values = list(values)
+    for i, value in enumerate(values):
+        if isinstance(value, datetime) and not (value.hour or value.minute or value.second or value.microsecond):
+            values[i] = value.date().isoformat()
+    return values
+
+
+def results_frame(processed_data, columns):
+    """DataFrame of a TransactionStore or a list of row dicts"""
+    if isinstance(processed_data, TransactionStore):
+        return processed_data.to_dataframe(columns)
+    return pd.DataFrame(processed_data, columns=columns)
+
+
+def _typed_amounts(col, values, blank):
+    """Amount column as float64 (blank -> NaN), or None if a non-blank value is not an amount"""
+    signed_side = col in SIGNED_AMOUNT_COLUMNS
+    amounts = values.where(~blank).map(
+        lambda value: value if pd.isna(value) else parse_amount(value, signed_side=signed_side))
+    if (amounts.isna() & ~blank).any():
+        return None
+    return amounts.astype('float64')
+
+
+def _typed_dates(values, blank):
+    """Date column as datetime64, or None if a non-blank value is not a date.
+
+    Numbers are Excel date serials (CSV, .xlsb and .ods sheets give dates
+    as plain numbers), not nanoseconds since 1970.
+    """
+    present = values.where(~blank)
+    numeric = present.map(lambda value: isinstance(value, (int, float)) and not isinstance(value, bool))
+    numeric &= ~blank
+    dates = pd.to_datetime(present.mask(numeric), errors='coerce')
+    if numeric.any():
+        serials = pd.to_numeric(present.where(numeric), errors='coerce')
+        serials = serials.where((serials >= 1) & (serials <= EXCEL_MAX_SERIAL))
+        dates = dates.mask(numeric, pd.to_datetime(serials, unit='D', origin=EXCEL_EPOCH))
+    if (dates.isna() & ~blank).any():
+        return None
+    return dates
+
+
+def to_typed_frame(processed_data, columns):
+    """Build a DataFrame with analytics-friendly column types.
+
+    Debit/Credit/Balance become float64 when every non-blank value is an
+    amount (blank -> NaN; amount text such as "1,000" or "500.00 CR" is
+    parsed). Date becomes datetime64 when every non-blank value is a date,
+    date text or an Excel date serial. A column holding anything else stays
+    text, so no cell is turned into a silent NaN. Account columns become
+    categoricals (dictionary-encoded in Arrow) and the remaining columns
+    become strings.
+    """
+    df = results_frame(processed_data, columns)
+    for col in columns:
+        values = df[col]
+        blank = values.isna() | (values.astype(str).str.strip() == '')
+        if col in AMOUNT_COLUMNS:
+            amounts = _typed_amounts(col, values, blank)
+            df[col] = values.astype(str) if amounts is None else amounts
+        elif col == 'Date':
+            dates = _typed_dates(values, blank)
+            df[col] = values.astype(str) if dates is None else dates
+        elif col in CATEGORY_COLUMNS:
+            df[col] = values.astype(str).astype('category')
+        else:
+            df[col] = values.astype(str)
+    return df
+
+
+def _require_pyarrow(format_name):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(f"{format_name} export needs pyarrow: pip install pyarrow")
+
+
+def write_arrow(processed_data, output_path, columns):
+    """Write typed columns to Parquet or Feather (chosen by extension)"""
+    extension = os.path.splitext(output_path)[1].lower()
+    format_name = ARROW_FORMATS[extension]
+    _require_pyarrow(format_name)
+    df = to_typed_frame(processed_data, columns)
+    if extension == '.parquet':
+        df.to_parquet(output_path, index=False)
+    else:
+        df.to_feather(output_path)